@@ -0,0 +1,110 @@
+"""Offline job that precomputes SVD recommendations for every customer.
+
+Usage:
+    python batch_recommendations.py [--top-n 20] [--chunk-size 5000] [--workers 4]
+
+The result is a columnar file sorted by customer that DataLoader can load
+and serve without touching the model at request time. It is stamped with
+the scorer's model_version; loaders skip it once another model is promoted,
+and promotion rebuilds it (see ``refresh``).
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from components.data_loader import load_svd_scorer, read_shopping_data
+
+# Per-worker state, set once by the pool initializer
+_scorer = None
+_top_n = None
+
+
+def _init_worker(factors_dir, model_path, top_n):
+    global _scorer, _top_n
+    # Exported factors are memory-mapped, so all workers share one copy
+    _scorer = load_svd_scorer(factors_dir, model_path)
+    _top_n = top_n
+
+
+def _score_chunk(chunk):
+    """Score one chunk of (customer_ids, purchased_items) in a worker"""
+    customer_ids, purchased = chunk
+    exclude = dict(zip(customer_ids, purchased))
+    recommendations = _scorer.recommend(customer_ids, _top_n, exclude=exclude)
+
+    customers, ranks, items, scores = [], [], [], []
+    for customer_id, recs in zip(customer_ids, recommendations):
+        for rank, (item, score) in enumerate(recs, 1):
+            customers.append(customer_id)
+            ranks.append(rank)
+            items.append(item)
+            scores.append(score)
+    return customers, ranks, items, scores
+
+
+def _chunks(customer_items, chunk_size):
+    customer_ids = list(customer_items.keys())
+    for start in range(0, len(customer_ids), chunk_size):
+        ids = customer_ids[start:start + chunk_size]
+        yield ids, [customer_items[cid] for cid in ids]
+
+
+def run_batch(data_path, factors_dir, model_path, output_path, top_n, chunk_size, workers):
+    """Score every customer in ``data_path`` and write the top-N table"""
+    model_version = load_svd_scorer(factors_dir, model_path).model_version
+    df = read_shopping_data(data_path, columns=['Customer ID', 'Item Purchased'])
+    customer_items = df.groupby('Customer ID', observed=True)['Item Purchased'].agg(set).to_dict()
+
+    columns = ([], [], [], [])
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(factors_dir, model_path, top_n)) as pool:
+        for result in pool.map(_score_chunk, _chunks(customer_items, chunk_size)):
+            for column, values in zip(columns, result):
+                column.extend(values)
+
+    recs_df = pd.DataFrame({
+        'Customer ID': columns[0],
+        'Rank': np.asarray(columns[1], dtype=np.int16),
+        'Recommended Item': pd.Categorical(columns[2]),
+        'Score': np.asarray(columns[3], dtype=np.float32),
+    }).sort_values(['Customer ID', 'Rank'], kind='stable')
+
+    # DataFrame.attrs are stored in the Parquet schema metadata
+    recs_df.attrs['model_version'] = model_version
+    recs_df.to_parquet(output_path, index=False)
+    return recs_df
+
+
+def refresh(workers=None):
+    """Rebuild the deployed batch table for the current model, e.g. right after a promotion"""
+    recs_df = run_batch(config.SHOPPING_DATA_PATH, config.SVD_FACTORS_DIR, config.SVD_MODEL_PATH,
+                        config.BATCH_RECOMMENDATIONS_PATH, config.BATCH_TOP_N, config.BATCH_CHUNK_SIZE, workers)
+    print(f"Recomendaciones batch regeneradas para el modelo {recs_df.attrs['model_version']}")
+    return recs_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute SVD recommendations for all customers")
+    parser.add_argument('--data', default=config.SHOPPING_DATA_PATH)
+    parser.add_argument('--factors', default=config.SVD_FACTORS_DIR)
+    parser.add_argument('--model', default=config.SVD_MODEL_PATH)
+    parser.add_argument('--output', default=config.BATCH_RECOMMENDATIONS_PATH)
+    parser.add_argument('--top-n', type=int, default=config.BATCH_TOP_N)
+    parser.add_argument('--chunk-size', type=int, default=config.BATCH_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    recs_df = run_batch(args.data, args.factors, args.model, args.output, args.top_n, args.chunk_size, args.workers)
+    print(f"Recomendaciones generadas: {recs_df['Customer ID'].nunique():,} clientes, "
+          f"{len(recs_df):,} filas, modelo {recs_df.attrs['model_version']} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
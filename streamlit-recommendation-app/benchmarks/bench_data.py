@@ -0,0 +1,49 @@
+"""Loading and matrix/index construction benchmarks (asv-style)."""
+from benchmarks.datasets import SCALES, dataset_files, scaled_dataset
+
+from components.aggregate_cube import AggregateCube
+from components.data_index import DataIndex
+from components.data_loader import read_shopping_data
+from components.popularity import PopularityIndex
+from components.user_item_matrix import UserItemMatrix
+
+
+class LoadShoppingData:
+    """What DataLoader.load_shopping_data does on a cache miss"""
+    params = SCALES
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        self.csv_path, self.parquet_csv_path = dataset_files(n_rows)
+
+    def time_read_csv(self, n_rows):
+        read_shopping_data(self.csv_path)
+
+    def time_read_parquet(self, n_rows):
+        read_shopping_data(self.parquet_csv_path)
+
+    def time_read_parquet_projected(self, n_rows):
+        read_shopping_data(self.parquet_csv_path, columns=['Customer ID', 'Item Purchased', 'interaction_score'])
+
+
+class BuildStructures:
+    params = SCALES
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        self.df = scaled_dataset(n_rows)
+
+    def time_create_user_item_matrix(self, n_rows):
+        UserItemMatrix.from_dataframe(self.df)
+
+    def time_build_data_index(self, n_rows):
+        DataIndex(self.df)
+
+    def time_build_aggregate_cube(self, n_rows):
+        AggregateCube(self.df)
+
+    def time_build_popularity_index(self, n_rows):
+        PopularityIndex(self.df)
+
+    def peakmem_create_user_item_matrix(self, n_rows):
+        UserItemMatrix.from_dataframe(self.df)
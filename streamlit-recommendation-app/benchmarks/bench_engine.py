@@ -0,0 +1,48 @@
+"""RecommendationEngine query benchmarks (asv-style)."""
+import numpy as np
+
+from benchmarks.datasets import SCALES, random_scorer, scaled_dataset
+
+from components.data_index import DataIndex
+from components.item_neighbors import ItemNeighborIndex
+from components.recommendation_engine import RecommendationEngine
+from components.user_item_matrix import UserItemMatrix
+
+
+class EngineQueries:
+    params = SCALES
+    param_names = ['n_rows']
+    # Engine construction is part of setup, not of the timed queries
+    timeout = 600
+
+    def setup(self, n_rows):
+        df = scaled_dataset(n_rows)
+        data_index = DataIndex(df)
+        user_item_matrix = UserItemMatrix.from_dataframe(df)
+        self.engine = RecommendationEngine(df, random_scorer(df), None, data_index=data_index,
+                                           item_neighbors=ItemNeighborIndex.build(user_item_matrix, k=20),
+                                           user_item_matrix=user_item_matrix)
+
+        rng = np.random.default_rng(0)
+        customers = df['Customer ID'].unique()
+        self.customer_id = customers[0]
+        self.batch = rng.choice(customers, min(100, len(customers)), replace=False).tolist()
+        self.category = df['Category'].iloc[0]
+
+    def time_get_svd_recommendations(self, n_rows):
+        self.engine.get_svd_recommendations(self.customer_id, 10)
+
+    def time_get_svd_recommendations_batch_100(self, n_rows):
+        self.engine.get_svd_recommendations_batch(self.batch, 10)
+
+    def time_get_hybrid_recommendations(self, n_rows):
+        self.engine.get_hybrid_recommendations(self.customer_id, 10)
+
+    def time_get_history_based_recommendations(self, n_rows):
+        self.engine.get_history_based_recommendations(self.customer_id, 10)
+
+    def time_get_popular_items_by_category(self, n_rows):
+        self.engine.get_popular_items_by_category(self.category, 10)
+
+    def time_get_customer_profile(self, n_rows):
+        self.engine.get_customer_profile(self.customer_id)
@@ -0,0 +1,39 @@
+"""Visualizations.plot_* benchmarks: aggregation plus figure construction (asv-style)."""
+from benchmarks.datasets import SCALES, scaled_dataset
+
+from components.data_index import DataIndex
+from components.visualizations import Visualizations
+
+
+class PlotAggregations:
+    params = SCALES
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        df = scaled_dataset(n_rows)
+        self.viz = Visualizations(df, DataIndex(df))
+        self.category = df['Category'].iloc[0]
+
+    def time_plot_category_distribution(self, n_rows):
+        self.viz.plot_category_distribution()
+
+    def time_plot_spending_by_segment(self, n_rows):
+        self.viz.plot_spending_by_segment()
+
+    def time_plot_top_products(self, n_rows):
+        self.viz.plot_top_products()
+
+    def time_plot_top_products_in_category(self, n_rows):
+        self.viz.plot_top_products(category=self.category)
+
+    def time_plot_price_rating_scatter(self, n_rows):
+        self.viz.plot_price_rating_scatter()
+
+    def time_plot_purchase_frequency_by_gender(self, n_rows):
+        self.viz.plot_purchase_frequency_by_gender()
+
+    def time_plot_seasonal_trends(self, n_rows):
+        self.viz.plot_seasonal_trends()
+
+    def time_plot_customer_lifetime_value_distribution(self, n_rows):
+        self.viz.plot_customer_lifetime_value_distribution()
@@ -0,0 +1,96 @@
+"""Synthetic shopping datasets scaled from the real 3,900-row CSV."""
+import atexit
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'src'))
+sys.path.append(ROOT)
+
+import config
+from components.data_loader import convert_to_columnar, preprocess_shopping_data
+from components.svd_scorer import SVDScorer
+
+# Row counts benchmarked by default; run_benchmarks.py --full adds millions
+SCALES = [3900, 100000]
+FULL_SCALES = [3900, 100000, 1000000]
+
+_datasets = {}
+# (n_rows, seed) -> (TemporaryDirectory, csv_path, parquet_csv_path)
+_files = {}
+
+
+def scaled_dataset(n_rows, seed=0):
+    """Bootstrap ``n_rows`` rows of the real CSV with a proportionally larger population.
+
+    About four purchases per customer, and the catalog grows with sqrt(scale)
+    by adding numbered variants of each product (same category).
+    """
+    key = (n_rows, seed)
+    if key not in _datasets:
+        base = pd.read_csv(config.SHOPPING_DATA_PATH)
+        rng = np.random.default_rng(seed)
+        df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+
+        n_customers = max(len(base), n_rows // 4)
+        df['Customer ID'] = rng.integers(1, n_customers + 1, n_rows)
+
+        variants = max(1, int(np.sqrt(n_rows / len(base))))
+        if variants > 1:
+            item_codes, items = pd.factorize(df['Item Purchased'])
+            variant = rng.integers(0, variants, n_rows)
+            names = [item if v == 0 else f"{item} #{v}" for item in items for v in range(variants)]
+            df['Item Purchased'] = pd.Categorical.from_codes(item_codes * variants + variant, names).astype(str)
+
+        _datasets[key] = preprocess_shopping_data(df)
+    return _datasets[key]
+
+
+def dataset_files(n_rows, seed=0):
+    """(csv_path, parquet_path) for a scaled dataset, written once per process.
+
+    The files live in a temporary directory removed by ``cleanup`` (also
+    run at interpreter exit).
+    """
+    key = (n_rows, seed)
+    if key not in _files:
+        tmp_dir = tempfile.TemporaryDirectory(prefix=f"bench_{n_rows}_")
+        directory = tmp_dir.name
+        csv_dir, parquet_dir = os.path.join(directory, 'csv'), os.path.join(directory, 'parquet')
+        os.makedirs(csv_dir)
+        os.makedirs(parquet_dir)
+
+        raw_columns = pd.read_csv(config.SHOPPING_DATA_PATH, nrows=0).columns
+        df = scaled_dataset(n_rows, seed)[raw_columns]
+        csv_path = os.path.join(csv_dir, 'shopping.csv')
+        df.to_csv(csv_path, index=False)
+
+        parquet_csv = os.path.join(parquet_dir, 'shopping.csv')
+        df.to_csv(parquet_csv, index=False)
+        convert_to_columnar(parquet_csv)
+        _files[key] = (tmp_dir, csv_path, parquet_csv)
+    return _files[key][1:]
+
+
+@atexit.register
+def cleanup():
+    """Delete every dataset file written by ``dataset_files``"""
+    while _files:
+        tmp_dir, _, _ = _files.popitem()[1]
+        tmp_dir.cleanup()
+
+
+def random_scorer(df, n_factors=50, seed=0):
+    """SVDScorer with random factors over the dataset's ids (for timing only)"""
+    rng = np.random.default_rng(seed)
+    customer_ids = np.sort(df['Customer ID'].unique())
+    item_ids = np.asarray(sorted(df['Item Purchased'].astype(str).unique()), dtype=object)
+    return SVDScorer(
+        rng.normal(0, 0.1, (len(customer_ids), n_factors)), rng.normal(0, 0.1, (len(item_ids), n_factors)),
+        rng.normal(0, 0.1, len(customer_ids)), rng.normal(0, 0.1, len(item_ids)), 3.0,
+        customer_ids, item_ids, rating_scale=(1.0, 5.0)
+    )
@@ -0,0 +1,38 @@
+"""Build the top-K item neighbor index used for similar-item queries.
+
+Usage:
+    python build_item_neighbors.py [--k 20] [--block-size 1024] [--output data/models/item_neighbors.npz]
+
+Similarities are computed block by block on the sparse user-item matrix,
+so the dense N x N similarity matrix is never materialized.
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from components.data_loader import read_shopping_data
+from components.item_neighbors import ItemNeighborIndex
+from components.user_item_matrix import UserItemMatrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the top-K item neighbor index")
+    parser.add_argument('--data', default=config.SHOPPING_DATA_PATH)
+    parser.add_argument('--output', default=config.ITEM_NEIGHBORS_PATH)
+    parser.add_argument('--k', type=int, default=config.ITEM_NEIGHBORS_K)
+    parser.add_argument('--block-size', type=int, default=1024)
+    args = parser.parse_args()
+
+    df = read_shopping_data(args.data, columns=['Customer ID', 'Item Purchased', 'interaction_score'])
+    neighbor_index = ItemNeighborIndex.build(UserItemMatrix.from_dataframe(df), k=args.k,
+                                             block_size=args.block_size)
+    neighbor_index.save(args.output)
+    print(f"Índice de vecinos generado: {len(neighbor_index.item_ids):,} productos, "
+          f"K={neighbor_index.k} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
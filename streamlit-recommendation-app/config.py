@@ -10,9 +10,16 @@ ASSETS_DIR = os.path.join(BASE_DIR, "assets")
 # Data files
 SHOPPING_DATA_PATH = os.path.join(DATA_DIR, "shopping_behavior_updated.csv")
 SVD_MODEL_PATH = os.path.join(MODELS_DIR, "svd_model.pkl")
+SVD_FACTORS_DIR = os.path.join(MODELS_DIR, "svd_factors")
 ITEM_SIMILARITY_PATH = os.path.join(MODELS_DIR, "item_similarity_matrix.csv")
+ITEM_NEIGHBORS_PATH = os.path.join(MODELS_DIR, "item_neighbors.npz")
+ANN_INDEX_PATH = os.path.join(MODELS_DIR, "ann_index.npz")
 RFM_ANALYSIS_PATH = os.path.join(MODELS_DIR, "rfm_analysis.csv")
 SAMPLE_RECOMMENDATIONS_PATH = os.path.join(MODELS_DIR, "sample_recommendations.csv")
+BATCH_RECOMMENDATIONS_PATH = os.path.join(MODELS_DIR, "batch_recommendations.parquet")
+EVALUATION_REPORT_PATH = os.path.join(MODELS_DIR, "evaluation_report.csv")
+MODEL_VERSIONS_DIR = os.path.join(MODELS_DIR, "versions")
+TRAINING_RUNS_DIR = os.path.join(MODELS_DIR, "training_runs")
 
 # App configuration
 APP_TITLE = "Sistema de Recomendación E-commerce"
@@ -21,7 +28,31 @@ PAGE_ICON = "🛒"
 
 # Model parameters
 SVD_FACTORS = 50
+SVD_FOLD_IN_REG = 0.02
+SVD_FOLD_IN_MAX_USERS = 100000  # folded-in customers kept per worker (least recently fitted dropped)
+SVD_PARAM_GRID = {
+    'n_factors': [20, 50, 100],
+    'n_epochs': [20],
+    'reg_all': [0.02, 0.05],
+    'lr_all': [0.005]
+}
 N_RECOMMENDATIONS = 10
+BATCH_TOP_N = 20
+ITEM_NEIGHBORS_K = 20
+HYBRID_ALPHA = 0.6
+CONTENT_MATCH_SCORE = 5.0
+CONTENT_MISMATCH_SCORE = 2.5
+BATCH_CHUNK_SIZE = 5000
+STREAM_CHUNK_SIZE = 500000  # rows per chunk when streaming large CSVs
+ANN_MIN_ITEMS = 100000
+ANN_N_PROBE = 8
+ANN_CANDIDATES = 200
+RECOMMENDATION_CACHE_SIZE = 10000
+RECOMMENDATION_CACHE_TTL = 600  # seconds
+SERVICE_MAX_BODY_BYTES = 10 * 1024 * 1024  # largest POST body the recommendation service reads
+POPULARITY_HALF_LIFE = 50000  # transactions after which a purchase counts half in trending
+TABLE_PAGE_SIZE = 25  # rows sent to the browser per table page
+EXPORT_CHUNK_SIZE = 100000  # rows per chunk when writing CSV exports
 INTERACTION_WEIGHTS = {
     'rating': 0.4,
     'amount': 0.3,
@@ -0,0 +1,27 @@
+"""Convert the shopping CSV into a typed Parquet file the loaders prefer.
+
+Usage:
+    python convert_dataset.py [--input data/shopping_behavior_updated.csv] [--output ...parquet]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from components.data_loader import columnar_path, convert_to_columnar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the shopping dataset to Parquet")
+    parser.add_argument('--input', default=config.SHOPPING_DATA_PATH)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    output_path = convert_to_columnar(args.input, args.output or columnar_path(args.input))
+    print(f"Dataset convertido: {args.input} -> {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Offline evaluation of every recommendation mode on a holdout split.
+
+Usage:
+    python evaluate_models.py [--k 10] [--test-size 0.2] [--model surprise|als|stored] [--threads 4]
+
+The latest interactions of each customer with at least two are held out,
+so every evaluated customer keeps some history in training. Reports
+precision/recall/NDCG@K, hit rate, coverage, catalog entropy and
+category diversity, plus batch throughput and single-query latency
+percentiles, for SVD, item-based, hybrid and popularity recommendations.
+The collaborative model is retrained on the training split. The default
+``surprise`` is the deployed model: surprise's SVD with the hyperparameters
+of the published svd_model.pkl. ``stored`` reuses the published factors,
+which have seen the held-out rows.
+"""
+import argparse
+import os
+import pickle
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from components.als import ALSTrainer
+from components.data_loader import load_svd_scorer, read_shopping_data
+from components.evaluation import Evaluator, holdout_split, popularity_recommender
+from components.item_neighbors import ItemNeighborIndex
+from components.recommendation_engine import RecommendationEngine
+from components.svd_scorer import SVDScorer
+from components.user_item_matrix import UserItemMatrix
+
+
+# Hyperparameters a fitted surprise SVD keeps as attributes
+SVD_PARAMS = ['n_factors', 'n_epochs', 'biased', 'init_mean', 'init_std_dev',
+              'lr_bu', 'lr_bi', 'lr_pu', 'lr_qi', 'reg_bu', 'reg_bi', 'reg_pu', 'reg_qi']
+
+
+def deployed_svd_params():
+    """Hyperparameters of the published surprise SVD (the notebook's defaults if there is none)"""
+    if not os.path.exists(config.SVD_MODEL_PATH):
+        return {'n_factors': config.SVD_FACTORS, 'n_epochs': 20, 'lr_all': 0.005, 'reg_all': 0.02}
+    with open(config.SVD_MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    return {name: getattr(model, name) for name in SVD_PARAMS}
+
+
+def train_model(kind, train_df, seed):
+    if kind == 'stored':
+        return load_svd_scorer(config.SVD_FACTORS_DIR, config.SVD_MODEL_PATH)
+    if kind == 'surprise':
+        from surprise import SVD, Dataset, Reader
+
+        ratings = train_df[['Customer ID', 'Item Purchased', 'interaction_score']].astype(
+            {'Item Purchased': str, 'interaction_score': float})
+        reader = Reader(rating_scale=(ratings['interaction_score'].min(), ratings['interaction_score'].max()))
+        model = SVD(random_state=seed, **deployed_svd_params())
+        model.fit(Dataset.load_from_df(ratings, reader).build_full_trainset())
+        return SVDScorer.from_surprise(model)
+    return ALSTrainer(n_factors=config.SVD_FACTORS, seed=seed).fit(UserItemMatrix.from_dataframe(train_df))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate recommendation quality and speed")
+    parser.add_argument('--data', default=config.SHOPPING_DATA_PATH)
+    parser.add_argument('--output', default=config.EVALUATION_REPORT_PATH)
+    parser.add_argument('--k', type=int, default=config.N_RECOMMENDATIONS)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--model', choices=['surprise', 'als', 'stored'], default='surprise',
+                        help="Default: the deployed surprise SVD configuration, retrained on the split")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--latency-queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    df = read_shopping_data(args.data)
+    train_df, test_df = holdout_split(df, args.test_size)
+    if test_df.empty:
+        print("Ningún cliente tiene al menos 2 interacciones: no hay historial para evaluar "
+              "recomendaciones personalizadas")
+        return
+    print(f"Clientes evaluados: {test_df['Customer ID'].nunique():,} "
+          f"(de {df['Customer ID'].nunique():,}; el resto tiene una sola interacción)")
+
+    item_neighbors = ItemNeighborIndex.build(UserItemMatrix.from_dataframe(train_df), k=config.ITEM_NEIGHBORS_K)
+    engine = RecommendationEngine(train_df, train_model(args.model, train_df, args.seed), None,
+                                  item_neighbors=item_neighbors)
+
+    evaluator = Evaluator(train_df, test_df, k=args.k, threads=args.threads)
+    report = evaluator.evaluate({
+        'svd': engine.get_svd_recommendations_batch,
+        'item': engine.get_history_based_recommendations_batch,
+        'hybrid': engine.get_hybrid_recommendations_batch,
+        'popular': popularity_recommender(train_df, engine.customer_items),
+    }, latency_queries=args.latency_queries, seed=args.seed)
+    report.insert(0, 'model', args.model)
+
+    report.to_csv(args.output)
+    with pd.option_context('display.max_columns', None, 'display.width', 200, 'display.precision', 4):
+        print(report)
+    print(f"Reporte guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Recompute the RFM analysis from the shopping data and write rfm_analysis.csv.
+
+Usage:
+    python export_rfm.py [--data data/shopping_behavior_updated.csv] [--output data/models/rfm_analysis.csv]
+
+The app computes RFM scores itself (components/rfm.py); this export is
+for campaign tools that read the CSV.
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from components.data_loader import read_shopping_data
+from components.rfm import RFMAnalysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the RFM analysis as CSV")
+    parser.add_argument('--data', default=config.SHOPPING_DATA_PATH)
+    parser.add_argument('--output', default=config.RFM_ANALYSIS_PATH)
+    args = parser.parse_args()
+
+    rfm = RFMAnalysis(read_shopping_data(args.data))
+    rfm.table().to_csv(args.output, index=False)
+    print(f"RFM de {rfm.n_customers:,} clientes -> {args.output}")
+    for segment, count in rfm.segment_counts().items():
+        print(f"  {segment}: {count:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Export the pickled surprise SVD into memory-mappable factor files.
+
+Usage:
+    python export_svd_factors.py [--model data/models/svd_model.pkl] [--no-promote | --output DIR]
+
+Only this step needs surprise installed; the app and batch jobs load the
+exported .npy files with SVDScorer.load. The factors are published as
+data/models/versions/<version>/svd_factors and then promoted like
+train_svd.py does, so files that running workers have memory-mapped are
+never overwritten.
+"""
+import argparse
+import os
+import pickle
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from components.svd_scorer import SVDScorer
+from train_svd import promote_version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export SVD factors for memory-mapped loading")
+    parser.add_argument('--model', default=config.SVD_MODEL_PATH)
+    parser.add_argument('--output', default=None,
+                        help="Write the factors only to this directory (no version, no promotion)")
+    parser.add_argument('--no-promote', action='store_true',
+                        help="Only write the versioned directory, keep the current factors")
+    args = parser.parse_args()
+    if args.output and os.path.realpath(args.output) == os.path.realpath(config.SVD_FACTORS_DIR):
+        parser.error("--output no puede ser el directorio de factores en uso; omítalo para publicar y promover")
+
+    with open(args.model, 'rb') as f:
+        scorer = SVDScorer.from_surprise(pickle.load(f))
+
+    version_dir = None
+    output = args.output
+    if output is None:
+        version = f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        version_dir = os.path.join(config.MODEL_VERSIONS_DIR, version)
+        output = os.path.join(version_dir, 'svd_factors')
+    scorer.save(output)
+    print(f"Factores exportados: {len(scorer.user_index):,} usuarios, {scorer.n_items:,} productos, "
+          f"{scorer.qi.shape[1]} factores -> {output}")
+
+    if version_dir is not None and not args.no_promote:
+        promote_version(version_dir)
+        print(f"Factores {version} promovidos a modelo actual")
+
+
+if __name__ == "__main__":
+    main()
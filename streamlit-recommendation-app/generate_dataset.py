@@ -0,0 +1,55 @@
+"""Generate a synthetic shopping dataset (shopping_behavior_updated.csv schema) for load testing.
+
+Usage:
+    python generate_dataset.py --rows 10000000 --output data/synthetic_10m.csv
+                               [--customers N] [--purchases-per-customer 4] [--items 25]
+                               [--categories 4] [--item-skew 1.0] [--customer-skew 0.5]
+                               [--affinity 0.6] [--chunk-size 500000] [--seed 42]
+
+Rows are generated and written one chunk at a time, so memory stays
+bounded by --chunk-size regardless of --rows. The same arguments
+(including --chunk-size) always produce the same file.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from components.synthetic_data import SyntheticShoppingGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic shopping dataset")
+    parser.add_argument('--rows', type=int, default=3900)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--customers', type=int, default=None,
+                        help="Customer population (default: rows / purchases-per-customer)")
+    parser.add_argument('--purchases-per-customer', type=float, default=4.0)
+    parser.add_argument('--items', type=int, default=25)
+    parser.add_argument('--categories', type=int, default=4)
+    parser.add_argument('--item-skew', type=float, default=1.0, help="Zipf exponent of item popularity")
+    parser.add_argument('--customer-skew', type=float, default=0.5, help="Zipf exponent of customer activity")
+    parser.add_argument('--affinity', type=float, default=0.6,
+                        help="Share of purchases drawn from the customer's favorite category")
+    parser.add_argument('--chunk-size', type=int, default=500000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    n_customers = args.customers or max(1, int(args.rows / args.purchases_per_customer))
+    generator = SyntheticShoppingGenerator(
+        n_customers=n_customers, n_items=args.items, n_categories=args.categories,
+        item_skew=args.item_skew, customer_skew=args.customer_skew,
+        category_affinity=args.affinity, seed=args.seed
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    start = time.time()
+    generator.write_csv(args.output, args.rows, args.chunk_size)
+    print(f"{args.rows:,} filas ({n_customers:,} clientes, {args.items:,} productos) -> {args.output} "
+          f"en {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+"""Headless HTTP service that serves recommendations from one RecommendationEngine.
+
+Usage:
+    python recommendation_service.py [--host 127.0.0.1] [--port 8000] [--max-batch 64] [--max-wait-ms 2]
+
+Endpoints (GET, JSON responses):
+    /health
+    /recommendations/svd?customer_id=1&top_n=5
+    /recommendations/hybrid?customer_id=1&top_n=5
+    /recommendations/item?customer_id=1&top_n=5       whole purchase history
+    /recommendations/similar?item=Blouse&top_n=5
+    /popular?category=Clothing&top_n=10&by=purchases  by: purchases, revenue, rating, trending
+POST /transactions with a JSON list of rows (the CSV columns) appends them.
+
+Data, model and indexes are loaded once at startup. Concurrent customer
+requests are micro-batched: each batch is scored with one matrix product
+in a worker thread, so the event loop keeps accepting connections.
+Results are kept in an LRU/TTL cache keyed by the data/model version,
+which changes with every appended batch.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from components.ann_index import IVFIndex
+from components.data_loader import (columnar_path, load_svd_scorer, read_batch_recommendations,
+                                    read_shopping_data)
+from components.incremental_data import IncrementalDataset
+from components.item_neighbors import ItemNeighborIndex
+from components.recommendation_cache import RecommendationCache
+from components.recommendation_engine import RecommendationEngine
+from components.svd_scorer import SVDScorer
+from utils.helpers import file_content_hash
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class MicroBatcher:
+    """Groups concurrent requests into one call of a batch scoring function.
+
+    A batch is flushed once it holds ``max_batch`` requests or ``max_wait``
+    seconds after its first request arrived, whichever comes first.
+    ``batch_fn(customer_ids, top_n)`` runs in ``executor`` and must return
+    one best-first list per customer; each request gets its own prefix.
+    """
+
+    def __init__(self, batch_fn, executor, max_batch=64, max_wait=0.002):
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, customer_id, top_n):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((customer_id, top_n, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            customer_ids = [customer_id for customer_id, _, _ in batch]
+            top_n = max(n for _, n, _ in batch)
+            self.batches += 1
+            self.requests += len(batch)
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, customer_ids, top_n)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, n, future), recs in zip(batch, results):
+                if not future.done():
+                    future.set_result(recs[:n])
+
+
+class RecommendationService:
+    """Routes HTTP requests to a shared RecommendationEngine"""
+
+    def __init__(self, engine, data_version, max_batch=64, max_wait=0.002, threads=4,
+                 max_body=config.SERVICE_MAX_BODY_BYTES):
+        self.engine = engine
+        self.data_version = data_version
+        self.max_body = max_body
+        # Ids are parsed per request so a malformed one never reaches a shared batch
+        self.integer_ids = pd.api.types.is_integer_dtype(engine.df['Customer ID'])
+        self.cache = RecommendationCache(config.RECOMMENDATION_CACHE_SIZE, config.RECOMMENDATION_CACHE_TTL)
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.batchers = {
+            'svd': MicroBatcher(engine.get_svd_recommendations_batch, self.executor, max_batch, max_wait),
+            'hybrid': MicroBatcher(engine.get_hybrid_recommendations_batch, self.executor, max_batch, max_wait),
+            'item': MicroBatcher(engine.get_history_based_recommendations_batch, self.executor,
+                                 max_batch, max_wait),
+        }
+        self.routes = {
+            '/health': self.health,
+            '/recommendations/svd': self.svd,
+            '/recommendations/hybrid': self.hybrid,
+            '/recommendations/item': self.item,
+            '/recommendations/similar': self.similar,
+            '/popular': self.popular,
+        }
+        self.post_routes = {'/transactions': self.transactions}
+        # Columns a posted batch must carry: the raw ones, not the derived
+        self.transaction_columns = [col for col in engine.df.columns
+                                    if col not in ('Customer_Segment', 'interaction_score')]
+        self.base_version = data_version
+        self.appended_batches = 0
+        self.append_lock = asyncio.Lock()
+        self.started = time.time()
+        # The event loop only keeps weak references to tasks
+        self.tasks = []
+
+    def start_batchers(self):
+        self.tasks = [asyncio.create_task(batcher.run()) for batcher in self.batchers.values()]
+
+    async def start(self, host, port):
+        self.start_batchers()
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def stop(self):
+        """Cancel the batcher tasks and release the worker threads"""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.executor.shutdown(wait=False)
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 loop with keep-alive; GET, plus POST for appends"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length, error = self.content_length(headers)
+                if error is not None:
+                    # The body is left unread, so the connection cannot be reused
+                    self.write_response(writer, *error, keep_alive=False)
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    status, payload, version = 400, {'error': 'Malformed request line'}, 'HTTP/1.0'
+                else:
+                    method, target, version = parts
+                    status, payload = await self.dispatch(method, target, body)
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def content_length(self, headers):
+        """Declared body size, or an error (status, payload) for an invalid or oversized one"""
+        value = headers.get('content-length') or '0'
+        if not (value.isascii() and value.isdigit()):
+            return 0, (400, {'error': f"Invalid Content-Length {value!r}"})
+        length = int(value)
+        if length > self.max_body:
+            return 0, (413, {'error': f"Body of {length} bytes exceeds the {self.max_body} byte limit"})
+        return length, None
+
+    @staticmethod
+    def write_response(writer, status, payload, keep_alive):
+        body = json.dumps(payload, default=_to_json).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+
+    async def dispatch(self, method, target, body=b''):
+        if method not in ('GET', 'POST'):
+            return 405, {'error': 'Only GET and POST are supported'}
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        routes = self.routes if method == 'GET' else self.post_routes
+        handler = routes.get(path)
+        if handler is None:
+            if path in self.routes or path in self.post_routes:
+                return 405, {'error': f"{method} is not supported on {path}"}
+            return 404, {'error': f"Unknown path {url.path}"}
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if method == 'POST':
+                return 200, await handler(params, body)
+            return 200, await handler(params)
+        except (KeyError, ValueError) as e:
+            return 400, {'error': f"Invalid or missing parameter: {e}"}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    async def health(self, params):
+        return {
+            'status': 'ok',
+            'uptime_s': round(time.time() - self.started, 1),
+            'model_loaded': self.engine.svd_scorer is not None,
+            'data_version': self.data_version,
+            'cache': self.cache.stats(),
+            'batches': {name: {'batches': b.batches, 'requests': b.requests}
+                        for name, b in self.batchers.items()},
+        }
+
+    async def svd(self, params):
+        customer_id, top_n = self.customer_id(params), _top_n(params)
+        # Offline batch results need no scoring at all
+        precomputed = self.engine.precomputed_recommendations.get(customer_id)
+        if precomputed is not None and len(precomputed) >= top_n:
+            return _recommendations(customer_id, precomputed[:top_n])
+        return _recommendations(customer_id, await self.cached('svd', customer_id, top_n))
+
+    async def hybrid(self, params):
+        customer_id, top_n = self.customer_id(params), _top_n(params)
+        return _recommendations(customer_id, await self.cached('hybrid', customer_id, top_n,
+                                                               alpha=config.HYBRID_ALPHA))
+
+    async def item(self, params):
+        customer_id, top_n = self.customer_id(params), _top_n(params)
+        return _recommendations(customer_id, await self.cached('item', customer_id, top_n))
+
+    async def cached(self, mode, customer_id, top_n, alpha=None):
+        """Serve from the result cache, micro-batching only the misses"""
+        # An append while the batch runs bumps data_version; the result belongs to this one
+        version = self.data_version
+        recs = self.cache.get(version, customer_id, mode, top_n, alpha)
+        if recs is None:
+            recs = await self.batchers[mode].submit(customer_id, top_n)
+            # Fallback lists for customers without history would shadow later personalized ones
+            if self.engine.is_personalized(customer_id, mode):
+                self.cache.put(version, customer_id, mode, top_n, recs, alpha)
+        return recs
+
+    def customer_id(self, params):
+        return _customer_id(params['customer_id'], self.integer_ids)
+
+    async def similar(self, params):
+        item, top_n = params['item'], _top_n(params)
+        recs = self.engine.get_item_based_recommendations(item, top_n)
+        return {'item': item, 'recommendations': [{'item': i, 'score': s} for i, s in recs]}
+
+    async def transactions(self, params, body):
+        """Append posted transaction rows to the engine's dataset"""
+        rows = json.loads(body or b'[]')
+        if not isinstance(rows, list) or not rows:
+            raise ValueError('body must be a non-empty JSON list of transaction rows')
+        batch = pd.DataFrame(rows)
+        missing = [col for col in self.transaction_columns if col not in batch.columns]
+        if missing:
+            raise ValueError(f"rows are missing columns {missing}")
+        batch = batch[self.transaction_columns]
+        if self.integer_ids:
+            batch['Customer ID'] = [_customer_id(value) for value in batch['Customer ID']]
+
+        # One append at a time; scoring keeps running against the swapped-in tables
+        async with self.append_lock:
+            loop = asyncio.get_running_loop()
+            renormalized = await loop.run_in_executor(self.executor, self.engine.append, batch)
+            self.appended_batches += 1
+            # Cached results were computed from the old rows
+            self.data_version = f"{self.base_version}+{self.appended_batches}"
+        return {'rows': len(batch), 'total_rows': self.engine.data_index.n_rows,
+                'renormalized': renormalized, 'data_version': self.data_version}
+
+    async def popular(self, params):
+        category, top_n = params['category'], _top_n(params, default=10)
+        by = params.get('by', 'purchases')
+        # A slice of the precomputed popularity ranking, cheap enough for the event loop
+        items = self.engine.get_popular_items_by_category(category, top_n, by)
+        return {'category': category, 'by': by, 'items': items}
+
+
+def _customer_id(value, integer_ids=True):
+    """Parse a customer_id parameter to the dataset's id type (ValueError if it cannot be)"""
+    if not integer_ids:
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"customer_id must be an integer, got {value!r}") from None
+
+
+def _top_n(params, default=config.N_RECOMMENDATIONS):
+    top_n = int(params.get('top_n', default))
+    if top_n <= 0:
+        raise ValueError('top_n must be positive')
+    return top_n
+
+
+def _recommendations(customer_id, recs):
+    return {'customer_id': customer_id,
+            'recommendations': [{'item': item, 'score': score} for item, score in recs]}
+
+
+def _to_json(value):
+    # NumPy scalars (counts, means) from the engine
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def build_engine():
+    """Load data, model and indexes once, the same artifacts the Streamlit app uses.
+
+    The engine reads from an IncrementalDataset, so POST /transactions can
+    append rows without a reload.
+    """
+    dataset = IncrementalDataset(read_shopping_data(config.SHOPPING_DATA_PATH), config.POPULARITY_HALF_LIFE)
+    svd_scorer = None
+    if os.path.exists(config.SVD_FACTORS_DIR) or os.path.exists(config.SVD_MODEL_PATH):
+        svd_scorer = load_svd_scorer(config.SVD_FACTORS_DIR, config.SVD_MODEL_PATH)
+    item_similarity_df = (pd.read_csv(config.ITEM_SIMILARITY_PATH, index_col=0)
+                          if os.path.exists(config.ITEM_SIMILARITY_PATH) else None)
+    item_neighbors = (ItemNeighborIndex.load(config.ITEM_NEIGHBORS_PATH)
+                      if os.path.exists(config.ITEM_NEIGHBORS_PATH) else None)
+    ann_index = IVFIndex.load(config.ANN_INDEX_PATH) if os.path.exists(config.ANN_INDEX_PATH) else None
+    model_version = svd_scorer.model_version if svd_scorer is not None else None
+    batch_recommendations = (read_batch_recommendations(config.BATCH_RECOMMENDATIONS_PATH, model_version)
+                             if os.path.exists(config.BATCH_RECOMMENDATIONS_PATH) else None)
+
+    return RecommendationEngine.from_dataset(dataset, svd_scorer, item_similarity_df,
+                                             precomputed_recommendations=batch_recommendations,
+                                             item_neighbors=item_neighbors, ann_index=ann_index)
+
+
+def data_version():
+    """Content hash of the files the engine is built from (same set as the Streamlit app)"""
+    return file_content_hash(
+        config.SHOPPING_DATA_PATH,
+        columnar_path(config.SHOPPING_DATA_PATH),
+        config.SVD_MODEL_PATH,
+        *SVDScorer.version_files(config.SVD_FACTORS_DIR),
+        config.ITEM_SIMILARITY_PATH,
+        config.ITEM_NEIGHBORS_PATH,
+        config.ANN_INDEX_PATH,
+        config.BATCH_RECOMMENDATIONS_PATH
+    )
+
+
+async def serve(args):
+    service = RecommendationService(build_engine(), data_version(), args.max_batch,
+                                    args.max_wait_ms / 1000, args.threads)
+    server = await service.start(args.host, args.port)
+    print(f"Servicio de recomendaciones escuchando en http://{args.host}:{args.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recommendations over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Run the micro-benchmarks in benchmarks/ and store the results per commit.
+
+Usage:
+    python run_benchmarks.py [--full] [--scales 3900 100000] [--filter svd]
+                             [--repeat 5] [--compare REF] [--threshold 1.2]
+
+The suite follows asv's layout (classes with ``params``/``setup`` and
+``time_*`` methods), so ``asv run`` can use it unchanged; this script is a
+dependency-free runner for it. Each run writes
+benchmarks/results/<commit>.json (``-dirty`` when the tree has local
+changes). ``--compare`` takes a commit or a results file and lists the
+benchmarks that got slower than ``--threshold`` times the reference.
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import datetime
+
+import numpy as np
+from streamlit.config import get_config_options
+from streamlit.logger import set_log_level
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, 'src'))
+
+from benchmarks import datasets
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+MODULES = ['benchmarks.bench_data', 'benchmarks.bench_engine', 'benchmarks.bench_visualizations']
+
+
+def git_commit():
+    """Short hash of HEAD, suffixed with -dirty when there are local changes"""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+        dirty = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no', '.'],
+                                        cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{commit}-dirty" if dirty else commit
+
+
+def discover(name_filter=None):
+    """(name, class, method name) for every time_* benchmark in the suite"""
+    benchmarks = []
+    for module_name in MODULES:
+        module = importlib.import_module(module_name)
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method in sorted(m for m in dir(cls) if m.startswith('time_')):
+                name = f"{module_name.split('.')[-1]}.{class_name}.{method}"
+                if name_filter is None or name_filter in name:
+                    benchmarks.append((name, cls, method))
+    return benchmarks
+
+
+def time_call(func, repeat):
+    """Per-call seconds over ``repeat`` rounds, each sized by timeit's autorange"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    samples = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    return {'median': float(np.median(samples)), 'min': float(samples.min()),
+            'iqr': float(np.subtract(*np.percentile(samples, [75, 25]))), 'number': number}
+
+
+def run(benchmarks, scales, repeat):
+    results = {}
+    for cls in dict.fromkeys(cls for _, cls, _ in benchmarks):
+        methods = [(name, method) for name, c, method in benchmarks if c is cls]
+        for n_rows in scales:
+            instance = cls()
+            try:
+                if hasattr(instance, 'setup'):
+                    instance.setup(n_rows)
+            except Exception as e:
+                print(f"  {cls.__name__} ({n_rows:,} filas): setup falló: {e}")
+                continue
+            for name, method in methods:
+                key = f"{name}[{n_rows}]"
+                try:
+                    results[key] = time_call(lambda: getattr(instance, method)(n_rows), repeat)
+                except Exception as e:
+                    print(f"  {key}: error: {e}")
+                    continue
+                print(f"  {key}: {results[key]['median'] * 1000:.3f} ms")
+    return results
+
+
+def load_results(ref):
+    """Results of a commit (or a results file path)"""
+    path = ref if os.path.exists(ref) else os.path.join(RESULTS_DIR, f"{ref}.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current, reference, threshold):
+    """(name, reference median, current median, ratio) for every regression"""
+    regressions = []
+    for key, result in current.items():
+        if key in reference and reference[key]['median'] > 0:
+            ratio = result['median'] / reference[key]['median']
+            if ratio > threshold:
+                regressions.append((key, reference[key]['median'], result['median'], ratio))
+    return sorted(regressions, key=lambda r: -r[3])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the recommendation app micro-benchmarks")
+    parser.add_argument('--scales', type=int, nargs='+', default=None,
+                        help=f"Row counts (default: {datasets.SCALES})")
+    parser.add_argument('--full', action='store_true', help=f"Use {datasets.FULL_SCALES}")
+    parser.add_argument('--filter', default=None, help="Only benchmarks whose name contains this text")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--compare', default=None, help="Commit or results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args()
+
+    scales = args.scales or (datasets.FULL_SCALES if args.full else datasets.SCALES)
+    benchmarks = discover(args.filter)
+    commit = git_commit()
+    print(f"{len(benchmarks)} benchmarks x {len(scales)} escalas, commit {commit}")
+
+    # plot_* calls run outside a Streamlit session; its bare-mode warnings are noise here
+    # (parse Streamlit's config first: parsing resets the level from logger.level)
+    get_config_options()
+    set_log_level('error')
+    # Read the reference before this run's file (possibly the same one) is rewritten
+    reference = load_results(args.compare)['results'] if args.compare else None
+    try:
+        results = run(benchmarks, scales, args.repeat)
+    finally:
+        # The scaled CSV/Parquet copies can be large; do not leave them in the temp dir
+        datasets.cleanup()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f"{commit}.json")
+    # Merge with earlier runs of the same commit (e.g. other scales or filters)
+    stored = load_results(output_path)['results'] if os.path.exists(output_path) else {}
+    stored.update(results)
+    payload = {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'platform': platform.platform(), 'processor': platform.processor(),
+                    'cpus': os.cpu_count(), 'python': platform.python_version(), 'numpy': np.__version__},
+        'results': stored,
+    }
+    with open(output_path, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    print(f"Resultados guardados en {output_path}")
+
+    if args.compare:
+        regressions = compare(results, reference, args.threshold)
+        if not regressions:
+            print(f"Sin regresiones respecto a {args.compare} (umbral {args.threshold:.2f}x)")
+        for key, before, after, ratio in regressions:
+            print(f"  REGRESIÓN {key}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,18 +14,36 @@ except ImportError:
     class Config:
         SHOPPING_DATA_PATH = "../data/shopping_behavior_updated.csv"
         SVD_MODEL_PATH = "../data/models/svd_model.pkl"
+        SVD_FACTORS_DIR = "../data/models/svd_factors"
         ITEM_SIMILARITY_PATH = "../data/models/item_similarity_matrix.csv"
+        ITEM_NEIGHBORS_PATH = "../data/models/item_neighbors.npz"
+        ANN_INDEX_PATH = "../data/models/ann_index.npz"
         RFM_ANALYSIS_PATH = "../data/models/rfm_analysis.csv"
+        BATCH_RECOMMENDATIONS_PATH = "../data/models/batch_recommendations.parquet"
+        EVALUATION_REPORT_PATH = "../data/models/evaluation_report.csv"
         APP_TITLE = "Sistema de Recomendación E-commerce"
         APP_DESCRIPTION = "Análisis de comportamiento de compra y recomendaciones personalizadas"
         PAGE_ICON = "🛒"
+        HYBRID_ALPHA = 0.6
+        RECOMMENDATION_CACHE_SIZE = 10000
+        RECOMMENDATION_CACHE_TTL = 600
+        TABLE_PAGE_SIZE = 25
+        POPULARITY_HALF_LIFE = 50000
+        EXPORT_CHUNK_SIZE = 100000
     
     config = Config()
 
 # Import custom components
-from components.data_loader import DataLoader
+from components.data_loader import DataLoader, columnar_path
 from components.recommendation_engine import RecommendationEngine
 from components.visualizations import Visualizations
+from components.aggregate_cube import AggregateCube
+from components.rfm import RFMAnalysis
+from components.popularity import PopularityIndex
+from components.recommendation_cache import RecommendationCache
+from components.paginated_table import PaginatedTable
+from components.svd_scorer import SVDScorer
+from utils.helpers import create_download_button, create_summary_stats, file_content_hash
 
 # Page configuration
 st.set_page_config(
@@ -73,38 +91,87 @@ def initialize_session_state():
     if 'visualizations' not in st.session_state:
         st.session_state.visualizations = None
 
-@st.cache_data
 def load_all_data():
     """Load all necessary data"""
     data_loader = DataLoader()
     
-    # Load main dataset
-    df = data_loader.load_shopping_data()
-    if df is None:
-        return None, None, None, None
+    # Load main dataset with its lookup index; the index holds the frame
+    data_index = data_loader.load_data_index()
+    if data_index is None:
+        return None, None, None, None, None, None, None
     
     # Load other components
     item_similarity_df = data_loader.load_item_similarity()
-    rfm_df = data_loader.load_rfm_analysis()
+    item_neighbors = data_loader.load_item_neighbors()
+    ann_index = data_loader.load_ann_index()
     svd_model = data_loader.load_svd_model()
+    batch_recommendations = data_loader.load_batch_recommendations(
+        svd_model.model_version if svd_model is not None else None
+    )
     
-    return df, item_similarity_df, rfm_df, svd_model
+    return (data_index.df, data_index, item_similarity_df, item_neighbors, ann_index, svd_model,
+            batch_recommendations)
+
+@st.cache_resource(max_entries=2)
+def load_app_components(data_version):
+    """Load data and build the engine and visualizations once per data/model version.
+    
+    Shared by every session in the process; ``data_version`` is a content
+    hash of the input files, so a changed CSV or model builds a fresh set.
+    """
+    # Only reached on a new version: drop loader caches so files are re-read
+    DataLoader.clear_caches()
+    
+    (df, data_index, item_similarity_df, item_neighbors, ann_index, svd_model,
+     batch_recommendations) = load_all_data()
+    if df is None:
+        return None
+    
+    cube = AggregateCube(df)
+    # Computed from the transactions instead of the static rfm_analysis.csv
+    rfm = RFMAnalysis(df)
+    # Shared by the popular-items table and the top products chart
+    popularity = PopularityIndex(df, config.POPULARITY_HALF_LIFE)
+    rec_engine = RecommendationEngine(df, svd_model, item_similarity_df, batch_recommendations,
+                                      data_index=data_index, item_neighbors=item_neighbors,
+                                      ann_index=ann_index, popularity=popularity)
+    viz = Visualizations(df, data_index, cube, config.TABLE_PAGE_SIZE, popularity)
+    return df, rfm, rec_engine, viz
+
+@st.cache_resource
+def get_recommendation_cache():
+    """Process-wide recommendation cache shared by every session"""
+    return RecommendationCache(config.RECOMMENDATION_CACHE_SIZE, config.RECOMMENDATION_CACHE_TTL)
+
+def get_data_version():
+    """Content hash of every file the app components are built from"""
+    return file_content_hash(
+        config.SHOPPING_DATA_PATH,
+        columnar_path(config.SHOPPING_DATA_PATH),
+        config.SVD_MODEL_PATH,
+        *SVDScorer.version_files(config.SVD_FACTORS_DIR),
+        config.ITEM_SIMILARITY_PATH,
+        config.ITEM_NEIGHBORS_PATH,
+        config.ANN_INDEX_PATH,
+        config.BATCH_RECOMMENDATIONS_PATH
+    )
 
 def show_overview_page(df, viz):
     """Show overview/dashboard page"""
     st.markdown('<h2 class="section-header">Resumen del Dataset</h2>', unsafe_allow_html=True)
     
-    # Key metrics
+    # Key metrics, read from the pre-aggregated cube
+    stats = create_summary_stats(df, viz.cube)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Clientes", f"{df['Customer ID'].nunique():,}")
+        st.metric("Total Clientes", f"{stats['total_customers']:,}")
     with col2:
-        st.metric("Total Productos", f"{df['Item Purchased'].nunique():,}")
+        st.metric("Total Productos", f"{stats['total_products']:,}")
     with col3:
-        st.metric("Total Transacciones", f"{len(df):,}")
+        st.metric("Total Transacciones", f"{stats['total_transactions']:,}")
     with col4:
-        st.metric("Ingresos Totales", f"${df['Purchase Amount (USD)'].sum():,.2f}")
+        st.metric("Ingresos Totales", f"${stats['total_revenue']:,.2f}")
     
     # Visualizations
     col1, col2 = st.columns(2)
@@ -124,7 +191,7 @@ def show_overview_page(df, viz):
     st.markdown('<h3 class="section-header">Tendencias Estacionales</h3>', unsafe_allow_html=True)
     viz.plot_seasonal_trends()
 
-def show_customer_analysis_page(df, rec_engine, viz):
+def show_customer_analysis_page(df, rec_engine, viz, data_version, rfm=None):
     """Show customer analysis page"""
     st.markdown('<h2 class="section-header">Análisis de Cliente</h2>', unsafe_allow_html=True)
     
@@ -140,13 +207,17 @@ def show_customer_analysis_page(df, rec_engine, viz):
             st.markdown('<h3 class="section-header">Perfil del Cliente</h3>', unsafe_allow_html=True)
             viz.plot_customer_profile_metrics(profile)
             
+            rfm_record = rfm.customer(selected_customer) if rfm is not None else None
+            if rfm_record is not None:
+                viz.plot_customer_rfm(rfm_record)
+            
             # Purchase history
             st.markdown('<h3 class="section-header">Historial de Compras Reciente</h3>', unsafe_allow_html=True)
             history_df = pd.DataFrame({
                 'Producto': profile['purchase_history'],
                 'Índice': range(1, len(profile['purchase_history']) + 1)
             })
-            st.dataframe(history_df, use_container_width=True)
+            PaginatedTable(history_df, page_size=config.TABLE_PAGE_SIZE).render('purchase_history')
             
             # Personalized recommendations
             st.markdown('<h3 class="section-header">Recomendaciones Personalizadas</h3>', unsafe_allow_html=True)
@@ -161,21 +232,44 @@ def show_customer_analysis_page(df, rec_engine, viz):
             
             if st.button("Generar Recomendaciones"):
                 with st.spinner("Generando recomendaciones..."):
+                    cache = get_recommendation_cache()
                     if rec_type == "Híbrido (Recomendado)":
-                        recommendations = rec_engine.get_hybrid_recommendations(selected_customer, num_recommendations)
+                        recommendations = cache.get_or_compute(
+                            data_version, selected_customer, 'hybrid', num_recommendations,
+                            rec_engine.get_hybrid_recommendations, alpha=config.HYBRID_ALPHA
+                        )
                     elif rec_type == "Solo Colaborativo (SVD)":
-                        recommendations = rec_engine.get_svd_recommendations(selected_customer, num_recommendations)
+                        recommendations = cache.get_or_compute(
+                            data_version, selected_customer, 'svd', num_recommendations,
+                            rec_engine.get_svd_recommendations
+                        )
                     else:
-                        # For item-based, we'll use the first item from customer's history
-                        if profile['purchase_history']:
-                            recommendations = rec_engine.get_item_based_recommendations(
-                                profile['purchase_history'][0], num_recommendations
-                            )
-                        else:
-                            recommendations = []
+                        # Item-based over the customer's whole purchase history
+                        recommendations = cache.get_or_compute(
+                            data_version, selected_customer, 'item', num_recommendations,
+                            rec_engine.get_history_based_recommendations
+                        )
+                        if not recommendations:
+                            st.info("Ningún producto comparte compradores con el historial de este cliente; "
+                                    "se muestran los más populares (Score = número de compras).")
+                            recommendations = rec_engine.get_popular_fallback(num_recommendations, selected_customer)
+                            rec_type = "Populares (sin similitud disponible)"
                     
                     viz.plot_recommendations_table(recommendations, f"Recomendaciones {rec_type}")
 
+    if rfm is not None:
+        # Segment listing: only the visible page is sent; the export is written on click
+        st.markdown('<h3 class="section-header">Clientes por Segmento RFM</h3>', unsafe_allow_html=True)
+        segments = ['Todos'] + rfm.segments()
+        selected_segment = st.selectbox("Selecciona un Segmento:", segments)
+        segment = None if selected_segment == 'Todos' else selected_segment
+        segment_table = viz.plot_rfm_segment_table(rfm, segment)
+        create_download_button(
+            segment_table, f"clientes_{selected_segment.lower().replace(' ', '_')}.csv",
+            f"Exportar {len(segment_table):,} clientes (CSV)", key='rfm_segment_export',
+            chunk_size=config.EXPORT_CHUNK_SIZE
+        )
+
 def show_product_analysis_page(df, rec_engine, viz):
     """Show product analysis page"""
     st.markdown('<h2 class="section-header">Análisis de Productos</h2>', unsafe_allow_html=True)
@@ -192,17 +286,22 @@ def show_product_analysis_page(df, rec_engine, viz):
         viz.plot_top_products(category=selected_category)
         
         # Popular items in category
-        popular_items = rec_engine.get_popular_items_by_category(selected_category, 10)
+        rankings = {'Compras': 'purchases', 'Ingresos': 'revenue', 'Rating': 'rating', 'Tendencia': 'trending'}
+        ranking = st.radio("Ordenar por:", list(rankings), horizontal=True)
+        popular_items = rec_engine.get_popular_items_by_category(selected_category, 10, rankings[ranking])
         
         if popular_items:
             st.markdown('<h3 class="section-header">Detalles de Productos Populares</h3>', unsafe_allow_html=True)
             
-            items_df = pd.DataFrame(popular_items)
-            items_df.columns = ['Producto', 'Compras', 'Precio Promedio', 'Rating Promedio']
-            items_df['Precio Promedio'] = items_df['Precio Promedio'].apply(lambda x: f"${x:.2f}")
-            items_df['Rating Promedio'] = items_df['Rating Promedio'].apply(lambda x: f"{x:.2f}/5")
+            items_df = pd.DataFrame(popular_items).rename(columns={
+                'item': 'Producto', 'purchases': 'Compras', 'revenue': 'Ingresos',
+                'avg_price': 'Precio Promedio', 'avg_rating': 'Rating Promedio'
+            })
             
-            st.dataframe(items_df, use_container_width=True)
+            PaginatedTable(
+                items_df, {'Ingresos': '$%.2f', 'Precio Promedio': '$%.2f', 'Rating Promedio': '%.2f/5'},
+                config.TABLE_PAGE_SIZE
+            ).render('popular_items')
     
     # Item similarity analysis
     st.markdown('<h3 class="section-header">Productos Similares</h3>', unsafe_allow_html=True)
@@ -212,9 +311,17 @@ def show_product_analysis_page(df, rec_engine, viz):
     
     if selected_product and st.button("Buscar Productos Similares"):
         similar_items = rec_engine.get_item_based_recommendations(selected_product, 10)
-        viz.plot_recommendations_table(similar_items, f"Productos similares a {selected_product}")
+        if similar_items:
+            viz.plot_recommendations_table(similar_items, f"Productos similares a {selected_product}")
+        else:
+            category = rec_engine.data_index.item_info(selected_product)['category']
+            st.info(f"Ningún producto comparte compradores con {selected_product}; se muestran los más "
+                    f"populares de {category} (Score = número de compras).")
+            popular = [(item, score) for item, score in rec_engine.get_popular_fallback(11, category=category)
+                       if item != selected_product][:10]
+            viz.plot_recommendations_table(popular, f"Populares en {category} (sin similitud disponible)")
 
-def show_model_performance_page(df):
+def show_model_performance_page(df, user_item_matrix):
     """Show model performance and statistics"""
     st.markdown('<h2 class="section-header">Rendimiento del Modelo</h2>', unsafe_allow_html=True)
     
@@ -237,19 +344,34 @@ def show_model_performance_page(df):
         st.write(f"- Compras previas promedio: {df['Previous Purchases'].mean():.1f}")
     
     # Sparsity analysis
-    user_item_matrix = df.pivot_table(
-        index='Customer ID',
-        columns='Item Purchased', 
-        values='interaction_score',
-        aggfunc='mean'
-    ).fillna(0)
-    
-    sparsity = (1 - (user_item_matrix > 0).sum().sum() / (user_item_matrix.shape[0] * user_item_matrix.shape[1])) * 100
+    n_users, n_items = user_item_matrix.shape
     
     st.markdown('<h3 class="section-header">Análisis de Matriz Usuario-Producto</h3>', unsafe_allow_html=True)
-    st.write(f"- Dimensiones de la matriz: {user_item_matrix.shape[0]:,} usuarios × {user_item_matrix.shape[1]:,} productos")
-    st.write(f"- Sparsity: {sparsity:.2f}%")
-    st.write(f"- Interacciones totales: {(user_item_matrix > 0).sum().sum():,}")
+    st.write(f"- Dimensiones de la matriz: {n_users:,} usuarios × {n_items:,} productos")
+    st.write(f"- Sparsity: {user_item_matrix.sparsity:.2f}%")
+    st.write(f"- Interacciones totales: {user_item_matrix.n_interactions:,}")
+    
+    # Recommendation cache
+    stats = get_recommendation_cache().stats()
+    
+    st.markdown('<h3 class="section-header">Caché de Recomendaciones</h3>', unsafe_allow_html=True)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Aciertos", f"{stats['hits']:,}")
+    with col2:
+        st.metric("Fallos", f"{stats['misses']:,}")
+    with col3:
+        st.metric("Tasa de Aciertos", f"{stats['hit_rate']:.1%}")
+    with col4:
+        st.metric("Entradas", f"{stats['entries']:,}")
+    
+    # Offline evaluation (written by evaluate_models.py)
+    if os.path.exists(config.EVALUATION_REPORT_PATH):
+        st.markdown('<h3 class="section-header">Evaluación Offline por Modo</h3>', unsafe_allow_html=True)
+        report = pd.read_csv(config.EVALUATION_REPORT_PATH, index_col=0)
+        st.dataframe(report.round(4), use_container_width=True)
+    else:
+        st.info("Ejecuta `python evaluate_models.py` para generar el reporte de calidad y latencia.")
 
 def main():
     """Main application"""
@@ -259,17 +381,16 @@ def main():
     st.markdown(f'<h1 class="main-header">{config.APP_TITLE}</h1>', unsafe_allow_html=True)
     st.markdown(f'<p style="text-align: center; color: #666;">{config.APP_DESCRIPTION}</p>', unsafe_allow_html=True)
     
-    # Load data
+    # Load data and components (cached per data/model version)
     with st.spinner("Cargando datos y modelos..."):
-        df, item_similarity_df, rfm_df, svd_model = load_all_data()
+        data_version = get_data_version()
+        components = load_app_components(data_version)
     
-    if df is None:
+    if components is None:
         st.error("Error al cargar los datos. Por favor, verifica que todos los archivos estén en su lugar.")
         return
     
-    # Initialize components
-    rec_engine = RecommendationEngine(df, svd_model, item_similarity_df)
-    viz = Visualizations(df)
+    df, rfm, rec_engine, viz = components
     
     # Sidebar navigation
     st.sidebar.title("Navegación")
@@ -286,11 +407,11 @@ def main():
     if pages[selected_page] == "overview":
         show_overview_page(df, viz)
     elif pages[selected_page] == "customers":
-        show_customer_analysis_page(df, rec_engine, viz)
+        show_customer_analysis_page(df, rec_engine, viz, data_version, rfm)
     elif pages[selected_page] == "products":
         show_product_analysis_page(df, rec_engine, viz)
     elif pages[selected_page] == "performance":
-        show_model_performance_page(df)
+        show_model_performance_page(df, rec_engine.user_item_matrix)
     
     # Footer
     st.sidebar.markdown("---")
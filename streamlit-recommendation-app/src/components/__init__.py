@@ -1 +0,0 @@
-   pip install streamlit
\ No newline at end of file
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# Frequency of Purchases is included so the gender/frequency chart reads from the cube too
+CUBE_DIMENSIONS = ['Category', 'Season', 'Customer_Segment', 'Gender', 'Frequency of Purchases', 'Item Purchased']
+CUBE_MEASURES = ['purchases', 'amount_sum', 'amount_count', 'rating_sum', 'rating_count']
+
+
+class AggregateCube:
+    """Counts and sums of the shopping data by every chart dimension, built in one groupby.
+
+    Each cell holds additive measures (purchases, amount and rating sums and
+    counts), so any roll-up is a sum over the small cell table and means are
+    derived afterwards. Per-customer spend is kept separately for the
+    lifetime value chart. ``append`` adds a batch without regrouping old rows.
+    Cells are keyed by plain values; categorical dimensions (e.g. the age
+    segments) get their category order back in every roll-up.
+    """
+
+    def __init__(self, df):
+        self.dimensions = [col for col in CUBE_DIMENSIONS if col in df.columns]
+        self.categories = {col: df[col].dtype for col in self.dimensions
+                           if isinstance(df[col].dtype, pd.CategoricalDtype)}
+        self.cells = self._cells(df, self.dimensions)
+        self.customer_spend = self._customer_spend(df)
+        self._rollups = {}
+
+    @staticmethod
+    def _cells(df, dimensions):
+        # dropna=False keeps rows with a missing dimension in the other roll-ups
+        cells = df.groupby(dimensions, observed=True, sort=False, dropna=False).agg(
+            purchases=('Customer ID', 'size'),
+            amount_sum=('Purchase Amount (USD)', 'sum'),
+            amount_count=('Purchase Amount (USD)', 'count'),
+            rating_sum=('Review Rating', 'sum'),
+            rating_count=('Review Rating', 'count')
+        )
+        cells.index = pd.MultiIndex.from_arrays(
+            [cells.index.get_level_values(col).astype(object) for col in dimensions], names=dimensions
+        )
+        return cells.astype({'purchases': np.int64, 'amount_count': np.int64, 'rating_count': np.int64,
+                             'amount_sum': np.float64, 'rating_sum': np.float64})
+
+    @staticmethod
+    def _customer_spend(df):
+        return (df.groupby('Customer ID', observed=True, sort=False)['Purchase Amount (USD)']
+                .sum().astype(np.float64))
+
+    def append(self, batch):
+        """Add preprocessed rows; only the batch is grouped"""
+        self.cells = self.cells.add(self._cells(batch, self.dimensions), fill_value=0).astype(self.cells.dtypes)
+        self.customer_spend = self.customer_spend.add(self._customer_spend(batch), fill_value=0)
+        self._rollups = {}
+
+    def rollup(self, dimensions, filters=None):
+        """Measures summed over every other dimension, plus avg_amount and avg_rating.
+
+        ``filters`` maps dimensions to the single value to keep
+        (e.g. ``{'Category': 'Clothing'}``). Results are memoized.
+        """
+        filters = filters or {}
+        key = (tuple(dimensions), tuple(sorted(filters.items())))
+        if key not in self._rollups:
+            cells = self.cells.reset_index()
+            for name, value in filters.items():
+                cells = cells[cells[name] == value]
+            table = self._category_order(cells.groupby(list(dimensions), sort=True)[CUBE_MEASURES].sum())
+            table['avg_amount'] = table['amount_sum'] / table['amount_count']
+            table['avg_rating'] = table['rating_sum'] / table['rating_count']
+            self._rollups[key] = table
+        return self._rollups[key]
+
+    def _category_order(self, table):
+        """Restore the categorical dtype of roll-up levels and sort them in category order"""
+        names = list(table.index.names)
+        if not any(name in self.categories for name in names):
+            return table
+        levels = [pd.Categorical(table.index.get_level_values(name), dtype=self.categories[name])
+                  if name in self.categories else table.index.get_level_values(name) for name in names]
+        if len(levels) == 1:
+            table.index = pd.CategoricalIndex(levels[0], name=names[0])
+        else:
+            table.index = pd.MultiIndex.from_arrays(levels, names=names)
+        return table.sort_index()
+
+    def counts(self, dimension, filters=None):
+        """Purchases per value of one dimension, most purchased first (like ``value_counts``)"""
+        return self.rollup([dimension], filters)['purchases'].sort_values(ascending=False, kind='stable')
+
+    def crosstab(self, rows, columns):
+        """Purchases by two dimensions as a rows x columns table (like ``groupby().size().unstack()``)"""
+        return self.rollup([rows, columns])['purchases'].unstack(fill_value=0)
+
+    def customer_value_histogram(self, bins=30):
+        """(counts, bin_edges) of total spend per customer"""
+        return np.histogram(self.customer_spend.to_numpy(), bins=bins)
+
+    def summary_stats(self):
+        """Dataset totals for the overview metrics"""
+        totals = self.cells[CUBE_MEASURES].sum()
+        return {
+            'total_customers': len(self.customer_spend),
+            'total_products': self.cells.index.get_level_values('Item Purchased').nunique(),
+            'total_transactions': int(totals['purchases']),
+            'total_revenue': float(totals['amount_sum']),
+            'avg_transaction_value': float(totals['amount_sum'] / totals['amount_count']),
+            'avg_rating': float(totals['rating_sum'] / totals['rating_count']),
+            'categories': self.cells.index.get_level_values('Category').nunique()
+        }
@@ -0,0 +1,156 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+from components.svd_scorer import SVDScorer
+
+
+class ALSTrainer:
+    """Alternating least squares over a sparse user-item matrix.
+
+    Explicit mode fits the same biased model as surprise's SVD
+    (``mu + bu + bi + qi . pu``): each half-step is a ridge solve of
+    ``r - mu - b_other`` on ``[factors_other, 1]``, with the penalty scaled
+    by the row's rating count. Implicit mode is Hu/Koren/Volinsky weighted
+    ALS with confidence ``1 + alpha * r`` and no biases.
+
+    Rows are grouped into blocks of similar length, padded, and solved as
+    one batched ``np.linalg.solve`` per block; blocks run on a thread pool
+    (NumPy releases the GIL in einsum and LAPACK calls).
+    """
+
+    def __init__(self, n_factors=50, n_iter=15, reg=0.05, implicit=False, alpha=40.0,
+                 threads=None, block_size=256, max_block_entries=65536, seed=42):
+        self.n_factors = n_factors
+        self.n_iter = n_iter
+        self.reg = reg
+        self.implicit = implicit
+        self.alpha = alpha
+        self.threads = threads or os.cpu_count()
+        self.block_size = block_size
+        self.max_block_entries = max_block_entries
+        self.seed = seed
+
+    def fit(self, user_item_matrix, callback=None):
+        """Train on a UserItemMatrix and return an SVDScorer in the app's factor format.
+
+        ``callback(iteration, scorer)`` is called after every iteration.
+        """
+        ratings = sparse.csr_matrix(user_item_matrix.matrix, dtype=np.float64)
+        ratings.eliminate_zeros()
+        ratings_t = ratings.T.tocsr()
+        n_users, n_items = ratings.shape
+
+        rng = np.random.default_rng(self.seed)
+        user_factors = rng.normal(0, 0.1, (n_users, self.n_factors))
+        item_factors = rng.normal(0, 0.1, (n_items, self.n_factors))
+        user_bias, item_bias = np.zeros(n_users), np.zeros(n_items)
+        global_mean = 0.0 if self.implicit else float(ratings.data.mean()) if ratings.nnz else 0.0
+
+        user_blocks = self._blocks(ratings)
+        item_blocks = self._blocks(ratings_t)
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            for iteration in range(self.n_iter):
+                user_factors, user_bias = self._half_step(pool, ratings, user_blocks, item_factors,
+                                                          item_bias, global_mean)
+                item_factors, item_bias = self._half_step(pool, ratings_t, item_blocks, user_factors,
+                                                          user_bias, global_mean)
+                if callback is not None:
+                    callback(iteration, self._scorer(user_item_matrix, ratings, user_factors, item_factors,
+                                                     user_bias, item_bias, global_mean))
+
+        return self._scorer(user_item_matrix, ratings, user_factors, item_factors,
+                            user_bias, item_bias, global_mean)
+
+    def _scorer(self, user_item_matrix, ratings, user_factors, item_factors, user_bias, item_bias, global_mean):
+        rating_scale = None if self.implicit or not ratings.nnz else (float(ratings.data.min()),
+                                                                      float(ratings.data.max()))
+        return SVDScorer(user_factors, item_factors, user_bias, item_bias, global_mean,
+                         user_item_matrix.customer_ids, user_item_matrix.item_ids, rating_scale=rating_scale)
+
+    def _blocks(self, matrix):
+        """Row blocks of similar length, bounded by row count and padded size"""
+        lengths = np.diff(matrix.indptr)
+        order = np.argsort(lengths, kind='stable')
+        order = order[lengths[order] > 0]
+
+        blocks, start = [], 0
+        while start < len(order):
+            stop = min(start + self.block_size, len(order))
+            # Rows are sorted by length, so the last row sets the padded width
+            while stop - start > 1 and (stop - start) * lengths[order[stop - 1]] > self.max_block_entries:
+                stop = start + max(1, (stop - start) // 2)
+            blocks.append(order[start:stop])
+            start = stop
+        return blocks
+
+    def _half_step(self, pool, matrix, blocks, fixed_factors, fixed_bias, global_mean):
+        """Solve every row of ``matrix`` against the fixed factors of the other side"""
+        n_rows = matrix.shape[0]
+        factors = np.zeros((n_rows, self.n_factors))
+        bias = np.zeros(n_rows)
+
+        if self.implicit:
+            design = fixed_factors
+            gram_base = design.T @ design + self.reg * np.eye(self.n_factors)
+        else:
+            design = np.hstack([fixed_factors, np.ones((len(fixed_factors), 1))])
+            gram_base = None
+        # Padding points at an extra all-zero row
+        padded_design = np.vstack([design, np.zeros((1, design.shape[1]))])
+
+        def solve(rows):
+            starts, stops = matrix.indptr[rows], matrix.indptr[rows + 1]
+            lengths = stops - starts
+            width = lengths.max()
+            positions = starts[:, None] + np.arange(width)[None, :]
+            valid = np.arange(width)[None, :] < lengths[:, None]
+            positions = np.where(valid, positions, 0)
+
+            columns = np.where(valid, matrix.indices[positions], len(design))
+            values = np.where(valid, matrix.data[positions], 0.0)
+            block_design = padded_design[columns]
+
+            if self.implicit:
+                confidence = np.where(valid, 1 + self.alpha * values, 0.0)
+                gram = gram_base + np.einsum('bl,blf,blg->bfg', np.where(valid, confidence - 1, 0.0),
+                                             block_design, block_design)
+                rhs = np.einsum('bl,blf->bf', confidence, block_design)
+            else:
+                padded_bias = np.append(fixed_bias, 0.0)
+                target = np.where(valid, values - global_mean - padded_bias[columns], 0.0)
+                gram = np.einsum('blf,blg->bfg', block_design, block_design)
+                gram += (self.reg * lengths)[:, None, None] * np.eye(design.shape[1])[None, :, :]
+                rhs = np.einsum('bl,blf->bf', target, block_design)
+
+            solution = np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+            factors[rows] = solution[:, :self.n_factors]
+            if not self.implicit:
+                bias[rows] = solution[:, -1]
+
+        # list() propagates worker exceptions
+        list(pool.map(solve, blocks))
+        return factors, bias
+
+
+def rmse(scorer, user_item_matrix):
+    """Root mean squared error of ``scorer`` over the stored interactions"""
+    matrix = sparse.coo_matrix(user_item_matrix.matrix)
+    if matrix.nnz == 0:
+        return 0.0
+    customers = user_item_matrix.customer_ids[matrix.row]
+    items = user_item_matrix.item_ids[matrix.col]
+    user_vectors, user_bias = scorer.user_vectors(customers)
+    item_ids = scorer.item_index.lookup(items)
+    # Items unknown to the scorer contribute no factors and no bias
+    known = item_ids >= 0
+    item_vectors = np.where(known[:, None], scorer.qi[item_ids], 0.0)
+    item_bias = np.where(known, scorer.bi[item_ids], 0.0)
+    estimates = (np.einsum('nf,nf->n', user_vectors, item_vectors) + scorer.global_mean
+                 + user_bias + item_bias)
+    if scorer.rating_scale is not None:
+        estimates = np.clip(estimates, scorer.rating_scale[0], scorer.rating_scale[1])
+    return float(np.sqrt(np.mean((estimates - matrix.data) ** 2)))
@@ -0,0 +1,116 @@
+import numpy as np
+
+from components.svd_scorer import top_n_indices
+
+
+class IVFIndex:
+    """Inverted-file (IVF) index over SVD item factors for approximate top-N retrieval.
+
+    Items are stored as ``[qi, bi]`` and queries as ``[pu, 1]``, so the inner
+    product is the SVD estimate minus the per-customer constant ``mu + bu``.
+    Items are clustered with k-means; a query only scans the ``n_probe``
+    lists whose centroids score highest, which trades recall for latency.
+    The index records the ``model_version`` of the factors it was built
+    from and is only used with that scorer.
+    """
+
+    def __init__(self, centroids, list_offsets, list_items, n_items, model_version=None):
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.list_offsets = np.asarray(list_offsets, dtype=np.int64)
+        self.list_items = np.asarray(list_items, dtype=np.int64)
+        self.n_items = int(n_items)
+        self.model_version = model_version
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @staticmethod
+    def item_vectors(scorer):
+        return np.hstack([scorer.qi, np.asarray(scorer.bi)[:, None]])
+
+    @classmethod
+    def build(cls, scorer, n_lists=None, n_iter=10, sample_size=None, seed=42, block_size=65536):
+        """Cluster the item vectors of an SVDScorer with k-means.
+
+        ``n_lists`` defaults to ~sqrt(n_items); centroids are trained on a
+        seeded sample of at most ``sample_size`` items (256 per list by default).
+        """
+        vectors = cls.item_vectors(scorer)
+        n_items = len(vectors)
+        n_lists = n_lists or int(np.sqrt(n_items))
+        n_lists = max(1, min(n_lists, n_items))
+        sample_size = sample_size or 256 * n_lists
+
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n_items, min(sample_size, n_items), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assignment = cls._assign(sample, centroids, block_size)
+            counts = np.bincount(assignment, minlength=n_lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            nonempty = counts > 0
+            # Empty clusters keep their previous centroid
+            centroids[nonempty] = sums[nonempty] / counts[nonempty, None]
+
+        assignment = cls._assign(vectors, centroids, block_size)
+        list_items = np.argsort(assignment, kind='stable')
+        list_offsets = np.r_[0, np.cumsum(np.bincount(assignment, minlength=n_lists))]
+        return cls(centroids, list_offsets, list_items, n_items, scorer.model_version)
+
+    @staticmethod
+    def _assign(vectors, centroids, block_size):
+        """Nearest centroid (Euclidean) for each vector, one block at a time"""
+        centroid_norms = (centroids ** 2).sum(axis=1)
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), block_size):
+            block = vectors[start:start + block_size]
+            distances = centroid_norms[None, :] - 2 * block @ centroids.T
+            assignment[start:start + block_size] = distances.argmin(axis=1)
+        return assignment
+
+    def save(self, path):
+        """Write the index as a binary .npz archive"""
+        np.savez(path, centroids=self.centroids, list_offsets=self.list_offsets,
+                 list_items=self.list_items, n_items=self.n_items, model_version=str(self.model_version))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            # Indexes saved before versioning have no model_version and match no scorer
+            model_version = str(data['model_version']) if 'model_version' in data.files else None
+            return cls(data['centroids'], data['list_offsets'], data['list_items'], int(data['n_items']),
+                       model_version)
+
+    def matches(self, scorer):
+        """Whether the index was built from this scorer's factors (and no items were folded in since)"""
+        return (scorer is not None and self.model_version is not None
+                and scorer.model_version == self.model_version and scorer.n_items == self.n_items)
+
+    def search(self, scorer, customer_ids, n_candidates, n_probe):
+        """Top ``n_candidates`` item inner ids per customer from the probed lists.
+
+        Returns a (customers x n_candidates) array padded with -1 when the
+        probed lists hold fewer items.
+        """
+        user_vectors, _ = scorer.user_vectors(customer_ids)
+        queries = np.hstack([user_vectors, np.ones((len(user_vectors), 1))])
+
+        probes = top_n_indices(queries @ self.centroids.T, min(n_probe, self.n_lists))
+        candidates = np.full((len(queries), n_candidates), -1, dtype=np.int64)
+        for row, lists in enumerate(probes):
+            items = np.concatenate([self.list_items[self.list_offsets[l]:self.list_offsets[l + 1]]
+                                    for l in lists])
+            scores = scorer.qi[items] @ queries[row, :-1] + scorer.bi[items]
+            top = items[top_n_indices(scores, n_candidates)[0]]
+            candidates[row, :len(top)] = top
+        return candidates
+
+    def recall(self, scorer, customer_ids, top_n, n_candidates, n_probe):
+        """Mean fraction of the exact top-N that the probed candidates contain"""
+        exact = top_n_indices(scorer.score_customers(customer_ids), top_n)
+        approx = self.search(scorer, customer_ids, n_candidates, n_probe)
+        hits = [len(np.intersect1d(e, a[a >= 0])) / max(len(e), 1) for e, a in zip(exact, approx)]
+        return float(np.mean(hits)) if hits else 1.0
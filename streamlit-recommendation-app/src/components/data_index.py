@@ -0,0 +1,150 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+class DataIndex:
+    """Groupby-based lookup index over the shopping dataframe.
+
+    Built once per load so per-customer and per-item lookups cost O(k)
+    in the size of the answer instead of a boolean scan of every row.
+    ``append`` extends it with new rows without regrouping the old ones;
+    readers on other threads see the rows either before or after a batch.
+    """
+
+    def __init__(self, df):
+        self._frames = [df]
+        # Guards the frame list against a concurrent append while it is merged
+        self._frames_lock = threading.Lock()
+        self.n_rows = len(df)
+        self.customer_rows = df.groupby('Customer ID', sort=False, observed=True).indices
+        self.item_rows = df.groupby('Item Purchased', sort=False, observed=True).indices
+        self.item_totals = self._item_totals(df)
+        self.item_stats = self._item_stats(self.item_totals)
+
+    @property
+    def df(self):
+        # Appended batches are concatenated lazily, once per read after appends
+        with self._frames_lock:
+            if len(self._frames) > 1:
+                self._frames = [_concat_frames(self._frames)]
+            return self._frames[0]
+
+    def set_column(self, column, values):
+        """Replace ``column`` in a new frame; the frame the index was built from is left untouched"""
+        df = self.df.assign(**{column: values})
+        with self._frames_lock:
+            self._frames = [df]
+
+    @staticmethod
+    def _item_totals(df):
+        """Per-item running sums; means are derived so they can be updated by addition"""
+        totals = df.groupby('Item Purchased', observed=True).agg(
+            category=('Category', 'first'),
+            amount_sum=('Purchase Amount (USD)', 'sum'),
+            amount_count=('Purchase Amount (USD)', 'count'),
+            rating_sum=('Review Rating', 'sum'),
+            rating_count=('Review Rating', 'count'),
+            purchases=('Item Purchased', 'size')
+        )
+        totals.index = totals.index.astype(object)
+        totals['category'] = totals['category'].astype(object)
+        return totals
+
+    @staticmethod
+    def _item_stats(totals):
+        return pd.DataFrame({
+            'category': totals['category'],
+            'avg_price': totals['amount_sum'] / totals['amount_count'],
+            'avg_rating': totals['rating_sum'] / totals['rating_count'],
+            'purchases': totals['purchases'].astype(np.int64)
+        })
+
+    def append(self, batch):
+        """Add preprocessed rows; only the batch is grouped"""
+        # Rows first, so no customer ever points past the end of the frame
+        offset = self.n_rows
+        with self._frames_lock:
+            self._frames.append(batch)
+        self.n_rows += len(batch)
+
+        _extend_rows(self.customer_rows, batch, 'Customer ID', offset)
+        _extend_rows(self.item_rows, batch, 'Item Purchased', offset)
+
+        new_totals = self._item_totals(batch)
+        numeric = new_totals.columns.drop('category')
+        totals = self.item_totals[numeric].add(new_totals[numeric], fill_value=0)
+        totals.insert(0, 'category', self.item_totals['category'].combine_first(new_totals['category']))
+        self.item_totals = totals
+        self.item_stats = self._item_stats(totals)
+
+    def customer_data(self, customer_id):
+        """Rows belonging to ``customer_id`` (empty frame if unknown)"""
+        rows = self.customer_rows.get(customer_id)
+        if rows is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[rows]
+
+    def customer_items(self, customer_id):
+        """Set of items purchased by ``customer_id``"""
+        rows = self.customer_rows.get(customer_id)
+        if rows is None:
+            return set()
+        return set(self.df['Item Purchased'].to_numpy()[rows])
+
+    def customer_item_sets(self):
+        """Mapping of every customer to the set of items they purchased"""
+        items = self.df['Item Purchased'].to_numpy()
+        return {customer_id: set(items[rows]) for customer_id, rows in self.customer_rows.items()}
+
+    def item_ratings(self, item):
+        """Customer IDs and interaction scores of every purchase of ``item``"""
+        rows = self.item_rows.get(item, np.empty(0, dtype=np.int64))
+        df = self.df
+        return df['Customer ID'].to_numpy()[rows], df['interaction_score'].to_numpy()[rows]
+
+    def favorite_categories(self, customer_ids=None):
+        """Most purchased category per customer (ties resolved like ``mode().iloc[0]``).
+
+        ``customer_ids`` restricts the count to those customers' rows.
+        """
+        df = self.df
+        if customer_ids is not None:
+            rows = [self.customer_rows[cid] for cid in customer_ids if cid in self.customer_rows]
+            df = df.iloc[np.concatenate(rows) if rows else []]
+        counts = df.groupby(['Customer ID', 'Category'], observed=True).size().reset_index(name='count')
+        counts = counts.sort_values(['Customer ID', 'count', 'Category'], ascending=[True, False, True])
+        return counts.drop_duplicates('Customer ID').set_index('Customer ID')['Category']
+
+    def has_customer(self, customer_id):
+        return customer_id in self.customer_rows
+
+    def item_info(self, item):
+        """Aggregated stats for one item, or None if it was never purchased"""
+        if item not in self.item_stats.index:
+            return None
+        return self.item_stats.loc[item].to_dict()
+
+    def items_info(self, items):
+        """Aggregated stats for several items, in the given order"""
+        return self.item_stats.reindex(pd.Index(np.asarray(items, dtype=object)))
+
+
+def _extend_rows(row_index, batch, column, offset):
+    """Add the batch's row positions (shifted by ``offset``) to a key -> rows index"""
+    for key, rows in batch.groupby(column, sort=False, observed=True).indices.items():
+        existing = row_index.get(key)
+        rows = rows + offset
+        row_index[key] = rows if existing is None else np.concatenate([existing, rows])
+
+
+def _concat_frames(frames):
+    """Concatenate row batches, keeping categorical columns categorical"""
+    df = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        categorical = isinstance(frames[0][col].dtype, pd.CategoricalDtype)
+        if categorical and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = union_categoricals([frame[col].astype('category') for frame in frames])
+    return df
@@ -7,6 +7,12 @@ import numpy as np
 import sys
 import os
 
+from components.data_index import DataIndex
+from components.user_item_matrix import UserItemMatrix
+from components.svd_scorer import SVDScorer
+from components.item_neighbors import ItemNeighborIndex
+from components.ann_index import IVFIndex
+
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
@@ -17,11 +23,129 @@ except ImportError:
     class Config:
         SHOPPING_DATA_PATH = "../../data/shopping_behavior_updated.csv"
         SVD_MODEL_PATH = "../../data/models/svd_model.pkl"
+        SVD_FACTORS_DIR = "../../data/models/svd_factors"
         ITEM_SIMILARITY_PATH = "../../data/models/item_similarity_matrix.csv"
+        ITEM_NEIGHBORS_PATH = "../../data/models/item_neighbors.npz"
+        ANN_INDEX_PATH = "../../data/models/ann_index.npz"
         RFM_ANALYSIS_PATH = "../../data/models/rfm_analysis.csv"
+        BATCH_RECOMMENDATIONS_PATH = "../../data/models/batch_recommendations.parquet"
     
     config = Config()
 
+def interaction_coefficients(max_amount, max_previous):
+    """Per-unit weights of rating, amount and previous purchases in interaction_score"""
+    return np.array([0.4, 5 * 0.3 / max_amount, 5 * 0.3 / max_previous])
+
+def compute_interaction_score(df, max_amount=None, max_previous=None):
+    """Weighted rating/spend/loyalty score; maxima default to the frame's own"""
+    max_amount = df['Purchase Amount (USD)'].max() if max_amount is None else max_amount
+    max_previous = df['Previous Purchases'].max() if max_previous is None else max_previous
+    return (
+        df['Review Rating'] * 0.4 +
+        (df['Purchase Amount (USD)'] / max_amount) * 5 * 0.3 +
+        (df['Previous Purchases'] / max_previous) * 5 * 0.3
+    )
+
+def preprocess_shopping_data(df, max_amount=None, max_previous=None):
+    """Type-convert raw shopping data and add segment and interaction score columns.
+    
+    ``max_amount``/``max_previous`` normalize the score against running maxima
+    when rows arrive in batches (see IncrementalDataset).
+    """
+    df['Purchase Amount (USD)'] = pd.to_numeric(df['Purchase Amount (USD)'], errors='coerce')
+    df['Review Rating'] = pd.to_numeric(df['Review Rating'], errors='coerce')
+    df['Previous Purchases'] = pd.to_numeric(df['Previous Purchases'], errors='coerce')
+    
+    # Create customer segments
+    df['Customer_Segment'] = pd.cut(df['Age'], 
+                                  bins=[0, 25, 40, 60, 100], 
+                                  labels=['Joven', 'Adulto', 'Maduro', 'Senior'])
+    
+    # Calculate interaction score
+    df['interaction_score'] = compute_interaction_score(df, max_amount, max_previous)
+    
+    return df
+
+# Low-cardinality text columns stored as categoricals in the columnar copy
+CATEGORICAL_COLUMNS = [
+    'Gender', 'Item Purchased', 'Category', 'Location', 'Size', 'Color', 'Season',
+    'Subscription Status', 'Shipping Type', 'Discount Applied', 'Promo Code Used',
+    'Payment Method', 'Frequency of Purchases'
+]
+
+def columnar_path(csv_path):
+    """Path of the Parquet copy that sits next to ``csv_path``"""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+def convert_to_columnar(csv_path, output_path=None):
+    """One-time conversion of the shopping CSV into a typed Parquet file.
+    
+    Text columns become categoricals, integer columns are narrowed and the
+    derived Customer_Segment and interaction_score columns are stored, so
+    loaders skip both CSV parsing and preprocessing.
+    """
+    output_path = output_path or columnar_path(csv_path)
+    df = preprocess_shopping_data(pd.read_csv(csv_path))
+    
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    # int32 halves memory without overflow risk in later arithmetic
+    for col in ['Customer ID', 'Age', 'Previous Purchases', 'Purchase Amount (USD)']:
+        if pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype(np.int32)
+    for col in ['Review Rating', 'interaction_score']:
+        df[col] = df[col].astype(np.float32)
+    
+    df.to_parquet(output_path, index=False)
+    return output_path
+
+def read_shopping_data(csv_path, columns=None):
+    """Read shopping data, preferring an up-to-date Parquet copy.
+    
+    ``columns`` projects the read to a subset of columns; with Parquet only
+    those columns are decoded from disk.
+    """
+    parquet_path = columnar_path(csv_path)
+    if os.path.exists(parquet_path) and (
+            not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        return pd.read_parquet(parquet_path, columns=list(columns) if columns else None)
+    
+    df = preprocess_shopping_data(pd.read_csv(csv_path))
+    return df[list(columns)] if columns else df
+
+def load_svd_scorer(factors_dir, model_path, mmap_mode='r'):
+    """Load exported SVD factors, falling back to the pickled surprise model.
+    
+    The factor files are memory-mapped read-only, so every worker on a host
+    shares one page-cached copy and surprise is never imported.
+    """
+    if SVDScorer.exists(factors_dir):
+        return SVDScorer.load(factors_dir, mmap_mode=mmap_mode)
+    with open(model_path, 'rb') as f:
+        return SVDScorer.from_surprise(pickle.load(f))
+
+def read_batch_recommendations(path, model_version=None):
+    """Precomputed recommendations as a customer -> [(item, score)] lookup.
+
+    Returns None when ``model_version`` is given and the file was written
+    by another model (or carries no version), so stale rows are never served.
+    """
+    recs_df = pd.read_parquet(path)
+    if model_version is not None and recs_df.attrs.get('model_version') != model_version:
+        return None
+    # The batch job writes rows sorted by customer and rank, so each
+    # customer's recommendations form one contiguous slice
+    customers = recs_df['Customer ID'].to_numpy()
+    items = recs_df['Recommended Item'].astype(str).to_numpy()
+    scores = recs_df['Score'].to_numpy(dtype=np.float64)
+    starts = np.flatnonzero(np.r_[True, customers[1:] != customers[:-1]])
+    ends = np.r_[starts[1:], len(customers)]
+    return {
+        customers[start]: list(zip(items[start:end], scores[start:end].tolist()))
+        for start, end in zip(starts, ends)
+    }
+
 class DataLoader:
     """Class to handle data loading and preprocessing"""
     
@@ -29,37 +153,26 @@ class DataLoader:
         self.df = None
         self.user_item_matrix = None
         self.item_similarity_df = None
-        self.rfm_df = None
         self.svd_model = None
         
     @st.cache_data
-    def load_shopping_data(_self):
-        """Load and preprocess shopping data"""
+    def load_shopping_data(_self, columns=None):
+        """Load and preprocess shopping data (optionally only ``columns``)"""
         try:
-            df = pd.read_csv(config.SHOPPING_DATA_PATH)
-            
-            # Basic preprocessing
-            df['Purchase Amount (USD)'] = pd.to_numeric(df['Purchase Amount (USD)'], errors='coerce')
-            df['Review Rating'] = pd.to_numeric(df['Review Rating'], errors='coerce')
-            df['Previous Purchases'] = pd.to_numeric(df['Previous Purchases'], errors='coerce')
-            
-            # Create customer segments
-            df['Customer_Segment'] = pd.cut(df['Age'], 
-                                          bins=[0, 25, 40, 60, 100], 
-                                          labels=['Joven', 'Adulto', 'Maduro', 'Senior'])
-            
-            # Calculate interaction score
-            df['interaction_score'] = (
-                df['Review Rating'] * 0.4 +
-                (df['Purchase Amount (USD)'] / df['Purchase Amount (USD)'].max()) * 5 * 0.3 +
-                (df['Previous Purchases'] / df['Previous Purchases'].max()) * 5 * 0.3
-            )
-            
-            return df
+            return read_shopping_data(config.SHOPPING_DATA_PATH, columns)
         except Exception as e:
             st.error(f"Error loading shopping data: {str(e)}")
             return None
     
+    @st.cache_resource
+    def load_data_index(_self):
+        """Shopping data with its per-customer / per-item DataIndex, built once per load"""
+        try:
+            return DataIndex(read_shopping_data(config.SHOPPING_DATA_PATH))
+        except Exception as e:
+            st.error(f"Error building data index: {str(e)}")
+            return None
+    
     @st.cache_data
     def load_item_similarity(_self):
         """Load item similarity matrix"""
@@ -69,42 +182,70 @@ class DataLoader:
             st.error(f"Error loading item similarity matrix: {str(e)}")
             return None
     
-    @st.cache_data
-    def load_rfm_analysis(_self):
-        """Load RFM analysis data"""
+    @st.cache_resource
+    def load_item_neighbors(_self):
+        """Load the top-K item neighbor index (None if it has not been built)"""
+        if not os.path.exists(config.ITEM_NEIGHBORS_PATH):
+            return None
         try:
-            return pd.read_csv(config.RFM_ANALYSIS_PATH)
+            return ItemNeighborIndex.load(config.ITEM_NEIGHBORS_PATH)
         except Exception as e:
-            st.error(f"Error loading RFM analysis: {str(e)}")
+            st.error(f"Error loading item neighbor index: {str(e)}")
+            return None
+    
+    @st.cache_resource
+    def load_ann_index(_self):
+        """Load the IVF index over SVD item factors (None if it has not been built)"""
+        if not os.path.exists(config.ANN_INDEX_PATH):
+            return None
+        try:
+            return IVFIndex.load(config.ANN_INDEX_PATH)
+        except Exception as e:
+            st.error(f"Error loading ANN index: {str(e)}")
             return None
     
     @st.cache_resource
     def load_svd_model(_self):
-        """Load trained SVD model"""
+        """Load trained SVD model as a scorer, preferring memory-mapped factors"""
         try:
-            with open(config.SVD_MODEL_PATH, 'rb') as f:
-                return pickle.load(f)
+            return load_svd_scorer(config.SVD_FACTORS_DIR, config.SVD_MODEL_PATH)
         except Exception as e:
             st.error(f"Error loading SVD model: {str(e)}")
             return None
     
+    @st.cache_resource
+    def load_batch_recommendations(_self, model_version=None):
+        """Load precomputed recommendations of ``model_version`` as a customer -> [(item, score)] lookup"""
+        if not os.path.exists(config.BATCH_RECOMMENDATIONS_PATH):
+            return None
+        try:
+            return read_batch_recommendations(config.BATCH_RECOMMENDATIONS_PATH, model_version)
+        except Exception as e:
+            st.error(f"Error loading batch recommendations: {str(e)}")
+            return None
+    
+    @classmethod
+    def clear_caches(cls):
+        """Drop cached file contents so the next load re-reads from disk"""
+        cls.load_shopping_data.clear()
+        cls.load_data_index.clear()
+        cls.load_item_similarity.clear()
+        cls.load_item_neighbors.clear()
+        cls.load_ann_index.clear()
+        cls.load_svd_model.clear()
+        cls.load_batch_recommendations.clear()
+    
     def create_user_item_matrix(self, df):
-        """Create user-item matrix from dataframe"""
+        """Create sparse user-item matrix from dataframe"""
         try:
-            user_item_matrix = df.pivot_table(
-                index='Customer ID',
-                columns='Item Purchased',
-                values='interaction_score',
-                aggfunc='mean'
-            ).fillna(0)
-            return user_item_matrix
+            return UserItemMatrix.from_dataframe(df)
         except Exception as e:
             st.error(f"Error creating user-item matrix: {str(e)}")
             return None
     
-    def get_customer_data(self, df, customer_id):
-        """Get data for a specific customer"""
-        return df[df['Customer ID'] == customer_id]
+    def get_customer_data(self, data_index, customer_id):
+        """Get data for a specific customer from the DataIndex's row lookup, without scanning the frame"""
+        return data_index.customer_data(customer_id)
     
     def get_unique_customers(self, df):
         """Get list of unique customer IDs"""
@@ -0,0 +1,160 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def holdout_split(df, test_size=0.2):
+    """Per-customer holdout of the latest interactions: (train rows, held-out rows).
+
+    Only customers with at least two interactions are split. Each holds out
+    ``test_size`` of their rows (at least one, never all of them), so some
+    history stays in train; customers with a single purchase stay in train.
+    """
+    customers = df.groupby('Customer ID', sort=False, observed=True)
+    n_rows = customers['Customer ID'].transform('size').to_numpy()
+    from_end = customers.cumcount(ascending=False).to_numpy()
+    n_test = np.clip(np.rint(test_size * n_rows), 1, n_rows - 1)
+    test = (n_rows >= 2) & (from_end < n_test)
+    return df[~test].reset_index(drop=True), df[test].reset_index(drop=True)
+
+
+def encode_recommendations(recommendations, item_codes, k):
+    """Lists of (item, score) -> (users x k) array of item codes, -1 padded"""
+    encoded = np.full((len(recommendations), k), -1, dtype=np.int64)
+    for row, recs in enumerate(recommendations):
+        codes = [item_codes.get(item, -1) for item, _ in recs[:k]]
+        encoded[row, :len(codes)] = codes
+    return encoded
+
+
+def ranking_metrics(recommended, relevant_keys, n_relevant, n_items, item_categories=None):
+    """Precision/recall/NDCG@K, coverage and diversity for a (users x K) code array.
+
+    ``relevant_keys`` holds ``user_row * n_items + item_code`` for every
+    held-out interaction and ``n_relevant`` the count per user row.
+    """
+    n_users, k = recommended.shape
+    valid = recommended >= 0
+    keys = np.arange(n_users)[:, None] * n_items + recommended
+    hits = valid & np.isin(keys, relevant_keys)
+
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    dcg = (hits * discounts).sum(axis=1)
+    ideal = np.cumsum(discounts)[np.minimum(n_relevant, k) - 1]
+    n_hits = hits.sum(axis=1)
+
+    counts = np.bincount(recommended[valid], minlength=n_items)
+    shares = counts[counts > 0] / max(counts.sum(), 1)
+    metrics = {
+        f'precision@{k}': float((n_hits / k).mean()),
+        f'recall@{k}': float((n_hits / n_relevant).mean()),
+        f'ndcg@{k}': float((dcg / ideal).mean()),
+        'hit_rate': float((n_hits > 0).mean()),
+        'coverage': float((counts > 0).sum() / n_items),
+        # Normalized Shannon entropy of how often each item is recommended
+        'catalog_entropy': float(-(shares * np.log(shares)).sum() / np.log(n_items)) if len(shares) > 1 else 0.0,
+    }
+
+    if item_categories is not None:
+        # Intra-list diversity: share of recommended pairs from different categories
+        categories = np.where(valid, item_categories[np.where(valid, recommended, 0)], -1)
+        same = (categories[:, :, None] == categories[:, None, :]) & valid[:, :, None] & valid[:, None, :]
+        pairs = valid.sum(axis=1) * (valid.sum(axis=1) - 1)
+        different = pairs - (same.sum(axis=(1, 2)) - valid.sum(axis=1))
+        has_pairs = pairs > 0
+        metrics['diversity'] = float((different[has_pairs] / pairs[has_pairs]).mean()) if has_pairs.any() else np.nan
+    return metrics
+
+
+def latency_stats(query, customer_ids, k):
+    """Per-query latency percentiles (ms) and throughput of single-customer calls"""
+    timings = np.empty(len(customer_ids))
+    start = time.perf_counter()
+    for i, customer_id in enumerate(customer_ids):
+        t0 = time.perf_counter()
+        query(customer_id, k)
+        timings[i] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(timings * 1000, [50, 95, 99])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+            'queries_per_s': len(customer_ids) / elapsed if elapsed else float('inf')}
+
+
+def popularity_recommender(train_df, customer_items):
+    """Most purchased items in the training data, excluding each customer's own"""
+    counts = train_df['Item Purchased'].astype(object).value_counts()
+    ranked = list(zip(counts.index, counts.to_numpy(dtype=np.float64)))
+
+    def recommend_batch(customer_ids, top_n):
+        results = []
+        for customer_id in customer_ids:
+            purchased = customer_items.get(customer_id, ())
+            results.append([(item, score) for item, score in ranked if item not in purchased][:top_n])
+        return results
+    return recommend_batch
+
+
+class Evaluator:
+    """Offline ranking evaluation of several recommenders on one holdout split.
+
+    ``recommenders`` maps a mode name to ``batch_fn(customer_ids, top_n)``
+    returning best-first (item, score) lists. Users are scored in chunks on
+    a thread pool and all metrics are computed as array operations.
+    """
+
+    def __init__(self, train_df, test_df, k=10, chunk_size=512, threads=4):
+        self.k = k
+        self.chunk_size = chunk_size
+        self.threads = threads
+
+        items = pd.Index(pd.unique(pd.concat([train_df['Item Purchased'], test_df['Item Purchased']])
+                                   .astype(object)))
+        self.item_codes = {item: code for code, item in enumerate(items)}
+        self.n_items = len(items)
+
+        categories = pd.concat([train_df, test_df]).drop_duplicates('Item Purchased')
+        category_codes, _ = pd.factorize(categories['Category'].astype(object))
+        self.item_categories = np.full(self.n_items, -1, dtype=np.int64)
+        self.item_categories[items.get_indexer(categories['Item Purchased'].astype(object))] = category_codes
+
+        # Held-out interactions not already in the customer's training history
+        train_pairs = set(zip(train_df['Customer ID'], train_df['Item Purchased'].astype(object)))
+        relevant = {}
+        for customer_id, item in zip(test_df['Customer ID'], test_df['Item Purchased'].astype(object)):
+            if (customer_id, item) not in train_pairs:
+                relevant.setdefault(customer_id, set()).add(self.item_codes[item])
+        self.customer_ids = list(relevant)
+        self.n_relevant = np.array([len(relevant[cid]) for cid in self.customer_ids])
+        self.relevant_keys = np.array(
+            [row * self.n_items + code for row, cid in enumerate(self.customer_ids) for code in relevant[cid]],
+            dtype=np.int64
+        )
+
+    def recommend_all(self, batch_fn):
+        chunks = [self.customer_ids[i:i + self.chunk_size] for i in range(0, len(self.customer_ids), self.chunk_size)]
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            results = pool.map(lambda chunk: batch_fn(chunk, self.k), chunks)
+            return [recs for chunk_results in results for recs in chunk_results]
+
+    def evaluate(self, recommenders, latency_queries=200, seed=42):
+        """One report row per mode: ranking quality, batch throughput and query latency"""
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(len(self.customer_ids), min(latency_queries, len(self.customer_ids)), replace=False)
+        sample_ids = [self.customer_ids[i] for i in sample]
+
+        rows = []
+        for mode, batch_fn in recommenders.items():
+            start = time.perf_counter()
+            recommendations = self.recommend_all(batch_fn)
+            batch_seconds = time.perf_counter() - start
+
+            encoded = encode_recommendations(recommendations, self.item_codes, self.k)
+            row = {'mode': mode, 'users': len(self.customer_ids)}
+            row.update(ranking_metrics(encoded, self.relevant_keys, self.n_relevant, self.n_items,
+                                       self.item_categories))
+            row['batch_users_per_s'] = len(self.customer_ids) / batch_seconds if batch_seconds else float('inf')
+            row.update(latency_stats(lambda cid, k: batch_fn([cid], k), sample_ids, self.k))
+            rows.append(row)
+        return pd.DataFrame(rows).set_index('mode')
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from components.aggregate_cube import AggregateCube
+from components.data_index import DataIndex
+from components.data_loader import (compute_interaction_score, interaction_coefficients,
+                                    preprocess_shopping_data)
+from components.popularity import PopularityIndex
+from components.rfm import RFMAnalysis
+from components.user_item_matrix import InteractionAccumulator
+
+
+class IncrementalDataset:
+    """Shopping data that grows by appended transaction batches.
+
+    Each batch updates the DataIndex (customer rows, item stats), the
+    aggregate cube behind the charts, the popularity rankings, the RFM
+    scores and the per-cell interaction sums in O(batch). Running maxima of
+    amount and previous purchases are tracked, and the stored
+    interaction_score column is only renormalized (into a new frame, never
+    the caller's) when one of them grows. RecommendationEngine.from_dataset
+    serves recommendations from it.
+    """
+
+    def __init__(self, df, popularity_half_life=50000):
+        self.data_index = DataIndex(df)
+        self.cube = AggregateCube(df)
+        self.popularity = PopularityIndex(df, popularity_half_life)
+        self.rfm = RFMAnalysis(df)
+        self.max_amount = df['Purchase Amount (USD)'].max()
+        self.max_previous = df['Previous Purchases'].max()
+        self.interactions = InteractionAccumulator()
+        self.interactions.append(df)
+        self.renormalizations = 0
+        self._user_item_matrix = None
+
+    @property
+    def df(self):
+        return self.data_index.df
+
+    @property
+    def n_rows(self):
+        return self.data_index.n_rows
+
+    def append(self, batch):
+        """Add a batch of raw transactions (CSV columns); returns True if scores were renormalized"""
+        batch = batch.copy()
+        for col in ['Purchase Amount (USD)', 'Previous Purchases']:
+            batch[col] = pd.to_numeric(batch[col], errors='coerce')
+
+        max_amount = np.nanmax([self.max_amount, batch['Purchase Amount (USD)'].max()])
+        max_previous = np.nanmax([self.max_previous, batch['Previous Purchases'].max()])
+        renormalize = bool(max_amount > self.max_amount or max_previous > self.max_previous)
+        self.max_amount, self.max_previous = max_amount, max_previous
+
+        batch = preprocess_shopping_data(batch, self.max_amount, self.max_previous)
+        if renormalize:
+            df = self.data_index.df
+            self.data_index.set_column('interaction_score', compute_interaction_score(
+                df, self.max_amount, self.max_previous
+            ).astype(df['interaction_score'].dtype))
+            self.renormalizations += 1
+
+        self.data_index.append(batch)
+        self.cube.append(batch)
+        self.popularity.append(batch)
+        self.rfm.append(batch)
+        self.interactions.append(batch)
+        self._user_item_matrix = None
+        return renormalize
+
+    @property
+    def user_item_matrix(self):
+        """Sparse user-item matrix, rebuilt from the running sums after an append"""
+        if self._user_item_matrix is None:
+            self._user_item_matrix = self.interactions.to_matrix(
+                interaction_coefficients(self.max_amount, self.max_previous)
+            )
+        return self._user_item_matrix
@@ -0,0 +1,126 @@
+import numpy as np
+from scipy import sparse
+
+from components.svd_scorer import IdIndex, top_n_indices
+
+
+class ItemNeighborIndex:
+    """Top-K item-item neighbor lists stored as (items x K) arrays.
+
+    Replaces the dense N x N similarity matrix: similar-item queries read
+    one row of K precomputed neighbors instead of sorting a full column.
+    """
+
+    def __init__(self, item_ids, neighbors, scores):
+        self.item_ids = np.asarray(item_ids)
+        self.neighbors = np.asarray(neighbors, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        self.item_index = IdIndex.from_ids(self.item_ids)
+
+    @property
+    def k(self):
+        return self.neighbors.shape[1]
+
+    @classmethod
+    def build(cls, user_item_matrix, k=20, block_size=1024):
+        """Cosine top-K neighbors from a UserItemMatrix, one item block at a time.
+
+        Memory is bounded by ``block_size x n_items`` rather than n_items^2.
+        """
+        matrix = sparse.csc_matrix(user_item_matrix.matrix, dtype=np.float64)
+        norms = np.sqrt(np.asarray(matrix.power(2).sum(axis=0))).ravel()
+        norms[norms == 0] = 1.0
+        normalized = (matrix @ sparse.diags(1.0 / norms)).tocsc()
+        normalized_t = normalized.T.tocsr()
+
+        n_items = normalized.shape[1]
+        k = min(k, max(n_items - 1, 0))
+        neighbors = np.empty((n_items, k), dtype=np.int32)
+        scores = np.empty((n_items, k), dtype=np.float32)
+
+        for start in range(0, n_items, block_size):
+            stop = min(start + block_size, n_items)
+            block = (normalized_t[start:stop] @ normalized).toarray()
+            # An item is not its own neighbor
+            block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+            top = top_n_indices(block, k)
+            neighbors[start:stop] = top
+            scores[start:stop] = np.take_along_axis(block, top, axis=1)
+
+        return cls(user_item_matrix.item_ids, neighbors, scores)
+
+    @classmethod
+    def from_similarity_df(cls, similarity_df, k=20):
+        """Convert an existing dense similarity DataFrame into a neighbor index"""
+        values = similarity_df.to_numpy(dtype=np.float64, copy=True)
+        np.fill_diagonal(values, -np.inf)
+        k = min(k, max(len(values) - 1, 0))
+        top = top_n_indices(values, k)
+        return cls(similarity_df.index.to_numpy(), top, np.take_along_axis(values, top, axis=1))
+
+    def save(self, path):
+        """Write the index as a binary .npz archive"""
+        np.savez(path, item_ids=self.item_ids.astype(str), neighbors=self.neighbors, scores=self.scores)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['item_ids'], data['neighbors'], data['scores'])
+
+    def __contains__(self, item):
+        return item in self.item_index
+
+    def similar_items(self, item, top_n=5):
+        """Up to ``top_n`` (item, similarity) pairs for ``item`` in O(K).
+
+        Neighbors with similarity <= 0 share no buyers with ``item`` and are
+        left out, so the list may be shorter than ``top_n`` or empty.
+        """
+        idx = self.item_index.get(item)
+        if idx is None:
+            return []
+        top_n = min(top_n, self.k)
+        scores = self.scores[idx, :top_n]
+        neighbor_ids = self.neighbors[idx, :top_n][scores > 0]
+        return list(zip(self.item_ids[neighbor_ids].tolist(), scores[scores > 0].tolist()))
+
+    def to_sparse(self, item_ids):
+        """Neighbor similarities as a sparse matrix in the order of ``item_ids``.
+
+        Row i holds the K neighbors of ``item_ids[i]``; items unknown to the
+        index get an empty row.
+        """
+        item_ids = np.asarray(item_ids)
+        target = IdIndex.from_ids(item_ids)
+        # Position of each index item (and therefore each neighbor) in item_ids
+        position = target.lookup(self.item_ids)
+
+        rows = np.repeat(position, self.k)
+        cols = position[self.neighbors.ravel()]
+        values = self.scores.ravel().astype(np.float64)
+        keep = (rows >= 0) & (cols >= 0) & np.isfinite(values) & (values > 0)
+
+        return sparse.csr_matrix(
+            (values[keep], (rows[keep], cols[keep])),
+            shape=(len(item_ids), len(item_ids))
+        )
+
+
+def score_from_history(history, similarity):
+    """Aggregate item similarity over each customer's whole purchase history.
+
+    ``history`` is a (customers x items) sparse matrix of interaction scores
+    and ``similarity`` an (items x items) sparse or dense matrix, in the same
+    item order. Each candidate's score is the interaction-weighted sum of its
+    similarity to every purchased item, computed as one sparse product;
+    already-purchased items and items with no positive similarity to the
+    history (nothing in common, not a recommendation) are set to -inf.
+    """
+    history = sparse.csr_matrix(history)
+    scores = history @ similarity
+    scores = scores.toarray() if sparse.issparse(scores) else np.asarray(scores, dtype=np.float64)
+    scores[scores <= 0] = -np.inf
+
+    rows = np.repeat(np.arange(history.shape[0]), np.diff(history.indptr))
+    scores[rows, history.indices] = -np.inf
+    return scores
@@ -0,0 +1,63 @@
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from components.svd_scorer import SVDScorer
+
+
+def artifact_model_version(path):
+    """Model version a derived artifact was built from (None if unstamped or missing)"""
+    if not os.path.exists(path):
+        return None
+    if str(path).endswith('.parquet'):
+        # Only the schema metadata is needed, so read no columns
+        return pd.read_parquet(path, columns=[]).attrs.get('model_version')
+    with np.load(path, allow_pickle=False) as data:
+        return str(data['model_version']) if 'model_version' in data.files else None
+
+
+def activate_factors(factors_dir, live_dir):
+    """Point ``live_dir`` at ``factors_dir`` with a single atomic rename.
+
+    ``live_dir`` becomes a relative symlink, swapped by renaming a new link
+    over it, so readers see either the old or the new factors and files
+    already memory-mapped are never rewritten. A plain directory left there
+    by the older layout is moved aside once, not deleted.
+    """
+    parent = os.path.dirname(os.path.abspath(live_dir))
+    tmp_link = f"{live_dir}.{os.getpid()}.link"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.relpath(os.path.abspath(factors_dir), parent), tmp_link)
+    if os.path.isdir(live_dir) and not os.path.islink(live_dir):
+        os.replace(live_dir, f"{live_dir}.previous_{time.strftime('%Y%m%d_%H%M%S')}")
+    os.replace(tmp_link, live_dir)
+
+
+def promote(version_dir, factors_dir, model_path, derived_paths=()):
+    """Make the model in ``version_dir`` the current one.
+
+    The version's pickle (if any) is copied next to ``model_path`` and
+    renamed over it, then ``factors_dir`` is switched to the version's
+    factors. Any of ``derived_paths`` (batch recommendations, ANN index)
+    stamped with another model version is removed in the same step, so it
+    is never served against the new factors. Returns the removed paths.
+    """
+    pickle_path = os.path.join(version_dir, 'svd_model.pkl')
+    if os.path.exists(pickle_path):
+        shutil.copyfile(pickle_path, f"{model_path}.staging")
+        os.replace(f"{model_path}.staging", model_path)
+
+    new_factors = os.path.join(version_dir, 'svd_factors')
+    activate_factors(new_factors, factors_dir)
+
+    model_version = SVDScorer.load(new_factors).model_version
+    removed = []
+    for path in derived_paths:
+        if os.path.exists(path) and artifact_model_version(path) != model_version:
+            os.remove(path)
+            removed.append(path)
+    return removed
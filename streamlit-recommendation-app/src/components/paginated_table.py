@@ -0,0 +1,52 @@
+import numpy as np
+import streamlit as st
+
+
+class PaginatedTable:
+    """Server-side paginated view of a pre-sorted DataFrame.
+
+    Only the rows of the requested page are sliced out and sent to the
+    browser. Values stay numeric; ``formats`` maps columns to printf-style
+    display formats (e.g. ``{'Precio': '$%.2f'}``) applied by the grid
+    client-side, so no cell is formatted in Python.
+    """
+
+    def __init__(self, df, formats=None, page_size=25):
+        self.df = df
+        self.formats = formats or {}
+        self.page_size = max(1, int(page_size))
+
+    @property
+    def n_rows(self):
+        return len(self.df)
+
+    @property
+    def n_pages(self):
+        return max(1, -(-self.n_rows // self.page_size))
+
+    def page(self, number):
+        """Rows of page ``number`` (1-based, clipped to the valid range)"""
+        number = int(np.clip(number, 1, self.n_pages))
+        start = (number - 1) * self.page_size
+        return self.df.iloc[start:start + self.page_size]
+
+    def column_config(self):
+        return {col: st.column_config.NumberColumn(col, format=fmt)
+                for col, fmt in self.formats.items() if col in self.df.columns}
+
+    def render(self, key):
+        """Page selector (only when there is more than one page) and the visible rows"""
+        number = 1
+        if self.n_pages > 1:
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                number = st.number_input("Página", min_value=1, max_value=self.n_pages, value=1, step=1,
+                                         key=f"{key}_page")
+            with col2:
+                start = (number - 1) * self.page_size
+                st.caption(f"Filas {start + 1:,}–{min(start + self.page_size, self.n_rows):,} "
+                           f"de {self.n_rows:,} ({self.n_pages:,} páginas)")
+
+        st.dataframe(self.page(number), use_container_width=True, hide_index=True,
+                     column_config=self.column_config())
+
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+POPULARITY_DIMENSIONS = ['Category', 'Season', 'Customer_Segment']
+# Ranking name -> (sort column, tie-breaker)
+POPULARITY_METRICS = {
+    'purchases': ('purchases', 'revenue'),
+    'revenue': ('revenue', 'purchases'),
+    'rating': ('avg_rating', 'purchases'),
+    'trending': ('trending', 'purchases'),
+}
+RANKING_COLUMNS = ['item', 'purchases', 'revenue', 'avg_price', 'avg_rating', 'trending']
+
+
+class PopularityIndex:
+    """Items ranked by purchases, revenue, rating and decayed popularity per dimension value.
+
+    Additive per-cell measures (by every dimension and item) are kept like
+    in the AggregateCube. For each (dimension, metric) pair the items are
+    sorted once by dimension value and metric, with the stats alongside, and
+    the start/stop of every value is recorded, so a top-N query is a slice.
+
+    ``trending`` is purchases with exponential time decay, time being the
+    number of transactions seen: a purchase counts half after
+    ``half_life`` more transactions. It uses forward decay, so new rows
+    get a growing weight and old cells are never rescaled on append
+    (except to avoid overflow).
+
+    ``append`` rebuilds the rankings on the calling thread and publishes
+    them in one assignment, so ``top`` never sorts and never sees a
+    partially built ranking.
+    """
+
+    def __init__(self, df, half_life=50000, dimensions=None):
+        dimensions = POPULARITY_DIMENSIONS if dimensions is None else dimensions
+        self.dimensions = [col for col in dimensions if col in df.columns]
+        self.half_life = half_life
+        self.clock = 0.0
+        self.cells = self._cells(df, self._weight())
+        self.clock += len(df)
+        self._rankings = self._build(self.cells, self._weight())
+
+    def _weight(self, clock=None):
+        """Forward-decay weight of a transaction arriving at ``clock`` (default: now)"""
+        clock = self.clock if clock is None else clock
+        return 2.0 ** (clock / self.half_life) if self.half_life else 1.0
+
+    def _cells(self, df, weight):
+        keys = self.dimensions + ['Item Purchased']
+        # dropna=False keeps rows with a missing dimension in the other rankings
+        cells = df.groupby(keys, observed=True, sort=False, dropna=False).agg(
+            purchases=('Item Purchased', 'size'),
+            revenue=('Purchase Amount (USD)', 'sum'),
+            amount_count=('Purchase Amount (USD)', 'count'),
+            rating_sum=('Review Rating', 'sum'),
+            rating_count=('Review Rating', 'count')
+        )
+        cells.index = pd.MultiIndex.from_arrays(
+            [cells.index.get_level_values(col).astype(object) for col in keys], names=keys
+        )
+        cells = cells.astype({'purchases': np.int64, 'amount_count': np.int64, 'rating_count': np.int64,
+                              'revenue': np.float64, 'rating_sum': np.float64})
+        cells['decayed'] = cells['purchases'] * weight
+        return cells
+
+    def append(self, batch):
+        """Add preprocessed rows and rebuild the rankings"""
+        cells, clock, weight = self.cells, self.clock, self._weight()
+        if weight > 1e12:
+            # Move the time origin to now before the weights overflow
+            cells = cells.assign(decayed=cells['decayed'] / weight)
+            clock, weight = 0.0, 1.0
+        cells = cells.add(self._cells(batch, weight), fill_value=0).astype(self.cells.dtypes)
+        clock += len(batch)
+        rankings = self._build(cells, self._weight(clock))
+        # top() reads only the rankings, which are swapped in whole
+        self.cells, self.clock, self._rankings = cells, clock, rankings
+
+    def _build(self, cells, scale):
+        """Sort every (dimension, metric) ranking; the overall ranking has dimension None"""
+        rankings = {}
+        cells = cells.reset_index()
+        for dimension in [None] + self.dimensions:
+            keys = ['Item Purchased'] if dimension is None else [dimension, 'Item Purchased']
+            grouped = cells.groupby(keys, sort=False).agg(
+                purchases=('purchases', 'sum'), revenue=('revenue', 'sum'), amount_count=('amount_count', 'sum'),
+                rating_sum=('rating_sum', 'sum'), rating_count=('rating_count', 'sum'), decayed=('decayed', 'sum')
+            ).reset_index()
+            # The overall ranking is stored as a single group with value 0
+            table = pd.DataFrame({
+                'value': grouped[dimension].to_numpy() if dimension is not None else np.zeros(len(grouped)),
+                'item': grouped['Item Purchased'].to_numpy(),
+                'purchases': grouped['purchases'].to_numpy(),
+                'revenue': grouped['revenue'].to_numpy(),
+                'avg_price': (grouped['revenue'] / grouped['amount_count']).to_numpy(),
+                'avg_rating': (grouped['rating_sum'] / grouped['rating_count']).to_numpy(),
+                'trending': (grouped['decayed'] / scale).to_numpy()
+            })
+            for metric, (column, tie_breaker) in POPULARITY_METRICS.items():
+                ranked = table.sort_values(['value', column, tie_breaker], ascending=[True, False, False],
+                                           kind='stable', na_position='last', ignore_index=True)
+                rankings[(dimension, metric)] = (ranked[RANKING_COLUMNS], self._offsets(ranked['value']))
+        return rankings
+
+    @staticmethod
+    def _offsets(values):
+        """Dimension value -> (start, stop) of its rows in a table sorted by value"""
+        values = values.to_numpy()
+        if not len(values):
+            return {}
+        starts = np.r_[0, np.flatnonzero(values[1:] != values[:-1]) + 1]
+        stops = np.r_[starts[1:], len(values)]
+        return {values[start]: (start, stop) for start, stop in zip(starts.tolist(), stops.tolist())}
+
+    def top(self, top_n=10, by='purchases', dimension=None, value=None):
+        """The ``top_n`` items by ``by`` overall, or within ``dimension == value``.
+
+        Returns a DataFrame slice with item, purchases, revenue, avg_price,
+        avg_rating and trending; empty for an unknown value.
+        """
+        if by not in POPULARITY_METRICS:
+            raise ValueError(f"Unknown popularity metric: {by}")
+        ranking = self._rankings.get((dimension, by))
+        if ranking is None:
+            raise ValueError(f"Unknown popularity dimension: {dimension}")
+        ranked, offsets = ranking
+        start, stop = offsets.get(0.0 if dimension is None else value, (0, 0))
+        return ranked.iloc[start:min(stop, start + top_n)]
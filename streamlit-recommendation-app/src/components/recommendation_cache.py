@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class RecommendationCache:
+    """Bounded LRU cache with TTL for top-N recommendation lists.
+
+    Entries are keyed by ``(model_version, customer_id, mode, alpha)`` and
+    remember the ``top_n`` they were computed for, so a stored top-20 also
+    answers any request for fewer items. A new ``model_version`` drops every
+    entry of the previous one. Safe to share between Streamlit sessions.
+    """
+
+    def __init__(self, max_entries=10000, ttl=600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.model_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, model_version, customer_id, mode, top_n, alpha=None):
+        """Cached top-``top_n`` list, or None on a miss"""
+        key = (model_version, customer_id, mode, alpha)
+        with self._lock:
+            self._check_version(model_version)
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            # A shorter list than its top_n is already the whole candidate set
+            if entry is None or (top_n > entry[1] and len(entry[2]) >= entry[1]):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2][:top_n]
+
+    def put(self, model_version, customer_id, mode, top_n, recommendations, alpha=None):
+        key = (model_version, customer_id, mode, alpha)
+        with self._lock:
+            self._check_version(model_version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > top_n and self.clock() - entry[0] <= self.ttl:
+                return  # keep the longer list
+            self._entries[key] = (self.clock(), top_n, list(recommendations))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, model_version, customer_id, mode, top_n, compute, alpha=None):
+        """Cached list, or ``compute(customer_id, top_n)`` stored for later requests"""
+        recommendations = self.get(model_version, customer_id, mode, top_n, alpha)
+        if recommendations is None:
+            recommendations = compute(customer_id, top_n)
+            self.put(model_version, customer_id, mode, top_n, recommendations, alpha)
+        return recommendations
+
+    def _check_version(self, model_version):
+        if model_version != self.model_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.model_version = model_version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        requests = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
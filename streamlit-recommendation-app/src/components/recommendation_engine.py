@@ -1,113 +1,403 @@
 import pandas as pd
 import numpy as np
+from collections import namedtuple
 from sklearn.metrics.pairwise import cosine_similarity
 import streamlit as st
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+try:
+    import config
+except ImportError:
+    # Fallback configuration
+    class Config:
+        HYBRID_ALPHA = 0.6
+        CONTENT_MATCH_SCORE = 5.0
+        CONTENT_MISMATCH_SCORE = 2.5
+        ANN_MIN_ITEMS = 100000
+        ANN_N_PROBE = 8
+        ANN_CANDIDATES = 200
+        SVD_FOLD_IN_REG = 0.02
+        SVD_FOLD_IN_MAX_USERS = 100000
+        POPULARITY_HALF_LIFE = 50000
+    
+    config = Config()
+
+from components.data_index import DataIndex
+from components.popularity import PopularityIndex
+from components.user_item_matrix import UserItemMatrix
+from components.item_neighbors import score_from_history
+from components.svd_scorer import as_scorer, top_n_indices
+
+# Per-customer interaction tables of one data version. ``append`` swaps in a
+# new one in a single assignment and each batch reads it once, so a batch
+# never pairs one version's matrix with another's similarity or histories
+InteractionTables = namedtuple('InteractionTables', ['user_item_matrix', 'item_similarity', 'customer_items'])
+# Sorted categories with the item and favorite codes into them, published the same way
+CategoryTables = namedtuple('CategoryTables', ['categories', 'favorite_category_codes', 'item_category_codes'])
 
 class RecommendationEngine:
     """Main recommendation engine class"""
     
-    def __init__(self, df, svd_model, item_similarity_df):
+    def __init__(self, df, svd_model, item_similarity_df, precomputed_recommendations=None,
+                 data_index=None, item_neighbors=None, ann_index=None, user_item_matrix=None, popularity=None):
         self.df = df
+        self.data_index = data_index if data_index is not None else DataIndex(df)
+        self.popularity = popularity if popularity is not None else PopularityIndex(df, config.POPULARITY_HALF_LIFE)
         self.svd_model = svd_model
         self.item_similarity_df = item_similarity_df
-        self.user_item_matrix = self.create_user_item_matrix()
+        self.item_neighbors = item_neighbors
+        self.precomputed_recommendations = precomputed_recommendations or {}
+        # An IncrementalDataset can hand over its incrementally maintained matrix
+        user_item_matrix = user_item_matrix if user_item_matrix is not None else self.create_user_item_matrix()
+        self.svd_scorer = as_scorer(svd_model)
+        if self.svd_scorer is not None:
+            self.svd_scorer.max_folded_users = config.SVD_FOLD_IN_MAX_USERS
+        self.ann_index = ann_index
+        # Recall vs latency knob: more probed lists -> higher recall, slower queries
+        self.ann_n_probe = config.ANN_N_PROBE
+        self.tables = InteractionTables(user_item_matrix, self.create_item_similarity(user_item_matrix),
+                                        self.data_index.customer_item_sets())
+        self.create_category_tables()
+        # Set by from_dataset; ``append`` feeds new transactions through it
+        self.dataset = None
+    
+    @classmethod
+    def from_dataset(cls, dataset, svd_model, item_similarity_df, **kwargs):
+        """Engine that reads the frame, index, matrix and popularity of an IncrementalDataset"""
+        engine = cls(dataset.df, svd_model, item_similarity_df, data_index=dataset.data_index,
+                     user_item_matrix=dataset.user_item_matrix, popularity=dataset.popularity, **kwargs)
+        engine.dataset = dataset
+        return engine
+    
+    def append(self, batch):
+        """Add raw transactions to the dataset and refresh what the engine derived from it.
+        
+        Only the customers in ``batch`` are re-read; the category tables and
+        item similarity are rebuilt only when the catalog or category set
+        changed. Folded-in SVD vectors of those customers (of everyone after
+        a renormalization) are dropped and refitted on their next request,
+        and items new to the SVD catalog are folded in. Returns True when
+        interaction scores were renormalized.
+        """
+        if self.dataset is None:
+            raise ValueError("append needs an engine built with RecommendationEngine.from_dataset")
+        renormalized = self.dataset.append(batch)
+        df = self.data_index.df
+        customer_ids = pd.unique(df['Customer ID'].to_numpy()[len(df) - len(batch):])
         
+        self.df = df
+        tables = self.tables
+        customer_items = dict(tables.customer_items)
+        for customer_id in customer_ids:
+            customer_items[customer_id] = self.data_index.customer_items(customer_id)
+        
+        user_item_matrix = self.dataset.user_item_matrix
+        new_items = not np.array_equal(user_item_matrix.item_ids, tables.user_item_matrix.item_ids)
+        item_similarity = self.create_item_similarity(user_item_matrix) if new_items else tables.item_similarity
+        self.tables = InteractionTables(user_item_matrix, item_similarity, customer_items)
+        for customer_id in customer_ids:
+            # Offline results could recommend what the customer just bought
+            self.precomputed_recommendations.pop(customer_id, None)
+        
+        if self.svd_scorer is not None:
+            self.svd_scorer.forget_users(None if renormalized else customer_ids)
+        # fold_in_new_items rebuilds the category tables when it adds items
+        if not (new_items and self.fold_in_new_items()):
+            self.update_category_tables(customer_ids)
+        return renormalized
+    
     def create_user_item_matrix(self):
-        """Create user-item matrix"""
-        return self.df.pivot_table(
-            index='Customer ID',
-            columns='Item Purchased',
-            values='interaction_score',
-            aggfunc='mean'
-        ).fillna(0)
+        """Create sparse user-item matrix"""
+        return UserItemMatrix.from_dataframe(self.df)
+    
+    @property
+    def user_item_matrix(self):
+        return self.tables.user_item_matrix
+    
+    @property
+    def item_similarity(self):
+        return self.tables.item_similarity
+    
+    @property
+    def customer_items(self):
+        return self.tables.customer_items
+    
+    def create_category_tables(self):
+        """Item -> category code array (scorer catalog order) and customer -> favorite code"""
+        categories = pd.Index(sorted(self.data_index.item_stats['category'].dropna().unique()))
+        
+        favorites = self.data_index.favorite_categories()
+        favorite_category_codes = pd.Series(
+            categories.get_indexer(favorites.astype(object)), index=favorites.index
+        )
+        
+        item_category_codes = None
+        if self.svd_scorer is not None:
+            item_category_codes = self.category_codes(self.svd_scorer.item_ids, categories)
+        self.category_tables = CategoryTables(categories, favorite_category_codes, item_category_codes)
+    
+    @property
+    def categories(self):
+        return self.category_tables.categories
+    
+    @property
+    def favorite_category_codes(self):
+        return self.category_tables.favorite_category_codes
+    
+    @property
+    def item_category_codes(self):
+        return self.category_tables.item_category_codes
+    
+    def category_codes(self, items, categories):
+        """Code in ``categories`` of each of ``items`` (-1 where the category is unknown)"""
+        return categories.get_indexer(self.data_index.items_info(items)['category'].astype(object))
+    
+    def update_category_tables(self, customer_ids):
+        """Refresh the favorite categories of ``customer_ids``; rebuild all tables if the category set changed"""
+        tables = self.category_tables
+        categories = self.data_index.item_stats['category'].dropna().unique()
+        if len(categories) != len(tables.categories) or (tables.categories.get_indexer(categories) < 0).any():
+            self.create_category_tables()
+            return
+        favorites = self.data_index.favorite_categories(customer_ids)
+        codes = pd.Series(tables.categories.get_indexer(favorites.astype(object)), index=favorites.index)
+        # Built aside and swapped in, so concurrent readers never see a partial table
+        self.category_tables = tables._replace(favorite_category_codes=pd.concat([
+            tables.favorite_category_codes.drop(codes.index, errors='ignore'), codes
+        ]))
+    
+    def create_item_similarity(self, user_item_matrix):
+        """Item x item similarity aligned with the columns of ``user_item_matrix``"""
+        item_ids = user_item_matrix.item_ids
+        if self.item_neighbors is not None:
+            return self.item_neighbors.to_sparse(item_ids)
+        if self.item_similarity_df is not None:
+            similarity = (self.item_similarity_df.reindex(index=item_ids, columns=item_ids)
+                          .fillna(0).to_numpy(dtype=np.float64, copy=True))
+            np.fill_diagonal(similarity, 0)
+            return similarity
+        return None
+    
+    def get_history_based_recommendations(self, customer_id, top_n=5):
+        """Get item-based recommendations from the customer's whole purchase history"""
+        return self.get_history_based_recommendations_batch([customer_id], top_n)[0]
+    
+    def get_history_based_recommendations_batch(self, customer_ids, top_n=5):
+        """Item-based recommendations for several customers in one sparse product.
+        
+        Every purchased item contributes its similarities weighted by the
+        customer's interaction_score with it.
+        """
+        tables = self.tables
+        if tables.item_similarity is None:
+            return [[] for _ in customer_ids]
+        
+        rows = tables.user_item_matrix.customer_index.lookup(list(customer_ids))
+        known = rows[rows >= 0]
+        if not len(known):
+            return [[] for _ in customer_ids]
+        
+        scores = score_from_history(tables.user_item_matrix.matrix[known], tables.item_similarity)
+        top_idx = top_n_indices(scores, top_n)
+        item_ids = tables.user_item_matrix.item_ids
+        
+        results, known_pos = [], 0
+        for row in rows:
+            if row < 0:
+                results.append([])
+                continue
+            row_scores = scores[known_pos, top_idx[known_pos]]
+            valid = np.isfinite(row_scores)
+            results.append(list(zip(item_ids[top_idx[known_pos][valid]].tolist(), row_scores[valid].tolist())))
+            known_pos += 1
+        return results
     
     def get_item_based_recommendations(self, item_name, top_n=5):
         """Get item-based collaborative filtering recommendations"""
-        if item_name not in self.item_similarity_df.index:
+        # Top-K neighbor index answers in O(K) without sorting a full column
+        if self.item_neighbors is not None and item_name in self.item_neighbors:
+            return self.item_neighbors.similar_items(item_name, top_n)
+        
+        if self.item_similarity_df is None or item_name not in self.item_similarity_df.index:
             return []
         
-        similar_items = self.item_similarity_df[item_name].sort_values(ascending=False)[1:top_n+1]
+        similar_items = self.item_similarity_df[item_name].drop(item_name).sort_values(ascending=False)
+        # Items without a shared buyer are not similar, whatever their rank
+        similar_items = similar_items[similar_items > 0][:top_n]
         return list(zip(similar_items.index, similar_items.values))
     
     def get_svd_recommendations(self, customer_id, top_n=5):
         """Get SVD-based recommendations"""
-        if self.svd_model is None:
+        # Serve from the offline batch table when it holds enough results
+        precomputed = self.precomputed_recommendations.get(customer_id)
+        if precomputed is not None and len(precomputed) >= top_n:
+            return precomputed[:top_n]
+
+        if self.svd_scorer is None:
             return []
-            
-        # Get all items
-        all_items = self.df['Item Purchased'].unique()
-        
-        # Get items already purchased by customer
-        customer_items = set(self.df[self.df['Customer ID'] == customer_id]['Item Purchased'])
-        
-        # Predict scores for unpurchased items
-        predictions_list = []
+
+        return self.get_svd_recommendations_batch([customer_id], top_n)[0]
+
+    def get_svd_recommendations_batch(self, customer_ids, top_n=5):
+        """Get SVD-based recommendations for several customers in one matrix product"""
+        if self.svd_scorer is None:
+            return [[] for _ in customer_ids]
+
+        self.fold_in_new_customers(customer_ids)
+        candidates = None
+        if self.use_ann:
+            # Approximate retrieval of the top-M items, re-ranked exactly by the scorer
+            candidates = self.ann_index.search(self.svd_scorer, customer_ids,
+                                               max(config.ANN_CANDIDATES, 2 * top_n), self.ann_n_probe)
+        return self.svd_scorer.recommend(customer_ids, top_n, exclude=self.tables.customer_items,
+                                         candidates=candidates)
+    
+    def is_personalized(self, customer_id, mode='svd'):
+        """Whether ``mode`` recommendations for ``customer_id`` come from their own data, not a fallback"""
+        if mode == 'item':
+            return self.user_item_matrix.customer_index.get(customer_id) is not None
+        if self.svd_scorer is None:
+            return customer_id in self.precomputed_recommendations
+        return self.svd_scorer.knows_customer(customer_id)
+    
+    @property
+    def use_ann(self):
+        """Use the ANN index only for large catalogs it was built for and when probing is partial"""
+        return (self.ann_index is not None and self.ann_index.matches(self.svd_scorer)
+                and self.svd_scorer.n_items >= config.ANN_MIN_ITEMS
+                and self.ann_n_probe < self.ann_index.n_lists)
+    
+    def fold_in_new_customers(self, customer_ids):
+        """Fit factors for customers with purchase history the SVD model never saw.
         
-        for item in all_items:
-            if item not in customer_items:
-                pred = self.svd_model.predict(customer_id, item)
-                predictions_list.append((item, pred.est))
+        Without this they would be ranked on the global mean plus item bias.
+        """
+        for customer_id in customer_ids:
+            if self.svd_scorer.knows_customer(customer_id):
+                continue
+            customer_data = self.data_index.customer_data(customer_id)
+            if not customer_data.empty:
+                self.svd_scorer.fold_in_user(customer_id, customer_data['Item Purchased'].tolist(),
+                                             customer_data['interaction_score'].to_numpy(),
+                                             reg=config.SVD_FOLD_IN_REG)
+    
+    def fold_in_new_items(self):
+        """Add items purchased since training to the SVD catalog; returns the added items"""
+        if self.svd_scorer is None:
+            return []
         
-        # Sort and return top N
-        predictions_list.sort(key=lambda x: x[1], reverse=True)
-        return predictions_list[:top_n]
+        items = self.data_index.item_stats.index
+        new_items = items[self.svd_scorer.item_index.lookup(items.to_numpy()) < 0]
+        added = self.svd_scorer.fold_in_items(
+            {item: self.data_index.item_ratings(item) for item in new_items}, reg=config.SVD_FOLD_IN_REG
+        )
+        if added:
+            # Category codes follow the scorer's catalog order
+            self.create_category_tables()
+        return added
     
-    def get_hybrid_recommendations(self, customer_id, top_n=5, alpha=0.6):
+    def get_hybrid_recommendations(self, customer_id, top_n=5, alpha=None):
         """Get hybrid recommendations (collaborative + content-based)"""
-        # Get collaborative recommendations
-        collab_recs = self.get_svd_recommendations(customer_id, top_n=top_n*2)
+        return self.get_hybrid_recommendations_batch([customer_id], top_n, alpha)[0]
+    
+    def get_hybrid_recommendations_batch(self, customer_ids, top_n=5, alpha=None):
+        """Hybrid scores for the whole catalog as array operations.
         
-        if not collab_recs:
-            return []
+        hybrid = alpha * collaborative + (1 - alpha) * content, where content is
+        CONTENT_MATCH_SCORE when the item is in the customer's favorite category
+        and CONTENT_MISMATCH_SCORE otherwise. Customers without history fall
+        back to the collaborative score alone.
+        """
+        alpha = config.HYBRID_ALPHA if alpha is None else alpha
         
-        # Get user preferences
-        customer_data = self.df[self.df['Customer ID'] == customer_id]
-        if customer_data.empty:
-            return collab_recs[:top_n]
+        if self.svd_scorer is None:
+            # Without a model, rerank the precomputed collaborative candidates
+            return [self._rerank_hybrid(self.get_svd_recommendations(cid, top_n * 2), cid, top_n, alpha)
+                    for cid in customer_ids]
         
-        # Get user's favorite category
-        favorite_category = customer_data['Category'].mode().iloc[0] if len(customer_data['Category'].mode()) > 0 else None
-        
-        # Calculate hybrid scores
-        hybrid_scores = []
-        for item, collab_score in collab_recs:
-            item_data = self.df[self.df['Item Purchased'] == item]
-            if not item_data.empty:
-                item_category = item_data['Category'].iloc[0]
-                
-                # Content score based on category match
-                content_score = 5.0 if item_category == favorite_category else 2.5
-                
-                # Combine scores
-                hybrid_score = alpha * collab_score + (1 - alpha) * content_score
-                hybrid_scores.append((item, hybrid_score))
-        
-        # Sort and return
-        hybrid_scores.sort(key=lambda x: x[1], reverse=True)
-        return hybrid_scores[:top_n]
-    
-    def get_popular_items_by_category(self, category, top_n=10):
-        """Get most popular items in a category"""
-        category_data = self.df[self.df['Category'] == category]
-        popular_items = category_data['Item Purchased'].value_counts().head(top_n)
+        self.fold_in_new_customers(customer_ids)
+        # One catalog and one category snapshot for scores, codes and id lookups
+        items = self.svd_scorer.items
+        tables = self.category_tables
+        item_category_codes = tables.item_category_codes
+        if len(item_category_codes) != len(items.item_ids):
+            # Items were folded in after the category tables were built
+            item_category_codes = self.category_codes(items.item_ids, tables.categories)
+        collab = self.svd_scorer.score_customers(customer_ids, items)
+        favorite = tables.favorite_category_codes.reindex(customer_ids).fillna(-1).to_numpy(dtype=np.int64)
+        has_favorite = favorite >= 0
         
-        results = []
-        for item, count in popular_items.items():
-            item_data = category_data[category_data['Item Purchased'] == item]
-            avg_price = item_data['Purchase Amount (USD)'].mean()
-            avg_rating = item_data['Review Rating'].mean()
-            results.append({
-                'item': item,
-                'purchases': count,
-                'avg_price': avg_price,
-                'avg_rating': avg_rating
-            })
+        content = np.where(item_category_codes[None, :] == favorite[:, None],
+                           config.CONTENT_MATCH_SCORE, config.CONTENT_MISMATCH_SCORE)
+        scores = np.where(has_favorite[:, None], alpha * collab + (1 - alpha) * content, collab)
         
+        # Items without category data cannot be content-scored
+        scores[np.ix_(has_favorite, item_category_codes < 0)] = -np.inf
+        customer_items = self.tables.customer_items
+        for row, customer_id in enumerate(customer_ids):
+            purchased = items.item_index.lookup(list(customer_items.get(customer_id, ())))
+            scores[row, purchased[purchased >= 0]] = -np.inf
+        
+        top_idx = top_n_indices(scores, top_n)
+        item_ids = items.item_ids
+        results = []
+        for row in range(len(customer_ids)):
+            row_scores = scores[row, top_idx[row]]
+            valid = np.isfinite(row_scores)
+            results.append(list(zip(item_ids[top_idx[row][valid]].tolist(), row_scores[valid].tolist())))
         return results
     
+    def _rerank_hybrid(self, collab_recs, customer_id, top_n, alpha):
+        """Apply the hybrid formula to a short list of (item, collaborative score)"""
+        tables = self.category_tables
+        favorite = tables.favorite_category_codes.get(customer_id, -1)
+        if not collab_recs or favorite < 0:
+            return collab_recs[:top_n]
+        
+        items = [item for item, _ in collab_recs]
+        collab = np.array([score for _, score in collab_recs])
+        codes = self.category_codes(items, tables.categories)
+        content = np.where(codes == favorite, config.CONTENT_MATCH_SCORE, config.CONTENT_MISMATCH_SCORE)
+        scores = np.where(codes >= 0, alpha * collab + (1 - alpha) * content, -np.inf)
+        
+        order = np.argsort(-scores, kind='stable')[:top_n]
+        return [(items[i], float(scores[i])) for i in order if np.isfinite(scores[i])]
+    
+    def get_popular_fallback(self, top_n=5, customer_id=None, category=None):
+        """Most purchased items (within ``category``) as (item, purchases), minus ``customer_id``'s own.
+        
+        Shown, labelled as popularity, when item similarity has nothing to offer.
+        """
+        purchased = self.tables.customer_items.get(customer_id, ())
+        top = self.popularity.top(top_n + len(purchased), 'purchases',
+                                  None if category is None else 'Category', category)
+        return [(item, float(purchases)) for item, purchases in zip(top['item'], top['purchases'])
+                if item not in purchased][:top_n]
+    
+    def get_popular_items_by_category(self, category, top_n=10, by='purchases'):
+        """Get most popular items in a category (``by``: purchases, revenue, rating or trending)"""
+        # A slice of the precomputed ranking; no pass over the transactions
+        top = self.popularity.top(top_n, by, 'Category', category)
+        return [
+            {
+                'item': item,
+                'purchases': int(purchases),
+                'revenue': float(revenue),
+                'avg_price': float(avg_price),
+                'avg_rating': float(avg_rating)
+            }
+            for item, purchases, revenue, avg_price, avg_rating in zip(
+                top['item'], top['purchases'], top['revenue'], top['avg_price'], top['avg_rating']
+            )
+        ]
+    
     def get_customer_profile(self, customer_id):
         """Get comprehensive customer profile"""
-        customer_data = self.df[self.df['Customer ID'] == customer_id]
+        customer_data = self.data_index.customer_data(customer_id)
         
         if customer_data.empty:
             return None
@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+
+RFM_COLUMNS = ['Monetary', 'Frequency', 'Recency', 'R_Score', 'F_Score', 'M_Score', 'RFM_Score', 'Segment']
+
+
+class LogQuantileSketch:
+    """Streaming quantile sketch over log-spaced buckets (DDSketch-style).
+
+    A value ``v > 0`` falls in bucket ``ceil(log(v) / log(gamma))`` with
+    ``gamma = (1 + a) / (1 - a)``, so every rank and quantile estimate is
+    within relative accuracy ``a``. Buckets are plain counts, which makes
+    inserts and deletes (a customer's value changing) O(1) per value and
+    the whole sketch O(log(max / min) / a) in size, whatever the row count.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.min_key = 0
+        self.zero_count = 0
+        self._cumulative = None
+
+    @property
+    def count(self):
+        return int(self.zero_count + self.counts.sum())
+
+    def _keys(self, values):
+        return np.ceil(np.log(values) / self.log_gamma).astype(np.int64)
+
+    def add(self, values, weight=1):
+        """Insert values (``weight=-1`` removes previously inserted ones)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        positive = values > 0
+        self.zero_count += weight * int((~positive).sum())
+        if positive.any():
+            keys = self._keys(values[positive])
+            low, high = int(keys.min()), int(keys.max())
+            if not len(self.counts):
+                self.min_key = low
+                self.counts = np.zeros(high - low + 1, dtype=np.int64)
+            elif low < self.min_key or high >= self.min_key + len(self.counts):
+                new_min = min(low, self.min_key)
+                grown = np.zeros(max(high, self.min_key + len(self.counts) - 1) - new_min + 1, dtype=np.int64)
+                grown[self.min_key - new_min:self.min_key - new_min + len(self.counts)] = self.counts
+                self.counts, self.min_key = grown, new_min
+            np.add.at(self.counts, keys - self.min_key, weight)
+        self._cumulative = None
+
+    def remove(self, values):
+        self.add(values, weight=-1)
+
+    def rank(self, values, tie_position=None):
+        """Rank fraction of each value: (count below + share of the ties) / count.
+
+        Ties are split at ``tie_position`` (0-1 per value), the middle by
+        default; an arrival-order position mimics ``rank(method='first')``.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        total = self.count
+        if total == 0:
+            return np.full(len(values), np.nan)
+        if self._cumulative is None:
+            self._cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+
+        ranks = np.where(values > 0, float(self.zero_count), self.zero_count / 2)
+        positive = values > 0
+        slots = np.clip(self._keys(values[positive]) - self.min_key, -1, len(self.counts))
+        inside = (slots >= 0) & (slots < len(self.counts))
+        below = self._cumulative[np.clip(slots, 0, len(self.counts))]
+        ties = np.where(inside, self.counts[np.clip(slots, 0, len(self.counts) - 1)], 0)
+        position = 0.5 if tie_position is None else np.asarray(tie_position, dtype=np.float64)[positive]
+        ranks[positive] += below + ties * position
+        ranks[np.isnan(values)] = np.nan
+        return ranks / total
+
+    def quantile(self, q):
+        """Value at quantile ``q`` (bucket midpoint, within the relative accuracy)"""
+        total = self.count
+        if total == 0:
+            return np.nan
+        target = q * (total - 1)
+        if target < self.zero_count:
+            return 0.0
+        key = int(np.searchsorted(np.cumsum(self.counts), target - self.zero_count, side='right')) + self.min_key
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+
+def quintile_scores(ranks):
+    """Scores 1-5 from rank fractions, like ``qcut(q=5)`` on the ranked values"""
+    # A missing metric gets the neutral middle score
+    return np.clip(np.ceil(np.nan_to_num(ranks, nan=0.5) * 5), 1, 5).astype(np.int64)
+
+
+def rfm_segments(r_score, f_score, m_score):
+    """Campaign segment per customer (the notebook's rules, vectorized)"""
+    conditions = [
+        (r_score >= 4) & (f_score >= 4) & (m_score >= 4),
+        (r_score >= 3) & (f_score >= 3),
+        (r_score >= 4) & (f_score < 3),
+        (r_score < 3) & (f_score >= 4),
+        (r_score < 3) & (f_score < 3) & (m_score >= 3),
+    ]
+    choices = ['Champions', 'Loyal Customers', 'Potential Loyalists', 'At Risk', 'Hibernating']
+    return np.select(conditions, choices, default='Lost').astype(object)
+
+
+class RFMAnalysis:
+    """Recency/Frequency/Monetary scores that stay current as transactions arrive.
+
+    Per-customer totals (spend, purchase count, Previous Purchases sum as the
+    notebook's recency proxy) are kept in arrays and updated by addition.
+    Each metric also feeds a LogQuantileSketch; when a customer's value
+    changes, the old value is removed and the new one inserted, so quintile
+    scores are read from the current distribution without re-sorting.
+    Scores are computed at lookup time, so they are never stale; the sorted
+    per-segment listings are cached until the next ``append``.
+    """
+
+    def __init__(self, df=None, relative_accuracy=0.01, capacity=1024):
+        self.customer_ids = []
+        self.customer_index = {}
+        self.monetary = np.zeros(capacity)
+        self.frequency = np.zeros(capacity, dtype=np.int64)
+        self.previous_sum = np.zeros(capacity)
+        self.previous_count = np.zeros(capacity, dtype=np.int64)
+        self.sketches = {metric: LogQuantileSketch(relative_accuracy)
+                         for metric in ['Monetary', 'Frequency', 'Recency']}
+        self._segment_tables = None
+        if df is not None:
+            self.append(df)
+
+    @property
+    def n_customers(self):
+        return len(self.customer_ids)
+
+    def _grow(self, needed):
+        capacity = len(self.monetary)
+        if needed <= capacity:
+            return
+        extra = max(needed, 2 * capacity) - capacity
+        self.monetary = np.concatenate([self.monetary, np.zeros(extra)])
+        self.frequency = np.concatenate([self.frequency, np.zeros(extra, dtype=np.int64)])
+        self.previous_sum = np.concatenate([self.previous_sum, np.zeros(extra)])
+        self.previous_count = np.concatenate([self.previous_count, np.zeros(extra, dtype=np.int64)])
+
+    def _metrics(self, codes):
+        recency = np.divide(self.previous_sum[codes], self.previous_count[codes],
+                            out=np.full(len(codes), np.nan), where=self.previous_count[codes] > 0)
+        return {'Monetary': self.monetary[codes], 'Frequency': self.frequency[codes], 'Recency': recency}
+
+    def append(self, df):
+        """Add transaction rows; only the customers in ``df`` are touched"""
+        batch = df[df['Customer ID'].notna()].groupby('Customer ID', sort=False, observed=True).agg(
+            monetary=('Purchase Amount (USD)', 'sum'),
+            frequency=('Item Purchased', 'count'),
+            previous_sum=('Previous Purchases', 'sum'),
+            previous_count=('Previous Purchases', 'count')
+        )
+        codes = np.empty(len(batch), dtype=np.int64)
+        for pos, customer_id in enumerate(batch.index.tolist()):
+            code = self.customer_index.get(customer_id)
+            if code is None:
+                code = self.customer_index[customer_id] = len(self.customer_ids)
+                self.customer_ids.append(customer_id)
+            codes[pos] = code
+        self._grow(len(self.customer_ids))
+
+        # Returning customers leave the sketches with their old values first
+        returning = codes[self.frequency[codes] > 0]
+        for metric, values in self._metrics(returning).items():
+            self.sketches[metric].remove(values)
+
+        # Codes are unique within a batch, so plain fancy-index addition is safe
+        self.monetary[codes] += batch['monetary'].to_numpy(dtype=np.float64)
+        self.frequency[codes] += batch['frequency'].to_numpy(dtype=np.int64)
+        self.previous_sum[codes] += batch['previous_sum'].to_numpy(dtype=np.float64)
+        self.previous_count[codes] += batch['previous_count'].to_numpy(dtype=np.int64)
+
+        active = codes[self.frequency[codes] > 0]
+        for metric, values in self._metrics(active).items():
+            self.sketches[metric].add(values)
+        self._segment_tables = None
+
+    def _table(self, codes, index):
+        metrics = self._metrics(codes)
+        # Fewer previous purchases reads as more recent, so R is reversed
+        r_score = 6 - quintile_scores(self.sketches['Recency'].rank(metrics['Recency']))
+        # Frequency is heavily tied (often 1 purchase each); like the notebook's
+        # rank(method='first'), ties are split by customer arrival order
+        f_score = quintile_scores(self.sketches['Frequency'].rank(
+            metrics['Frequency'], tie_position=(codes + 0.5) / max(self.n_customers, 1)
+        ))
+        m_score = quintile_scores(self.sketches['Monetary'].rank(metrics['Monetary']))
+        table = pd.DataFrame(metrics, index=index)
+        table['R_Score'], table['F_Score'], table['M_Score'] = r_score, f_score, m_score
+        table['RFM_Score'] = (r_score * 100 + f_score * 10 + m_score).astype(str)
+        table['Segment'] = rfm_segments(r_score, f_score, m_score)
+        return table
+
+    def scores(self, customer_ids):
+        """RFM metrics, scores and segment for the known customers among ``customer_ids``"""
+        known = [cid for cid in customer_ids if self.customer_index.get(cid) is not None]
+        codes = np.array([self.customer_index[cid] for cid in known], dtype=np.int64)
+        return self._table(codes, pd.Index(known, name='Customer ID'))
+
+    def customer(self, customer_id):
+        """One customer's RFM record as a dict, or None if unknown"""
+        table = self.scores([customer_id])
+        return table.iloc[0].to_dict() if len(table) else None
+
+    def table(self):
+        """Every customer, in the rfm_analysis.csv layout"""
+        codes = np.arange(self.n_customers)
+        return self._table(codes, pd.Index(self.customer_ids, name='Customer ID')).reset_index()
+
+    def segment_table(self, segment=None):
+        """Customers of ``segment`` (all when None) sorted by spend, highest first.
+
+        Every listing is sorted once and reused until new rows arrive, so a
+        page is just a slice of it. An unknown segment gives an empty table.
+        """
+        tables = self._segment_tables
+        if tables is None:
+            ranked = self.table().sort_values('Monetary', ascending=False, kind='stable', ignore_index=True)
+            tables = {None: ranked}
+            for name, group in ranked.groupby('Segment', sort=True):
+                tables[name] = group.reset_index(drop=True)
+            self._segment_tables = tables
+        return tables.get(segment, tables[None].iloc[:0])
+
+    def segments(self):
+        """Segment names present, sorted"""
+        self.segment_table()
+        return [name for name in self._segment_tables if name is not None]
+
+    def segment_counts(self):
+        return self.segment_table()['Segment'].value_counts()
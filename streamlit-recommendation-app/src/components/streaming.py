@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from components.aggregate_cube import AggregateCube
+from components.data_loader import interaction_coefficients, preprocess_shopping_data
+from components.rfm import RFMAnalysis
+from components.user_item_matrix import InteractionAccumulator
+
+# Columns the first pass needs to normalize interaction_score
+STATISTICS_COLUMNS = ['Customer ID', 'Purchase Amount (USD)', 'Previous Purchases']
+INTERACTION_COLUMNS = ['Customer ID', 'Item Purchased', 'interaction_score']
+
+
+def iter_csv_chunks(path, chunk_size, columns=None):
+    """DataFrames of at most ``chunk_size`` rows from a CSV file"""
+    return pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+
+
+class StreamingPipeline:
+    """Two-pass, bounded-memory processing of a transactions CSV larger than RAM.
+
+    Pass 1 reads only the normalizing columns to get the global maxima
+    interaction_score depends on. Pass 2 preprocesses each chunk against
+    those maxima and folds it into running structures whose size depends on
+    distinct customers, items and cells, never on the row count:
+    per-cell interaction sums (the sparse user-item matrix), the aggregate
+    cube and the RFM totals. Normalized interactions can be written to
+    Parquet as they are produced.
+    """
+
+    def __init__(self, path, chunk_size=500000):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.statistics = None
+
+    def scan(self):
+        """First pass: row count and global maxima of amount and previous purchases"""
+        n_rows, max_amount, max_previous = 0, np.nan, np.nan
+        for chunk in iter_csv_chunks(self.path, self.chunk_size, STATISTICS_COLUMNS):
+            amount = pd.to_numeric(chunk['Purchase Amount (USD)'], errors='coerce')
+            previous = pd.to_numeric(chunk['Previous Purchases'], errors='coerce')
+            n_rows += len(chunk)
+            max_amount = np.nanmax([max_amount, amount.max()])
+            max_previous = np.nanmax([max_previous, previous.max()])
+        self.statistics = {'n_rows': n_rows, 'max_amount': float(max_amount), 'max_previous': float(max_previous)}
+        return self.statistics
+
+    def chunks(self):
+        """Preprocessed chunks normalized with the global maxima (runs ``scan`` if needed)"""
+        if self.statistics is None:
+            self.scan()
+        for chunk in iter_csv_chunks(self.path, self.chunk_size):
+            yield preprocess_shopping_data(chunk, self.statistics['max_amount'], self.statistics['max_previous'])
+
+    def run(self, interactions_path=None, progress=None):
+        """Second pass: build the user-item matrix, cube and RFM analysis.
+
+        Returns a dict with ``statistics``, ``user_item_matrix``, ``cube`` and
+        ``rfm``. ``interactions_path`` also writes (customer, item, score)
+        rows to Parquet; ``progress(rows_done, n_rows)`` is called per chunk.
+        """
+        interactions = InteractionAccumulator()
+        cube, rfm, writer = None, RFMAnalysis(), None
+        rows_done = 0
+        try:
+            for chunk in self.chunks():
+                interactions.append(chunk)
+                rfm.append(chunk)
+                if cube is None:
+                    cube = AggregateCube(chunk)
+                else:
+                    cube.append(chunk)
+                if interactions_path is not None:
+                    writer = self._write_interactions(writer, interactions_path, chunk)
+                rows_done += len(chunk)
+                if progress is not None:
+                    progress(rows_done, self.statistics['n_rows'])
+        finally:
+            if writer is not None:
+                writer.close()
+
+        coefficients = interaction_coefficients(self.statistics['max_amount'], self.statistics['max_previous'])
+        return {
+            'statistics': self.statistics,
+            'user_item_matrix': interactions.to_matrix(coefficients),
+            'cube': cube,
+            'rfm': rfm,
+        }
+
+    @staticmethod
+    def _write_interactions(writer, path, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = chunk[INTERACTION_COLUMNS].dropna()
+        customer_ids = rows['Customer ID']
+        # Fixed types, so every chunk matches the schema of the first one
+        table = pa.Table.from_pandas(pd.DataFrame({
+            'Customer ID': (customer_ids.astype(np.int64) if pd.api.types.is_numeric_dtype(customer_ids)
+                            else customer_ids.astype(str)),
+            'Item Purchased': rows['Item Purchased'].astype(str),
+            'interaction_score': rows['interaction_score'].astype(np.float32),
+        }), preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+        return writer
@@ -0,0 +1,439 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+# Arrays written by SVDScorer.save; each is a plain .npy so it can be memory-mapped
+FACTOR_FILES = ['pu', 'qi', 'bu', 'bi', 'user_ids_sorted', 'user_order',
+                'item_ids', 'item_ids_sorted', 'item_order']
+
+# Item side of the model; fold-ins swap in a new one in a single assignment,
+# so a reader that takes one snapshot never mixes two catalogs
+ItemFactors = namedtuple('ItemFactors', ['qi', 'bi', 'item_ids', 'item_index'])
+
+
+class IdIndex:
+    """Raw id -> inner id lookup over a sorted id array.
+
+    Unlike a dict this is two flat arrays, so it can be memory-mapped and
+    shared between processes.
+    """
+
+    def __init__(self, sorted_ids, order):
+        self.sorted_ids = sorted_ids
+        self.order = order
+
+    @classmethod
+    def from_ids(cls, ids):
+        ids = np.asarray(ids)
+        order = np.argsort(ids, kind='stable')
+        return cls(ids[order], order)
+
+    def lookup(self, raw_ids):
+        """Inner ids for ``raw_ids``, -1 where an id is unknown"""
+        values = raw_ids
+        raw_ids = np.asarray(raw_ids)
+        if raw_ids.size == 0 or self.sorted_ids.size == 0:
+            return np.full(raw_ids.shape, -1, dtype=np.int64)
+        numeric = raw_ids.dtype.kind in 'biuf'
+        if raw_ids.dtype == object or numeric != (self.sorted_ids.dtype.kind in 'biuf'):
+            # Mixed ids (e.g. a str among ints) were coerced to one dtype that
+            # matches nothing; resolve each id alone so one bad id spoils no others
+            values = np.asarray(values, dtype=object).ravel()
+            return np.array([self._lookup_one(value) for value in values], dtype=np.int64).reshape(raw_ids.shape)
+        pos = np.searchsorted(self.sorted_ids, raw_ids)
+        pos = np.minimum(pos, self.sorted_ids.size - 1)
+        found = self.sorted_ids[pos] == raw_ids
+        return np.where(found, self.order[pos], -1).astype(np.int64)
+
+    def _lookup_one(self, raw_id):
+        try:
+            pos = int(np.searchsorted(self.sorted_ids, raw_id))
+        except TypeError:
+            # Ids of a different type (e.g. str vs int) can never match
+            return -1
+        if pos < self.sorted_ids.size and self.sorted_ids[pos] == raw_id:
+            return int(self.order[pos])
+        return -1
+
+    def get(self, raw_id, default=None):
+        inner_id = int(self.lookup([raw_id])[0])
+        return default if inner_id < 0 else inner_id
+
+    def __contains__(self, raw_id):
+        return self.get(raw_id) is not None
+
+    def __len__(self):
+        return len(self.sorted_ids)
+
+
+class SVDScorer:
+    """Vectorized scoring over the latent factors of a trained SVD model.
+
+    Also serves as a lightweight predictor: it needs only NumPy, so workers
+    that load it from exported factors never import surprise.
+    """
+
+    def __init__(self, user_factors, item_factors, user_bias, item_bias, global_mean,
+                 user_ids, item_ids, rating_scale=None, user_index=None, item_index=None, model_version=None,
+                 max_folded_users=100000):
+        self.pu = np.asarray(user_factors, dtype=np.float64)
+        self.bu = np.asarray(user_bias, dtype=np.float64)
+        self.global_mean = float(global_mean)
+        self.rating_scale = rating_scale
+        self.user_index = user_index if user_index is not None else IdIndex.from_ids(user_ids)
+        item_ids = np.asarray(item_ids)
+        self.items = ItemFactors(
+            np.asarray(item_factors, dtype=np.float64), np.asarray(item_bias, dtype=np.float64), item_ids,
+            item_index if item_index is not None else IdIndex.from_ids(item_ids)
+        )
+        # Customers folded in after training: id -> (latent vector, bias),
+        # least recently fitted first and capped at ``max_folded_users``
+        self.folded_users = OrderedDict()
+        self.max_folded_users = max_folded_users
+        self._fold_lock = threading.Lock()
+        # Content hash of the trained factors; derived artifacts are stamped with it
+        self.model_version = model_version or self._content_hash()
+
+    @classmethod
+    def from_surprise(cls, svd_model):
+        """Extract factors, biases and id maps from a fitted surprise SVD"""
+        trainset = svd_model.trainset
+        user_ids = [trainset.to_raw_uid(inner_id) for inner_id in range(trainset.n_users)]
+        item_ids = [trainset.to_raw_iid(inner_id) for inner_id in range(trainset.n_items)]
+
+        if svd_model.biased:
+            user_bias, item_bias = svd_model.bu, svd_model.bi
+            global_mean = trainset.global_mean
+        else:
+            # Unbiased SVD predicts with the dot product only
+            user_bias = np.zeros(trainset.n_users)
+            item_bias = np.zeros(trainset.n_items)
+            global_mean = 0.0
+
+        return cls(
+            svd_model.pu, svd_model.qi, user_bias, item_bias, global_mean,
+            user_ids, item_ids, rating_scale=trainset.rating_scale
+        )
+
+    @property
+    def qi(self):
+        return self.items.qi
+
+    @property
+    def bi(self):
+        return self.items.bi
+
+    @property
+    def item_ids(self):
+        return self.items.item_ids
+
+    @property
+    def item_index(self):
+        return self.items.item_index
+
+    def _arrays(self):
+        """The arrays in FACTOR_FILES as written to disk"""
+        items = self.items
+        arrays = {
+            'pu': self.pu, 'qi': items.qi, 'bu': self.bu, 'bi': items.bi,
+            'user_ids_sorted': self.user_index.sorted_ids, 'user_order': self.user_index.order,
+            'item_ids': items.item_ids,
+            'item_ids_sorted': items.item_index.sorted_ids, 'item_order': items.item_index.order,
+        }
+        for name, array in arrays.items():
+            # Object arrays cannot be memory-mapped, so store ids as fixed-width strings
+            array = np.asarray(array)
+            arrays[name] = array.astype(str) if array.dtype == object else array
+        return arrays
+
+    def _content_hash(self):
+        """Short SHA-256 of every factor array and the scalar parameters"""
+        digest = hashlib.sha256()
+        for name, array in self._arrays().items():
+            digest.update(f"{name}:{array.dtype.str}:{array.shape};".encode())
+            digest.update(np.ascontiguousarray(array).data)
+        digest.update(json.dumps([self.global_mean, self._rating_scale()]).encode())
+        return digest.hexdigest()[:16]
+
+    def _rating_scale(self):
+        return list(map(float, self.rating_scale)) if self.rating_scale is not None else None
+
+    def save(self, directory):
+        """Write factors, biases and id maps as .npy files plus a small JSON header"""
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self._arrays().items():
+            np.save(os.path.join(directory, f"{name}.npy"), array, allow_pickle=False)
+
+        meta = {
+            'global_mean': self.global_mean,
+            'rating_scale': self._rating_scale(),
+            'n_factors': int(self.qi.shape[1]),
+            'model_version': self._content_hash(),
+        }
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """Load exported factors; with ``mmap_mode='r'`` the arrays stay in the page cache"""
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in FACTOR_FILES
+        }
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+
+        return cls(
+            arrays['pu'], arrays['qi'], arrays['bu'], arrays['bi'], meta['global_mean'],
+            None, arrays['item_ids'], rating_scale=meta['rating_scale'],
+            user_index=IdIndex(arrays['user_ids_sorted'], arrays['user_order']),
+            item_index=IdIndex(arrays['item_ids_sorted'], arrays['item_order']),
+            model_version=meta.get('model_version')
+        )
+
+    @staticmethod
+    def exists(directory):
+        return os.path.exists(os.path.join(directory, 'meta.json'))
+
+    @staticmethod
+    def version_files(directory):
+        """Files whose contents identify the factors in ``directory``.
+
+        meta.json is enough once it records the model_version content hash;
+        exports that predate it need every .npy file hashed as well.
+        """
+        meta_path = os.path.join(directory, 'meta.json')
+        try:
+            with open(meta_path) as f:
+                if 'model_version' in json.load(f):
+                    return [meta_path]
+        except (OSError, ValueError):
+            return [meta_path]
+        return [meta_path] + [os.path.join(directory, f"{name}.npy") for name in FACTOR_FILES]
+
+    @property
+    def n_items(self):
+        return len(self.item_ids)
+
+    def user_vectors(self, customer_ids):
+        """Latent vectors and biases for ``customer_ids``, folded-in customers included.
+
+        Unknown customers get a zero latent vector and zero bias, which
+        matches surprise's fallback of global mean plus item bias.
+        """
+        inner_ids = self.user_index.lookup(list(customer_ids))
+        known = inner_ids >= 0
+
+        user_vectors = np.zeros((len(inner_ids), self.qi.shape[1]))
+        user_bias = np.zeros(len(inner_ids))
+        user_vectors[known] = self.pu[inner_ids[known]]
+        user_bias[known] = self.bu[inner_ids[known]]
+
+        if self.folded_users:
+            for row, customer_id in enumerate(customer_ids):
+                folded = self.folded_users.get(customer_id)
+                if folded is not None:
+                    user_vectors[row], user_bias[row] = folded
+        return user_vectors, user_bias
+
+    def knows_customer(self, customer_id):
+        return customer_id in self.folded_users or customer_id in self.user_index
+
+    def score_customers(self, customer_ids, items=None):
+        """Return a (customers x items) matrix of predicted scores (over the ``items`` snapshot if given)"""
+        items = self.items if items is None else items
+        user_vectors, user_bias = self.user_vectors(customer_ids)
+
+        scores = user_vectors @ items.qi.T
+        scores += self.global_mean + user_bias[:, None] + items.bi[None, :]
+
+        if self.rating_scale is not None:
+            np.clip(scores, self.rating_scale[0], self.rating_scale[1], out=scores)
+        return scores
+
+    def predict(self, customer_id, item):
+        """Predicted score for one (customer, item) pair, like surprise's ``predict().est``"""
+        items = self.items
+        item_id = items.item_index.get(item)
+        if item_id is None:
+            estimate = self.global_mean + self.user_vectors([customer_id])[1][0]
+            if self.rating_scale is not None:
+                estimate = min(max(estimate, self.rating_scale[0]), self.rating_scale[1])
+            return float(estimate)
+        return float(self.score_customers([customer_id], items)[0, item_id])
+
+    def score_candidates(self, customer_ids, candidates, items=None):
+        """Exact scores for a (customers x M) array of item inner ids (-1 = padding -> -inf)"""
+        items = self.items if items is None else items
+        user_vectors, user_bias = self.user_vectors(customer_ids)
+
+        valid = candidates >= 0
+        item_ids = np.where(valid, candidates, 0)
+        scores = np.einsum('cmf,cf->cm', items.qi[item_ids], user_vectors)
+        scores += self.global_mean + user_bias[:, None] + items.bi[item_ids]
+
+        if self.rating_scale is not None:
+            np.clip(scores, self.rating_scale[0], self.rating_scale[1], out=scores)
+        scores[~valid] = -np.inf
+        return scores
+
+    def fold_in_user(self, customer_id, items, ratings, reg=0.02):
+        """Fit a latent vector and bias for ``customer_id`` against the fixed item factors.
+
+        Solves surprise's regularized objective in closed form with the item
+        terms held fixed: ridge regression of ``r - mu - bi`` on ``[qi, 1]``.
+        Past ``max_folded_users`` the least recently fitted customer is
+        dropped. Returns False when none of ``items`` is in the catalog.
+        """
+        catalog = self.items
+        item_ids = catalog.item_index.lookup(list(items))
+        known = item_ids >= 0
+        if not known.any():
+            return False
+        item_ids = item_ids[known]
+        ratings = np.asarray(ratings, dtype=np.float64)[known]
+
+        design = np.hstack([catalog.qi[item_ids], np.ones((len(item_ids), 1))])
+        solution = _ridge(design, ratings - self.global_mean - catalog.bi[item_ids], reg)
+        with self._fold_lock:
+            self.folded_users[customer_id] = (solution[:-1], solution[-1])
+            self.folded_users.move_to_end(customer_id)
+            while len(self.folded_users) > self.max_folded_users:
+                self.folded_users.popitem(last=False)
+        return True
+
+    def forget_users(self, customer_ids=None):
+        """Drop folded-in vectors of ``customer_ids`` (all when None) so they are refitted"""
+        with self._fold_lock:
+            if customer_ids is None:
+                self.folded_users.clear()
+            else:
+                for customer_id in customer_ids:
+                    self.folded_users.pop(customer_id, None)
+
+    def fold_in_item(self, item, customer_ids, ratings, reg=0.02):
+        """Fit factors and bias for ``item`` against the fixed customer factors.
+
+        Returns False when none of ``customer_ids`` is known.
+        """
+        return bool(self.fold_in_items({item: (customer_ids, ratings)}, reg))
+
+    def fold_in_items(self, item_ratings, reg=0.02):
+        """Fit several items from ``item -> (customer_ids, ratings)``; returns the fitted items.
+
+        New items are appended to the catalog and known ones refitted. The
+        item arrays are copied, never written in place (they may be memory-
+        mapped or read by other threads), and swapped in as one ItemFactors.
+        """
+        fitted = {}
+        for item, (customer_ids, ratings) in item_ratings.items():
+            customer_ids = list(customer_ids)
+            known = np.array([self.knows_customer(cid) for cid in customer_ids], dtype=bool)
+            if not known.any():
+                continue
+            user_vectors, user_bias = self.user_vectors(customer_ids)
+            ratings = np.asarray(ratings, dtype=np.float64)[known]
+            design = np.hstack([user_vectors[known], np.ones((known.sum(), 1))])
+            fitted[item] = _ridge(design, ratings - self.global_mean - user_bias[known], reg)
+        if not fitted:
+            return []
+
+        with self._fold_lock:
+            catalog = self.items
+            inner_ids = catalog.item_index.lookup(list(fitted))
+            solutions = np.array(list(fitted.values()))
+            refit = inner_ids >= 0
+            qi, bi = catalog.qi, catalog.bi
+            if refit.any():
+                qi, bi = np.array(qi), np.array(bi)
+                qi[inner_ids[refit]], bi[inner_ids[refit]] = solutions[refit, :-1], solutions[refit, -1]
+
+            item_ids, item_index = catalog.item_ids, catalog.item_index
+            if not refit.all():
+                new_items = np.empty((~refit).sum(), dtype=object)
+                new_items[:] = [item for item, known in zip(fitted, refit) if not known]
+                qi = np.vstack([qi, solutions[~refit, :-1]])
+                bi = np.append(bi, solutions[~refit, -1])
+                item_ids = np.append(item_ids.astype(object), new_items)
+                item_index = IdIndex.from_ids(item_ids)
+            self.items = ItemFactors(qi, bi, item_ids, item_index)
+        return list(fitted)
+
+    def recommend(self, customer_ids, top_n=5, exclude=None, candidates=None):
+        """Top-N (item, score) lists for each customer in ``customer_ids``.
+
+        ``exclude`` maps a customer ID to the items that must not be
+        recommended to them (usually their purchase history). ``candidates``
+        optionally restricts each customer to a (customers x M) array of item
+        inner ids, e.g. from an ANN index; customers left with fewer than
+        ``top_n`` candidates are scored exactly over the whole catalog.
+        """
+        # One snapshot, so a concurrent fold-in cannot shift ids between scoring and lookup
+        items = self.items
+        if candidates is None:
+            scores = self.score_customers(customer_ids, items)
+            columns = None
+        else:
+            scores = self.score_candidates(customer_ids, candidates, items)
+            columns = candidates
+
+        if exclude:
+            for row, customer_id in enumerate(customer_ids):
+                excluded = items.item_index.lookup(list(exclude.get(customer_id, ())))
+                excluded = excluded[excluded >= 0]
+                if columns is None:
+                    scores[row, excluded] = -np.inf
+                else:
+                    scores[row, np.isin(columns[row], excluded)] = -np.inf
+
+        top_idx = top_n_indices(scores, top_n)
+        results = []
+        for row in range(len(customer_ids)):
+            row_scores = scores[row, top_idx[row]]
+            valid = np.isfinite(row_scores)
+            item_idx = top_idx[row][valid] if columns is None else columns[row, top_idx[row][valid]]
+            results.append(list(zip(items.item_ids[item_idx].tolist(), row_scores[valid].tolist())))
+
+        if columns is not None:
+            # Exact fallback when the probed lists could not fill the top-N
+            short = [row for row, recs in enumerate(results) if len(recs) < min(top_n, len(items.item_ids))]
+            if short:
+                exact = self.recommend([customer_ids[row] for row in short], top_n, exclude=exclude)
+                for row, recs in zip(short, exact):
+                    results[row] = recs
+        return results
+
+
+def _ridge(design, target, reg):
+    """Closed-form ridge solution; like surprise's SGD, the penalty scales with the rating count"""
+    gram = design.T @ design + reg * len(target) * np.eye(design.shape[1])
+    return np.linalg.solve(gram, design.T @ target)
+
+
+def as_scorer(model):
+    """Accept either an SVDScorer or a fitted surprise SVD"""
+    if model is None or isinstance(model, SVDScorer):
+        return model
+    return SVDScorer.from_surprise(model)
+
+
+def top_n_indices(scores, top_n):
+    """Column indices of the ``top_n`` highest scores per row, best first"""
+    scores = np.atleast_2d(scores)
+    n_cols = scores.shape[1]
+    top_n = min(top_n, n_cols)
+    if top_n <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+
+    if top_n < n_cols:
+        candidates = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+    else:
+        candidates = np.tile(np.arange(n_cols), (scores.shape[0], 1))
+
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+SHOPPING_COLUMNS = [
+    'Customer ID', 'Age', 'Gender', 'Item Purchased', 'Category', 'Purchase Amount (USD)', 'Location',
+    'Size', 'Color', 'Season', 'Review Rating', 'Subscription Status', 'Shipping Type', 'Discount Applied',
+    'Promo Code Used', 'Previous Purchases', 'Payment Method', 'Frequency of Purchases'
+]
+
+# Vocabularies and shares observed in shopping_behavior_updated.csv
+CATEGORY_ITEMS = {
+    'Clothing': ['Blouse', 'Sweater', 'Jeans', 'Shirt', 'Shorts', 'Dress', 'Skirt', 'Pants', 'Hoodie',
+                 'T-shirt', 'Socks'],
+    'Accessories': ['Handbag', 'Sunglasses', 'Jewelry', 'Scarf', 'Hat', 'Backpack', 'Belt', 'Gloves'],
+    'Footwear': ['Sandals', 'Sneakers', 'Shoes', 'Boots'],
+    'Outerwear': ['Coat', 'Jacket'],
+}
+LOCATIONS = [
+    'Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California', 'Colorado', 'Connecticut', 'Delaware', 'Florida',
+    'Georgia', 'Hawaii', 'Idaho', 'Illinois', 'Indiana', 'Iowa', 'Kansas', 'Kentucky', 'Louisiana', 'Maine',
+    'Maryland', 'Massachusetts', 'Michigan', 'Minnesota', 'Mississippi', 'Missouri', 'Montana', 'Nebraska',
+    'Nevada', 'New Hampshire', 'New Jersey', 'New Mexico', 'New York', 'North Carolina', 'North Dakota', 'Ohio',
+    'Oklahoma', 'Oregon', 'Pennsylvania', 'Rhode Island', 'South Carolina', 'South Dakota', 'Tennessee', 'Texas',
+    'Utah', 'Vermont', 'Virginia', 'Washington', 'West Virginia', 'Wisconsin', 'Wyoming'
+]
+COLORS = [
+    'Beige', 'Black', 'Blue', 'Brown', 'Charcoal', 'Cyan', 'Gold', 'Gray', 'Green', 'Indigo', 'Lavender',
+    'Magenta', 'Maroon', 'Olive', 'Orange', 'Peach', 'Pink', 'Purple', 'Red', 'Silver', 'Teal', 'Turquoise',
+    'Violet', 'White', 'Yellow'
+]
+SIZES = (['S', 'M', 'L', 'XL'], [0.17, 0.45, 0.27, 0.11])
+SEASONS = ['Spring', 'Summer', 'Fall', 'Winter']
+SHIPPING_TYPES = ['Free Shipping', 'Standard', 'Store Pickup', 'Next Day Air', 'Express', '2-Day Shipping']
+PAYMENT_METHODS = ['PayPal', 'Credit Card', 'Cash', 'Debit Card', 'Venmo', 'Bank Transfer']
+FREQUENCIES = ['Weekly', 'Bi-Weekly', 'Fortnightly', 'Monthly', 'Quarterly', 'Every 3 Months', 'Annually']
+
+
+def zipf_weights(n, exponent, rng=None):
+    """Popularity shares proportional to 1 / rank**exponent, ranks shuffled when ``rng`` is given"""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    if rng is not None:
+        weights = weights[rng.permutation(n)]
+    return weights / weights.sum()
+
+
+def sample_codes(rng, cdf, size):
+    """Vectorized categorical draw from a cumulative distribution"""
+    return np.minimum(np.searchsorted(cdf, rng.random(size), side='right'), len(cdf) - 1)
+
+
+class SyntheticShoppingGenerator:
+    """Seeded, vectorized generator of datasets in the shopping_behavior_updated.csv schema.
+
+    Customers and items are fixed at construction; rows are drawn in
+    chunks. Item popularity follows a Zipf law, customer activity a
+    Zipf law as well (so some customers buy many times), and a share of
+    each customer's purchases comes from their favorite category.
+    Chunk ``i`` is drawn from its own seed, so any chunk can be
+    regenerated independently and the same arguments give the same data.
+    """
+
+    def __init__(self, n_customers=3900, n_items=25, n_categories=4, item_skew=1.0, customer_skew=0.5,
+                 category_affinity=0.6, seed=42):
+        self.n_customers = n_customers
+        self.n_items = n_items
+        self.n_categories = n_categories
+        self.category_affinity = category_affinity
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self._build_items(rng, item_skew)
+        self._build_customers(rng, customer_skew)
+
+    def _build_items(self, rng, item_skew):
+        base_categories = list(CATEGORY_ITEMS)
+        self.category_names = np.array([
+            base_categories[c] if c < len(base_categories) else f"Category {c + 1}"
+            for c in range(self.n_categories)
+        ], dtype=object)
+
+        # Category sizes follow the real vocabulary sizes (11/8/4/2 items at the default 25)
+        sizes = np.array([len(CATEGORY_ITEMS.get(name, ())) for name in self.category_names], dtype=np.float64)
+        sizes[sizes == 0] = sizes[sizes > 0].mean() if (sizes > 0).any() else 1.0
+        shares = self.n_items * sizes / sizes.sum()
+        counts = np.floor(shares).astype(np.int64)
+        counts[np.argsort(counts - shares)[:self.n_items - counts.sum()]] += 1
+        self.item_categories = np.repeat(np.arange(self.n_categories), counts)
+
+        names = []
+        for category, count in enumerate(counts):
+            name = self.category_names[category]
+            vocabulary = CATEGORY_ITEMS.get(name, [f"{name} Item"])
+            for rank in range(count):
+                variant = rank // len(vocabulary)
+                base = vocabulary[rank % len(vocabulary)]
+                names.append(base if variant == 0 else f"{base} #{variant}")
+        self.item_names = np.array(names, dtype=object)
+
+        self.item_popularity = zipf_weights(self.n_items, item_skew, rng)
+        self.item_cdf = np.cumsum(self.item_popularity)
+        # Items are grouped by category; their within-category CDFs are stacked as
+        # category + cdf, so one searchsorted on (category + u) samples each row's own category
+        category_totals = np.bincount(self.item_categories, weights=self.item_popularity, minlength=self.n_categories)
+        within = (pd.Series(self.item_popularity / category_totals[self.item_categories])
+                  .groupby(self.item_categories).cumsum().to_numpy(copy=True))
+        # Close each category at exactly 1 so rounding never spills into the next one
+        within[np.r_[np.flatnonzero(np.diff(self.item_categories)), self.n_items - 1]] = 1.0
+        self.category_cdf = self.item_categories + within
+
+        self.item_price = rng.uniform(35, 85, self.n_items)
+        self.item_quality = rng.normal(0, 0.3, self.n_items)
+
+    def _build_customers(self, rng, customer_skew):
+        n = self.n_customers
+        self.customer_cdf = np.cumsum(zipf_weights(n, customer_skew, rng))
+        self.customer_age = rng.integers(18, 71, n)
+        self.customer_gender = (rng.random(n) < 0.68).astype(np.int8)
+        self.customer_location = rng.integers(0, len(LOCATIONS), n)
+        self.customer_subscribed = rng.random(n) < 0.27
+        self.customer_frequency = rng.integers(0, len(FREQUENCIES), n)
+        self.customer_payment = rng.integers(0, len(PAYMENT_METHODS), n)
+        self.customer_bias = rng.normal(0, 0.4, n)
+        self.customer_previous = rng.integers(1, 51, n)
+        # Favorite category drawn from category popularity
+        category_share = np.bincount(self.item_categories, weights=self.item_popularity, minlength=self.n_categories)
+        self.customer_favorite = sample_codes(rng, np.cumsum(category_share), n)
+
+    def chunk(self, index, size):
+        """Rows of chunk ``index`` (``size`` rows, drawn from the chunk's own seed)"""
+        rng = np.random.default_rng([self.seed, index])
+        customers = sample_codes(rng, self.customer_cdf, size)
+
+        items = np.minimum(
+            np.searchsorted(self.category_cdf, self.customer_favorite[customers] + rng.random(size), side='right'),
+            self.n_items - 1
+        )
+        from_popularity = rng.random(size) >= self.category_affinity
+        items[from_popularity] = sample_codes(rng, self.item_cdf, int(from_popularity.sum()))
+
+        amount = np.clip(np.rint(self.item_price[items] + rng.normal(0, 18, size)), 20, 100).astype(np.int64)
+        rating = np.clip(3.75 + self.item_quality[items] + self.customer_bias[customers]
+                         + rng.normal(0, 0.45, size), 2.5, 5.0).round(1)
+        # Subscribers always get the discount; the promo code goes with it
+        discount = self.customer_subscribed[customers] | (rng.random(size) < 0.22)
+        yes_no = np.array(['No', 'Yes'], dtype=object)
+
+        return pd.DataFrame({
+            'Customer ID': customers + 1,
+            'Age': self.customer_age[customers],
+            'Gender': np.array(['Female', 'Male'], dtype=object)[self.customer_gender[customers]],
+            'Item Purchased': self.item_names[items],
+            'Category': self.category_names[self.item_categories[items]],
+            'Purchase Amount (USD)': amount,
+            'Location': np.array(LOCATIONS, dtype=object)[self.customer_location[customers]],
+            'Size': np.array(SIZES[0], dtype=object)[sample_codes(rng, np.cumsum(SIZES[1]), size)],
+            'Color': np.array(COLORS, dtype=object)[rng.integers(0, len(COLORS), size)],
+            'Season': np.array(SEASONS, dtype=object)[rng.integers(0, len(SEASONS), size)],
+            'Review Rating': rating,
+            'Subscription Status': yes_no[self.customer_subscribed[customers].astype(np.int8)],
+            'Shipping Type': np.array(SHIPPING_TYPES, dtype=object)[rng.integers(0, len(SHIPPING_TYPES), size)],
+            'Discount Applied': yes_no[discount.astype(np.int8)],
+            'Promo Code Used': yes_no[discount.astype(np.int8)],
+            'Previous Purchases': self.customer_previous[customers],
+            'Payment Method': np.array(PAYMENT_METHODS, dtype=object)[self.customer_payment[customers]],
+            'Frequency of Purchases': np.array(FREQUENCIES, dtype=object)[self.customer_frequency[customers]],
+        }, columns=SHOPPING_COLUMNS)
+
+    def iter_chunks(self, n_rows, chunk_size=500000):
+        """Yield DataFrames of at most ``chunk_size`` rows, ``n_rows`` in total"""
+        for index, start in enumerate(range(0, n_rows, chunk_size)):
+            yield self.chunk(index, min(chunk_size, n_rows - start))
+
+    def generate(self, n_rows, chunk_size=500000):
+        """The whole dataset as one DataFrame"""
+        return pd.concat(self.iter_chunks(n_rows, chunk_size), ignore_index=True)
+
+    def write_csv(self, path, n_rows, chunk_size=500000):
+        """Stream the dataset to a CSV file one chunk at a time"""
+        with open(path, 'w', newline='') as f:
+            for index, chunk in enumerate(self.iter_chunks(n_rows, chunk_size)):
+                chunk.to_csv(f, header=index == 0, index=False)
+        return path
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity
+
+from components.svd_scorer import IdIndex
+
+
+class UserItemMatrix:
+    """Sparse customer x item interaction matrix with id <-> index maps.
+
+    The maps are IdIndex arrays (sorted ids + searchsorted) rather than
+    dicts, so millions of customers cost two flat arrays, not a dict entry each.
+    """
+
+    def __init__(self, matrix, customer_ids, item_ids):
+        self.matrix = sparse.csr_matrix(matrix)
+        self.customer_ids = np.asarray(customer_ids)
+        self.item_ids = np.asarray(item_ids, dtype=object)
+        self.customer_index = IdIndex.from_ids(self.customer_ids)
+        self.item_index = IdIndex.from_ids(self.item_ids)
+
+    @classmethod
+    def from_dataframe(cls, df, user_col='Customer ID', item_col='Item Purchased',
+                       value_col='interaction_score'):
+        """Build the matrix by factorizing ids into integer codes.
+
+        Repeated (customer, item) pairs are averaged, matching
+        ``pivot_table(aggfunc='mean')`` without materializing the dense grid.
+        """
+        user_codes, customer_ids = pd.factorize(df[user_col], sort=True)
+        item_codes, item_ids = pd.factorize(df[item_col], sort=True)
+        values = df[value_col].to_numpy(dtype=np.float64)
+
+        valid = (user_codes >= 0) & (item_codes >= 0) & ~np.isnan(values)
+        user_codes, item_codes, values = user_codes[valid], item_codes[valid], values[valid]
+
+        n_items = len(item_ids)
+        if not valid.any():
+            return cls(sparse.csr_matrix((len(customer_ids), n_items)), np.asarray(customer_ids), np.asarray(item_ids))
+        keys, inverse = np.unique(user_codes.astype(np.int64) * n_items + item_codes, return_inverse=True)
+        sums = np.bincount(inverse, weights=values, minlength=len(keys))
+        counts = np.bincount(inverse, minlength=len(keys))
+
+        matrix = sparse.csr_matrix(
+            (sums / counts, (keys // n_items, keys % n_items)),
+            shape=(len(customer_ids), n_items)
+        )
+        return cls(matrix, np.asarray(customer_ids), np.asarray(item_ids))
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    @property
+    def n_interactions(self):
+        """Number of stored positive interactions"""
+        return int(np.count_nonzero(self.matrix.data > 0))
+
+    @property
+    def sparsity(self):
+        """Percentage of empty cells in the customer x item grid"""
+        n_users, n_items = self.shape
+        if n_users * n_items == 0:
+            return 100.0
+        return (1 - self.n_interactions / (n_users * n_items)) * 100
+
+    def customer_row(self, customer_id):
+        """Sparse 1 x items row for ``customer_id`` (None if unknown)"""
+        idx = self.customer_index.get(customer_id)
+        if idx is None:
+            return None
+        return self.matrix[idx]
+
+    def item_similarity(self, dense_output=False):
+        """Item x item cosine similarity computed on the sparse matrix"""
+        return cosine_similarity(self.matrix.T, dense_output=dense_output)
+
+    def to_dataframe(self):
+        """Dense DataFrame view, only for small matrices"""
+        return pd.DataFrame(self.matrix.toarray(), index=self.customer_ids, columns=self.item_ids)
+
+
+class InteractionAccumulator:
+    """Running per-(customer, item) sums of the interaction score components.
+
+    interaction_score is linear in rating, amount and previous purchases, so
+    the averaged score of a cell is ``sums @ coefficients / count``. New rows
+    only touch their own cells, and a change of the normalizing maxima only
+    changes the coefficients; old rows are never revisited.
+    """
+
+    COMPONENTS = ['Review Rating', 'Purchase Amount (USD)', 'Previous Purchases']
+
+    def __init__(self, capacity=1024):
+        self.customer_ids, self.item_ids = [], []
+        self.customer_index, self.item_index = {}, {}
+        # Cells are looked up by (customer_code << 32 | item_code) in a sorted key array
+        self.cell_keys = np.empty(0, dtype=np.int64)
+        self.cell_key_codes = np.empty(0, dtype=np.int64)
+        self.cells = np.empty((capacity, 2), dtype=np.int64)
+        self.sums = np.zeros((capacity, len(self.COMPONENTS)))
+        self.counts = np.zeros(capacity)
+        self.n_cells = 0
+
+    @staticmethod
+    def _codes(values, ids, index):
+        # Only distinct values go through the dict; rows map back via the inverse
+        inverse, uniques = pd.factorize(np.asarray(values, dtype=object))
+        unique_codes = np.empty(len(uniques), dtype=np.int64)
+        for pos, value in enumerate(uniques.tolist()):
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(ids)
+                ids.append(value)
+            unique_codes[pos] = code
+        return unique_codes[inverse]
+
+    def _grow(self, needed):
+        capacity = len(self.counts)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        self.cells = np.resize(self.cells, (capacity, 2))
+        self.sums = np.concatenate([self.sums, np.zeros((capacity - len(self.sums), self.sums.shape[1]))])
+        self.counts = np.concatenate([self.counts, np.zeros(capacity - len(self.counts))])
+
+    def append(self, df, user_col='Customer ID', item_col='Item Purchased'):
+        """Add the rows of ``df``; rows with a missing component are skipped like NaN scores"""
+        values = df[self.COMPONENTS].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values).any(axis=1) & df[user_col].notna().to_numpy() & df[item_col].notna().to_numpy()
+        values = values[valid]
+        user_codes = self._codes(df[user_col].to_numpy()[valid].tolist(), self.customer_ids, self.customer_index)
+        item_codes = self._codes(df[item_col].to_numpy()[valid].tolist(), self.item_ids, self.item_index)
+
+        keys, inverse = np.unique((user_codes << 32) | item_codes, return_inverse=True)
+        slots = np.searchsorted(self.cell_keys, keys)
+        found = np.zeros(len(keys), dtype=bool)
+        in_range = slots < len(self.cell_keys)
+        found[in_range] = self.cell_keys[slots[in_range]] == keys[in_range]
+        key_codes = np.empty(len(keys), dtype=np.int64)
+        key_codes[found] = self.cell_key_codes[slots[found]]
+
+        new_keys = keys[~found]
+        new_codes = np.arange(self.n_cells, self.n_cells + len(new_keys))
+        key_codes[~found] = new_codes
+        self._grow(self.n_cells + len(new_keys))
+        self.cells[new_codes, 0] = new_keys >> 32
+        self.cells[new_codes, 1] = new_keys & 0xFFFFFFFF
+        self.n_cells += len(new_keys)
+        # Both arrays are sorted by key, so the new keys slot in at their search positions
+        self.cell_keys = np.insert(self.cell_keys, slots[~found], new_keys)
+        self.cell_key_codes = np.insert(self.cell_key_codes, slots[~found], new_codes)
+        cell_codes = key_codes[inverse.reshape(-1)]
+
+        np.add.at(self.sums, cell_codes, values)
+        np.add.at(self.counts, cell_codes, 1)
+
+    def to_matrix(self, coefficients):
+        """UserItemMatrix of mean interaction scores for the given component weights"""
+        n = self.n_cells
+        scores = (self.sums[:n] @ coefficients) / self.counts[:n]
+        matrix = sparse.csr_matrix(
+            (scores, (self.cells[:n, 0], self.cells[:n, 1])),
+            shape=(len(self.customer_ids), len(self.item_ids))
+        )
+        return UserItemMatrix(matrix, np.asarray(self.customer_ids), np.asarray(self.item_ids, dtype=object))
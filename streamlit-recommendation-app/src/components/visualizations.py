@@ -7,11 +7,21 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from components.aggregate_cube import AggregateCube
+from components.data_index import DataIndex
+from components.paginated_table import PaginatedTable
+from components.popularity import PopularityIndex
+
 class Visualizations:
     """Class for creating various visualizations"""
     
-    def __init__(self, df):
+    def __init__(self, df, data_index=None, cube=None, page_size=25, popularity=None):
         self.df = df
+        self.page_size = page_size
+        self.data_index = data_index if data_index is not None else DataIndex(df)
+        # Every chart reads from the cube instead of grouping the full dataframe
+        self.cube = cube if cube is not None else AggregateCube(df)
+        self.popularity = popularity if popularity is not None else PopularityIndex(df)
         
     def plot_customer_profile_metrics(self, profile):
         """Create customer profile visualization"""
@@ -37,41 +47,59 @@ class Visualizations:
             st.metric("Rating Promedio", f"{profile['avg_rating']:.2f}/5")
             st.metric("Categoría Favorita", profile['favorite_category'])
     
-    def plot_recommendations_table(self, recommendations, title="Recomendaciones"):
-        """Display recommendations in a nice table format"""
+    def plot_customer_rfm(self, rfm_record):
+        """Show the customer's RFM scores and campaign segment"""
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Segmento RFM", rfm_record['Segment'])
+        with col2:
+            st.metric("Recencia (R)", f"{rfm_record['R_Score']}/5")
+        with col3:
+            st.metric("Frecuencia (F)", f"{rfm_record['F_Score']}/5")
+        with col4:
+            st.metric("Monetario (M)", f"{rfm_record['M_Score']}/5")
+    
+    def plot_recommendations_table(self, recommendations, title="Recomendaciones", key=None):
+        """Display recommendations as a paginated table"""
         if not recommendations:
             st.warning("No se encontraron recomendaciones")
             return
             
         st.subheader(title)
         
-        # Create dataframe for recommendations
-        rec_data = []
-        for i, (item, score) in enumerate(recommendations, 1):
-            item_data = self.df[self.df['Item Purchased'] == item]
-            if not item_data.empty:
-                category = item_data['Category'].iloc[0]
-                avg_price = item_data['Purchase Amount (USD)'].mean()
-                avg_rating = item_data['Review Rating'].mean()
-                
-                rec_data.append({
-                    'Rank': i,
-                    'Producto': item,
-                    'Categoría': category,
-                    'Precio Promedio': f"${avg_price:.2f}",
-                    'Rating': f"{avg_rating:.2f}/5",
-                    'Score': f"{score:.3f}"
-                })
+        # Columns are built whole; numbers are formatted by the grid, not per cell
+        items = [item for item, _ in recommendations]
+        items_info = self.data_index.items_info(items)
+        rec_df = pd.DataFrame({
+            'Rank': np.arange(1, len(items) + 1),
+            'Producto': items,
+            'Categoría': items_info['category'].to_numpy(),
+            'Precio Promedio': items_info['avg_price'].to_numpy(),
+            'Rating': items_info['avg_rating'].to_numpy(),
+            'Score': np.array([score for _, score in recommendations], dtype=np.float64)
+        })
+        rec_df = rec_df[items_info['category'].notna().to_numpy()]
         
-        if rec_data:
-            rec_df = pd.DataFrame(rec_data)
-            st.dataframe(rec_df, use_container_width=True)
+        if len(rec_df):
+            PaginatedTable(
+                rec_df, {'Precio Promedio': '$%.2f', 'Rating': '%.2f/5', 'Score': '%.3f'}, self.page_size
+            ).render(key or title)
+    
+    def plot_rfm_segment_table(self, rfm, segment=None):
+        """Customers of one RFM segment (all when None), highest spend first, paginated"""
+        rfm_table = rfm.segment_table(segment)
+        PaginatedTable(
+            rfm_table, {'Monetary': '$%.2f', 'Recency': '%.1f'}, self.page_size
+        ).render(f"rfm_segment_{segment}")
+        return rfm_table
     
     def plot_category_distribution(self):
         """Plot category distribution"""
+        category_counts = self.cube.counts('Category')
         fig = px.bar(
-            x=self.df['Category'].value_counts().values,
-            y=self.df['Category'].value_counts().index,
+            x=category_counts.values,
+            y=category_counts.index,
             orientation='h',
             title="Distribución de Categorías",
             labels={'x': 'Número de Compras', 'y': 'Categoría'}
@@ -81,7 +109,9 @@ class Visualizations:
     
     def plot_spending_by_segment(self):
         """Plot spending by customer segment"""
-        segment_spending = self.df.groupby('Customer_Segment')['Purchase Amount (USD)'].agg(['mean', 'sum', 'count'])
+        segment_spending = self.cube.rollup(['Customer_Segment']).rename(
+            columns={'avg_amount': 'mean', 'amount_sum': 'sum', 'amount_count': 'count'}
+        )
         
         fig = make_subplots(
             rows=1, cols=2,
@@ -106,17 +136,15 @@ class Visualizations:
     def plot_top_products(self, category=None, top_n=10):
         """Plot top products overall or by category"""
         if category:
-            data = self.df[self.df['Category'] == category]
+            top_products = self.popularity.top(top_n, 'purchases', 'Category', category)
             title = f"Top {top_n} Productos en {category}"
         else:
-            data = self.df
+            top_products = self.popularity.top(top_n, 'purchases')
             title = f"Top {top_n} Productos Más Vendidos"
         
-        top_products = data['Item Purchased'].value_counts().head(top_n)
-        
         fig = px.bar(
-            x=top_products.values,
-            y=top_products.index,
+            x=top_products['purchases'],
+            y=top_products['item'],
             orientation='h',
             title=title,
             labels={'x': 'Número de Compras', 'y': 'Producto'}
@@ -127,11 +155,10 @@ class Visualizations:
     def plot_price_rating_scatter(self):
         """Plot price vs rating scatter plot"""
         # Aggregate data by product
-        product_stats = self.df.groupby('Item Purchased').agg({
-            'Purchase Amount (USD)': 'mean',
-            'Review Rating': 'mean',
-            'Category': 'first'
-        }).reset_index()
+        product_stats = (self.cube.rollup(['Item Purchased', 'Category'])
+                         .rename(columns={'avg_amount': 'Purchase Amount (USD)', 'avg_rating': 'Review Rating'})
+                         [['Purchase Amount (USD)', 'Review Rating']].reset_index()
+                         .drop_duplicates('Item Purchased'))
         
         fig = px.scatter(
             product_stats,
@@ -146,7 +173,7 @@ class Visualizations:
     
     def plot_purchase_frequency_by_gender(self):
         """Plot purchase frequency by gender"""
-        gender_stats = self.df.groupby(['Gender', 'Frequency of Purchases']).size().unstack(fill_value=0)
+        gender_stats = self.cube.crosstab('Gender', 'Frequency of Purchases')
         
         fig = px.bar(
             gender_stats.T,
@@ -158,7 +185,7 @@ class Visualizations:
     
     def plot_seasonal_trends(self):
         """Plot seasonal purchasing trends"""
-        seasonal_data = self.df.groupby(['Season', 'Category']).size().unstack(fill_value=0)
+        seasonal_data = self.cube.crosstab('Season', 'Category')
         
         fig = px.bar(
             seasonal_data,
@@ -170,13 +197,14 @@ class Visualizations:
     
     def plot_customer_lifetime_value_distribution(self):
         """Plot customer lifetime value distribution"""
-        customer_value = self.df.groupby('Customer ID')['Purchase Amount (USD)'].sum()
+        counts, edges = self.cube.customer_value_histogram(bins=30)
         
-        fig = px.histogram(
-            x=customer_value.values,
-            nbins=30,
+        # Pre-binned, so the figure carries 30 bars instead of one point per customer
+        fig = px.bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
             title='Distribución del Valor de Vida del Cliente',
             labels={'x': 'Valor Total de Compras (USD)', 'y': 'Número de Clientes'}
         )
-        fig.update_layout(height=400)
+        fig.update_layout(height=400, bargap=0)
         st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
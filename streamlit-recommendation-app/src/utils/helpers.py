@@ -1,9 +1,17 @@
 import pandas as pd
 import numpy as np
+from scipy import sparse
 import streamlit as st
-import base64
+import hashlib
+import os
+import tempfile
 from datetime import datetime
 
+from components.data_loader import read_shopping_data
+
+# (path, size, mtime) -> digest, so unchanged files are not re-hashed on every rerun
+_file_hash_cache = {}
+
 def format_currency(amount):
     """Format number as currency"""
     return f"${amount:,.2f}"
@@ -41,22 +49,58 @@ def get_age_segment(age):
         return 'Senior'
 
 def calculate_sparsity(matrix):
-    """Calculate sparsity of user-item matrix"""
+    """Calculate sparsity of user-item matrix (dense DataFrame or scipy sparse)"""
     total_elements = matrix.shape[0] * matrix.shape[1]
-    non_zero_elements = (matrix > 0).sum().sum()
+    if sparse.issparse(matrix):
+        non_zero_elements = np.count_nonzero(matrix.data > 0)
+    else:
+        non_zero_elements = (matrix > 0).sum().sum()
     sparsity = (1 - non_zero_elements / total_elements) * 100
     return sparsity
 
+def file_content_hash(*paths):
+    """Combined SHA-256 of the given files' contents (missing files are skipped)"""
+    combined = hashlib.sha256()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        stat = os.stat(path)
+        # realpath, so a promoted symlink pointing elsewhere is a new key
+        key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        digest = _file_hash_cache.get(key)
+        if digest is None:
+            file_hash = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    file_hash.update(block)
+            digest = file_hash.hexdigest()
+            _file_hash_cache[key] = digest
+        combined.update(digest.encode())
+    return combined.hexdigest()
+
 def safe_divide(numerator, denominator, default=0):
     """Safely divide two numbers, returning default if denominator is 0"""
     return numerator / denominator if denominator != 0 else default
 
-def create_download_link(df, filename, link_text):
-    """Create a download link for a dataframe"""
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">{link_text}</a>'
-    return href
+def write_csv_tempfile(df, chunk_size=100000):
+    """Write ``df`` to a temporary CSV one chunk at a time; returns the file rewound for reading"""
+    f = tempfile.TemporaryFile(suffix='.csv')
+    df.iloc[:0].to_csv(f, index=False)
+    for start in range(0, len(df), chunk_size):
+        df.iloc[start:start + chunk_size].to_csv(f, header=False, index=False)
+    f.seek(0)
+    return f
+
+def create_download_button(df, filename, label, key=None, chunk_size=100000):
+    """CSV download button; the file is only written, to a temp file, when clicked"""
+    return st.download_button(
+        label,
+        data=lambda: write_csv_tempfile(df, chunk_size),
+        file_name=filename,
+        mime='text/csv',
+        key=key,
+        on_click='ignore'
+    )
 
 def validate_customer_id(customer_id, df):
     """Validate if customer ID exists in dataframe"""
@@ -106,26 +150,26 @@ def get_recommendation_explanation(item, customer_data, item_data):
     return explanations
 
 @st.cache_data
-def load_and_preprocess_data(file_path):
+def load_and_preprocess_data(file_path, columns=None):
     """Load and preprocess data with caching"""
     try:
-        df = pd.read_csv(file_path)
-        
-        # Basic preprocessing
-        df['Purchase Amount (USD)'] = pd.to_numeric(df['Purchase Amount (USD)'], errors='coerce')
-        df['Review Rating'] = pd.to_numeric(df['Review Rating'], errors='coerce')
-        df['Previous Purchases'] = pd.to_numeric(df['Previous Purchases'], errors='coerce')
+        # Prefers the typed Parquet copy when one is up to date
+        df = read_shopping_data(file_path, columns)
         
         # Remove rows with null values in critical columns
-        df = df.dropna(subset=['Customer ID', 'Item Purchased', 'Purchase Amount (USD)', 'Review Rating'])
+        critical = [col for col in ['Customer ID', 'Item Purchased', 'Purchase Amount (USD)', 'Review Rating']
+                    if col in df.columns]
+        df = df.dropna(subset=critical)
         
         return df
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None
 
-def create_summary_stats(df):
-    """Create summary statistics for the dataset"""
+def create_summary_stats(df, cube=None):
+    """Create summary statistics for the dataset (from an AggregateCube when given)"""
+    if cube is not None:
+        return cube.summary_stats()
     stats = {
         'total_customers': df['Customer ID'].nunique(),
         'total_products': df['Item Purchased'].nunique(),
@@ -0,0 +1,64 @@
+"""Process a transactions CSV larger than RAM in two chunked passes.
+
+Usage:
+    python stream_dataset.py [--data data/shopping_behavior_updated.csv] [--chunk-size 500000]
+                             [--output-dir data/models/streamed]
+
+Pass 1 gathers the global maxima interaction_score is normalized with;
+pass 2 builds, with memory bounded by distinct customers/items rather than
+rows, the artifacts the app and training scripts use:
+    interactions.parquet   normalized (customer, item, score) rows
+    user_item_matrix.npz   sparse matrix of mean interaction scores (+ ids)
+    aggregate_cube.parquet cube cells behind the charts
+    rfm_analysis.csv       RFM scores and segments
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from components.streaming import StreamingPipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a large transactions CSV into the app's artifacts")
+    parser.add_argument('--data', default=config.SHOPPING_DATA_PATH)
+    parser.add_argument('--chunk-size', type=int, default=config.STREAM_CHUNK_SIZE)
+    parser.add_argument('--output-dir', default=os.path.join(config.MODELS_DIR, 'streamed'))
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    pipeline = StreamingPipeline(args.data, args.chunk_size)
+
+    start = time.time()
+    statistics = pipeline.scan()
+    print(f"Pasada 1: {statistics['n_rows']:,} filas, máximo gasto {statistics['max_amount']:.2f}, "
+          f"máximo compras previas {statistics['max_previous']:.0f} ({time.time() - start:.1f}s)")
+
+    def progress(rows_done, n_rows):
+        print(f"  Pasada 2: {rows_done:,}/{n_rows:,} filas", end='\r')
+
+    result = pipeline.run(os.path.join(args.output_dir, 'interactions.parquet'), progress)
+    print()
+
+    matrix = result['user_item_matrix']
+    sparse.save_npz(os.path.join(args.output_dir, 'user_item_matrix.npz'), matrix.matrix)
+    np.savez(os.path.join(args.output_dir, 'user_item_ids.npz'),
+             customer_ids=matrix.customer_ids, item_ids=matrix.item_ids.astype(str))
+    result['cube'].cells.reset_index().to_parquet(os.path.join(args.output_dir, 'aggregate_cube.parquet'),
+                                                  index=False)
+    result['rfm'].table().to_csv(os.path.join(args.output_dir, 'rfm_analysis.csv'), index=False)
+
+    print(f"Matriz {matrix.shape[0]:,} x {matrix.shape[1]:,} ({matrix.n_interactions:,} interacciones), "
+          f"{len(result['cube'].cells):,} celdas del cubo, {result['rfm'].n_customers:,} clientes RFM")
+    print(f"Artefactos en {args.output_dir} ({time.time() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
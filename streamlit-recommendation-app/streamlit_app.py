@@ -6,8 +6,14 @@ import plotly.graph_objects as go
 from sklearn.decomposition import TruncatedSVD
 from sklearn.metrics.pairwise import cosine_similarity
 import warnings
+import sys
+import os
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from components.user_item_matrix import UserItemMatrix
+
 # Page configuration
 st.set_page_config(
     page_title="Sistema de Recomendaciones - Actividad 9",
@@ -77,108 +83,92 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 @st.cache_data
-def load_sample_data():
+def load_sample_data(n_customers=100, n_products=25, seed=42):
     """Generate synthetic e-commerce data for demonstration"""
-    np.random.seed(42)
+    rng = np.random.default_rng(seed)
     
     # Product categories and items
-    categories = ['Electronics', 'Clothing', 'Books', 'Home & Garden', 'Sports']
-    products = []
+    category_items = {
+        'Electronics': ['Smartphone', 'Laptop', 'Headphones', 'Tablet', 'Camera'],
+        'Clothing': ['T-Shirt', 'Jeans', 'Dress', 'Jacket', 'Shoes'],
+        'Books': ['Fiction Novel', 'Science Book', 'Biography', 'Cookbook', 'Manual'],
+        'Home & Garden': ['Plant Pot', 'Lamp', 'Cushion', 'Tool Set', 'Decorative Item'],
+        'Sports': ['Running Shoes', 'Yoga Mat', 'Dumbbell', 'Sports Wear', 'Water Bottle'],
+    }
+    categories = np.array(list(category_items), dtype=object)
+    items = np.array(list(category_items.values()), dtype=object)
     
-    for i in range(25):
-        category = np.random.choice(categories)
-        if category == 'Electronics':
-            items = ['Smartphone', 'Laptop', 'Headphones', 'Tablet', 'Camera']
-        elif category == 'Clothing':
-            items = ['T-Shirt', 'Jeans', 'Dress', 'Jacket', 'Shoes']
-        elif category == 'Books':
-            items = ['Fiction Novel', 'Science Book', 'Biography', 'Cookbook', 'Manual']
-        elif category == 'Home & Garden':
-            items = ['Plant Pot', 'Lamp', 'Cushion', 'Tool Set', 'Decorative Item']
-        else:  # Sports
-            items = ['Running Shoes', 'Yoga Mat', 'Dumbbell', 'Sports Wear', 'Water Bottle']
-        
-        product_name = f"{np.random.choice(items)} {i+1}"
-        products.append({
-            'Product ID': f'P{i+1:03d}',
-            'Product Name': product_name,
-            'Category': category,
-            'Price': np.random.uniform(10, 500),
-            'Rating': np.random.uniform(3.0, 5.0)
-        })
+    product_numbers = np.arange(1, n_products + 1)
+    product_categories = rng.integers(0, len(categories), n_products)
+    product_items = items[product_categories, rng.integers(0, items.shape[1], n_products)]
+    products_df = pd.DataFrame({
+        'Product ID': [f'P{i:03d}' for i in product_numbers],
+        'Product Name': [f"{item} {i}" for item, i in zip(product_items, product_numbers)],
+        'Category': categories[product_categories],
+        'Price': rng.uniform(10, 500, n_products),
+        'Rating': rng.uniform(3.0, 5.0, n_products)
+    })
     
     # Generate customer data
-    customers = []
-    for i in range(100):
-        customers.append({
-            'Customer ID': f'C{i+1:03d}',
-            'Age': np.random.randint(18, 70),
-            'Gender': np.random.choice(['Male', 'Female']),
-            'Location': np.random.choice(['Urban', 'Suburban', 'Rural']),
-            'Purchase Power': np.random.choice(['Low', 'Medium', 'High'])
-        })
+    customers_df = pd.DataFrame({
+        'Customer ID': [f'C{i:03d}' for i in range(1, n_customers + 1)],
+        'Age': rng.integers(18, 70, n_customers),
+        'Gender': rng.choice(['Male', 'Female'], n_customers),
+        'Location': rng.choice(['Urban', 'Suburban', 'Rural'], n_customers),
+        'Purchase Power': rng.choice(['Low', 'Medium', 'High'], n_customers)
+    })
     
-    # Generate purchase history (ratings matrix)
-    purchase_data = []
-    for customer in customers:
-        # Each customer rates 5-15 products
-        num_purchases = np.random.randint(5, 16)
-        purchased_products = np.random.choice(range(25), num_purchases, replace=False)
-        
-        for product_idx in purchased_products:
-            rating = np.random.choice([3, 4, 5], p=[0.2, 0.5, 0.3])  # Bias towards higher ratings
-            purchase_data.append({
-                'Customer ID': customer['Customer ID'],
-                'Product ID': f'P{product_idx+1:03d}',
-                'Rating': rating,
-                'Purchase Date': pd.date_range('2023-01-01', '2024-01-01', periods=1000)[np.random.randint(0, 1000)]
-            })
+    # Generate purchase history (ratings matrix): each customer rates 5-15
+    # distinct products, taken as the first columns of a per-customer shuffle
+    num_purchases = rng.integers(5, 16, n_customers)
+    shuffled = np.argsort(rng.random((n_customers, n_products)), axis=1)
+    taken = np.arange(n_products)[None, :] < num_purchases[:, None]
+    customer_rows, _ = np.nonzero(taken)
+    product_idx = shuffled[taken]
+    n_purchases = len(product_idx)
     
-    products_df = pd.DataFrame(products)
-    customers_df = pd.DataFrame(customers)
-    purchases_df = pd.DataFrame(purchase_data)
+    purchase_dates = pd.date_range('2023-01-01', '2024-01-01', periods=1000)
+    purchases_df = pd.DataFrame({
+        'Customer ID': customers_df['Customer ID'].to_numpy()[customer_rows],
+        'Product ID': products_df['Product ID'].to_numpy()[product_idx],
+        'Rating': rng.choice([3, 4, 5], n_purchases, p=[0.2, 0.5, 0.3]),  # Bias towards higher ratings
+        'Purchase Date': purchase_dates[rng.integers(0, 1000, n_purchases)]
+    })
     
     return products_df, customers_df, purchases_df
 
 @st.cache_data
 def create_svd_model(purchases_df, n_components=10):
     """Create and train SVD model using TruncatedSVD"""
-    # Create user-item matrix
-    user_item_matrix = purchases_df.pivot_table(
-        index='Customer ID', 
-        columns='Product ID', 
-        values='Rating', 
-        fill_value=0
+    # Create sparse user-item matrix
+    user_item_matrix = UserItemMatrix.from_dataframe(
+        purchases_df,
+        item_col='Product ID',
+        value_col='Rating'
     )
     
-    # Apply SVD
+    # Apply SVD directly on the CSR matrix
     svd = TruncatedSVD(n_components=n_components, random_state=42)
-    user_factors = svd.fit_transform(user_item_matrix)
+    user_factors = svd.fit_transform(user_item_matrix.matrix)
     item_factors = svd.components_
     
-    # Reconstruct the matrix
-    predicted_ratings = np.dot(user_factors, item_factors)
-    predicted_df = pd.DataFrame(
-        predicted_ratings,
-        index=user_item_matrix.index,
-        columns=user_item_matrix.columns
-    )
-    
-    return svd, user_item_matrix, predicted_df, user_factors, item_factors
+    return svd, user_item_matrix, user_factors, item_factors
 
-def get_svd_recommendations(customer_id, predicted_df, user_item_matrix, products_df, top_n=5):
+def get_svd_recommendations(customer_id, user_item_matrix, user_factors, item_factors, products_df, top_n=5):
     """Get recommendations using SVD collaborative filtering"""
-    if customer_id not in predicted_df.index:
+    row = user_item_matrix.customer_index.get(customer_id)
+    if row is None:
         return pd.DataFrame()
     
-    # Get customer's predicted ratings
-    customer_ratings = predicted_df.loc[customer_id]
+    # Reconstruct only this customer's predicted ratings
+    customer_ratings = pd.Series(user_factors[row] @ item_factors, index=user_item_matrix.item_ids)
     
     # Get products the customer hasn't rated
-    unrated_products = user_item_matrix.loc[customer_id][user_item_matrix.loc[customer_id] == 0].index
+    rated = user_item_matrix.matrix[row].indices
+    unrated = np.setdiff1d(np.arange(len(customer_ratings)), rated)
     
     # Get top recommendations from unrated products
-    recommendations = customer_ratings[unrated_products].sort_values(ascending=False).head(top_n)
+    recommendations = customer_ratings.iloc[unrated].sort_values(ascending=False).head(top_n)
     
     # Merge with product details
     rec_df = pd.DataFrame({
@@ -197,7 +187,7 @@ def main():
     # Load data
     with st.spinner('Cargando datos y entrenando modelo...'):
         products_df, customers_df, purchases_df = load_sample_data()
-        svd_model, user_item_matrix, predicted_df, user_factors, item_factors = create_svd_model(purchases_df)
+        svd_model, user_item_matrix, user_factors, item_factors = create_svd_model(purchases_df)
     
     # Sidebar
     st.sidebar.header("🎯 Configuración")
@@ -227,8 +217,9 @@ def main():
         # Get recommendations
         recommendations = get_svd_recommendations(
             selected_customer, 
-            predicted_df, 
             user_item_matrix, 
+            user_factors, 
+            item_factors, 
             products_df, 
             num_recommendations
         )
@@ -1,11 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import pickle
 import plotly.express as px
 import warnings
+import sys
+import os
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from components.data_loader import load_svd_scorer, read_shopping_data
+from components.item_neighbors import score_from_history
+from components.svd_scorer import top_n_indices
+from components.user_item_matrix import UserItemMatrix
+
 # Page configuration
 st.set_page_config(
     page_title="Sistema de Recomendaciones SVD - Análisis de Datos",
@@ -65,25 +73,8 @@ st.markdown("""
 def load_data():
     """Load all necessary data"""
     try:
-        # Load main dataset
-        df = pd.read_csv("data/shopping_behavior_updated.csv")
-        
-        # Basic preprocessing
-        df['Purchase Amount (USD)'] = pd.to_numeric(df['Purchase Amount (USD)'], errors='coerce')
-        df['Review Rating'] = pd.to_numeric(df['Review Rating'], errors='coerce')
-        df['Previous Purchases'] = pd.to_numeric(df['Previous Purchases'], errors='coerce')
-        
-        # Create customer segments
-        df['Customer_Segment'] = pd.cut(df['Age'], 
-                                      bins=[0, 25, 40, 60, 100], 
-                                      labels=['Joven', 'Adulto', 'Maduro', 'Senior'])
-        
-        # Calculate interaction score
-        df['interaction_score'] = (
-            df['Review Rating'] * 0.4 +
-            (df['Purchase Amount (USD)'] / df['Purchase Amount (USD)'].max()) * 5 * 0.3 +
-            (df['Previous Purchases'] / df['Previous Purchases'].max()) * 5 * 0.3
-        )
+        # Load main dataset (typed Parquet copy when available)
+        df = read_shopping_data("data/shopping_behavior_updated.csv")
         
         return df
     except Exception as e:
@@ -92,23 +83,16 @@ def load_data():
 
 @st.cache_resource
 def load_svd_model():
-    """Load trained SVD model"""
+    """Load trained SVD model (memory-mapped factors when exported)"""
     try:
-        with open("data/models/svd_model.pkl", 'rb') as f:
-            svd_model = pickle.load(f)
-        return svd_model
+        return load_svd_scorer("data/models/svd_factors", "data/models/svd_model.pkl")
     except Exception as e:
         st.warning(f"No se pudo cargar el modelo SVD: {str(e)}")
         return None
 
 def create_user_item_matrix(df):
-    """Create user-item matrix"""
-    return df.pivot_table(
-        index='Customer ID',
-        columns='Item Purchased',
-        values='interaction_score',
-        aggfunc='mean'
-    ).fillna(0)
+    """Create sparse user-item matrix"""
+    return UserItemMatrix.from_dataframe(df)
 
 def get_svd_recommendations(svd_model, df, customer_id, top_n=5):
     """Get SVD-based recommendations with explanations"""
@@ -121,19 +105,10 @@ def get_svd_recommendations(svd_model, df, customer_id, top_n=5):
     # Get items already purchased by customer
     customer_items = set(df[df['Customer ID'] == customer_id]['Item Purchased'])
     
-    # Predict scores for unpurchased items
-    predictions_list = []
-    
-    for item in all_items:
-        if item not in customer_items:
-            try:
-                pred = svd_model.predict(customer_id, item)
-                predictions_list.append((item, pred.est))
-            except:
-                continue
-    
-    # Sort and return top N
-    predictions_list.sort(key=lambda x: x[1], reverse=True)
+    # Score every unpurchased item in one matrix product
+    predictions_list = svd_model.recommend(
+        [customer_id], top_n=top_n, exclude={customer_id: customer_items}
+    )[0]
     
     explanation = f"""
     **¿Cómo funciona SVD (Singular Value Decomposition)?**
@@ -150,30 +125,54 @@ def get_svd_recommendations(svd_model, df, customer_id, top_n=5):
     
     return predictions_list[:top_n], explanation
 
-def get_item_based_recommendations(item_similarity_df, df, customer_id, top_n=5):
-    """Get item-based recommendations with explanations"""
+@st.cache_resource
+def load_item_similarity():
+    """User-item matrix and the similarity aligned to its columns, built once per process"""
+    try:
+        user_item_matrix = create_user_item_matrix(read_shopping_data(
+            "data/shopping_behavior_updated.csv", columns=['Customer ID', 'Item Purchased', 'interaction_score']
+        ))
+        item_similarity_df = pd.read_csv("data/models/item_similarity_matrix.csv", index_col=0)
+    except Exception as e:
+        st.warning(f"No se pudo cargar la similitud entre productos: {str(e)}")
+        return None
+    
+    # Self-similarity removed, so purchased items never recommend themselves
+    item_ids = user_item_matrix.item_ids
+    similarity = (item_similarity_df.reindex(index=item_ids, columns=item_ids)
+                  .fillna(0).to_numpy(dtype=np.float64, copy=True))
+    np.fill_diagonal(similarity, 0)
+    return user_item_matrix, similarity
+
+def get_item_based_recommendations(item_similarity, df, customer_id, top_n=5):
+    """Get item-based recommendations with explanations (``item_similarity`` from load_item_similarity)"""
+    if item_similarity is None:
+        return [], "Similitud entre productos no disponible"
+    
     # Get customer's purchase history
     customer_items = df[df['Customer ID'] == customer_id]['Item Purchased'].unique()
+    user_item_matrix, similarity = item_similarity
     
-    if len(customer_items) == 0:
+    if len(customer_items) == 0 or customer_id not in user_item_matrix.customer_index:
         return [], "Cliente sin historial de compras"
     
-    # Use the most recent or highest rated item
-    latest_item = customer_items[0]  # For simplicity, use first item
-    
-    if latest_item not in item_similarity_df.index:
-        return [], f"No se encontraron similitudes para {latest_item}"
-    
-    similar_items = item_similarity_df[latest_item].sort_values(ascending=False)[1:top_n+1]
-    recommendations = list(zip(similar_items.index, similar_items.values))
+    # Aggregate similarity over the whole history, weighted by interaction_score
+    item_ids = user_item_matrix.item_ids
+    history = user_item_matrix.matrix[[user_item_matrix.customer_index.get(customer_id)]]
+    scores = score_from_history(history, similarity)[0]
+    top_idx = top_n_indices(scores, top_n)[0]
+    top_idx = top_idx[np.isfinite(scores[top_idx])]
+    recommendations = list(zip(item_ids[top_idx].tolist(), scores[top_idx].tolist()))
+    if not recommendations:
+        return [], "Ningún producto comparte compradores con el historial del cliente"
     
     explanation = f"""
     **¿Cómo funciona Filtrado Basado en Ítems?**
     
-    1. **Producto base**: Se toma como referencia "{latest_item}"
-    2. **Cálculo de similitud**: Usa correlación de Pearson entre productos
-    3. **Clientes similares**: Encuentra usuarios que compraron productos similares
-    4. **Recomendación**: Sugiere productos que compraron usuarios con gustos similares
+    1. **Productos base**: Se toma todo el historial del cliente ({len(customer_items)} productos)
+    2. **Cálculo de similitud**: Usa similitud coseno entre productos
+    3. **Ponderación**: Cada producto comprado pesa según su puntuación de interacción
+    4. **Recomendación**: Sugiere productos no comprados con mayor similitud acumulada
     
     Basado en el historial de compras: {', '.join(customer_items[:3])}
     {'...' if len(customer_items) > 3 else ''}
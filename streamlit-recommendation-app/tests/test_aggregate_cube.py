@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from components.aggregate_cube import AggregateCube
+from components.data_loader import preprocess_shopping_data
+from components.synthetic_data import SyntheticShoppingGenerator
+
+SEGMENTS = ['Joven', 'Adulto', 'Maduro', 'Senior']
+
+
+def test_rollups_keep_the_segment_order():
+    df = preprocess_shopping_data(SyntheticShoppingGenerator(n_customers=200, n_items=10, seed=1).generate(1000))
+    cube = AggregateCube(df.iloc[:500])
+    cube.append(df.iloc[500:])
+
+    segments = cube.rollup(['Customer_Segment'])
+    assert list(segments.index) == [s for s in SEGMENTS if s in set(df['Customer_Segment'])]
+    assert segments['purchases'].sum() == len(df)
+    assert list(cube.crosstab('Customer_Segment', 'Gender').index) == list(segments.index)
+    by_category = cube.rollup(['Category', 'Customer_Segment'])
+    for _, group in by_category.groupby(level='Category', observed=True):
+        order = [SEGMENTS.index(s) for s in group.index.get_level_values('Customer_Segment')]
+        assert order == sorted(order)
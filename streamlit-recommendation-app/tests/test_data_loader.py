@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from components.data_index import DataIndex
+from components.data_loader import DataLoader, preprocess_shopping_data
+from components.synthetic_data import SyntheticShoppingGenerator
+
+
+def test_customer_data_comes_from_the_index_rows():
+    df = preprocess_shopping_data(SyntheticShoppingGenerator(n_customers=20, n_items=6, seed=4).generate(100))
+    customer_id = df['Customer ID'].iloc[0]
+
+    customer_data = DataLoader().get_customer_data(DataIndex(df), customer_id)
+    pd.testing.assert_frame_equal(customer_data, df[df['Customer ID'] == customer_id])
+    assert DataLoader().get_customer_data(DataIndex(df), -1).empty
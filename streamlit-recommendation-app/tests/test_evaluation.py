@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from components.evaluation import holdout_split
+
+
+def test_holdout_keeps_history_for_every_held_out_customer():
+    df = pd.DataFrame({'Customer ID': [1, 2, 2, 3, 3, 3, 3, 3], 'Item Purchased': list('abcdefgh')})
+    train_df, test_df = holdout_split(df, test_size=0.4)
+
+    assert list(test_df['Item Purchased']) == ['c', 'g', 'h']
+    assert set(test_df['Customer ID']) <= set(train_df['Customer ID'])
+    assert list(train_df.loc[train_df['Customer ID'] == 1, 'Item Purchased']) == ['a']
+    assert holdout_split(df.drop_duplicates('Customer ID'))[1].empty
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from components.data_loader import preprocess_shopping_data
+from components.incremental_data import IncrementalDataset
+from components.recommendation_engine import RecommendationEngine
+from components.synthetic_data import SyntheticShoppingGenerator
+
+
+def split_rows(n_rows=600, first=400, seed=5):
+    raw = SyntheticShoppingGenerator(n_customers=80, n_items=12, seed=seed).generate(n_rows)
+    return raw.iloc[:first].reset_index(drop=True), raw.iloc[first:].reset_index(drop=True)
+
+
+def test_renormalization_leaves_the_callers_frame_untouched():
+    first, rest = split_rows()
+    df = preprocess_shopping_data(first.copy())
+    scores = df['interaction_score'].copy()
+    rest.loc[0, 'Purchase Amount (USD)'] = 10 * df['Purchase Amount (USD)'].max()
+
+    dataset = IncrementalDataset(df)
+    assert dataset.append(rest)
+    pd.testing.assert_series_equal(df['interaction_score'], scores)
+    assert not np.allclose(dataset.df['interaction_score'].to_numpy()[:len(df)], scores.to_numpy())
+
+
+def test_engine_append_matches_an_engine_built_from_all_rows():
+    first, rest = split_rows()
+    engine = RecommendationEngine.from_dataset(IncrementalDataset(preprocess_shopping_data(first.copy())),
+                                               None, None)
+    engine.append(rest)
+    full = RecommendationEngine(preprocess_shopping_data(pd.concat([first, rest], ignore_index=True)), None, None)
+
+    assert engine.df is engine.dataset.df and len(engine.df) == len(full.df)
+    assert engine.customer_items == full.customer_items
+    pd.testing.assert_series_equal(engine.favorite_category_codes.sort_index(),
+                                   full.favorite_category_codes.sort_index(), check_names=False)
+    pd.testing.assert_frame_equal(dense(engine.user_item_matrix), dense(full.user_item_matrix))
+
+
+def test_engine_append_publishes_new_tables_without_touching_the_old_ones():
+    first, rest = split_rows()
+    engine = RecommendationEngine.from_dataset(IncrementalDataset(preprocess_shopping_data(first.copy())),
+                                               None, None)
+    before = engine.tables
+    items_before = {cid: set(items) for cid, items in before.customer_items.items()}
+    engine.append(rest)
+
+    assert engine.tables is not before
+    assert before.customer_items == items_before
+    assert before.user_item_matrix.matrix.shape[0] < engine.user_item_matrix.matrix.shape[0]
+
+
+def test_engine_append_publishes_category_tables_as_one_snapshot():
+    first, rest = split_rows()
+    rest['Item Purchased'], rest['Category'] = 'Nuevo', 'Nueva'
+    engine = RecommendationEngine.from_dataset(IncrementalDataset(preprocess_shopping_data(first.copy())),
+                                               None, None)
+    before = engine.category_tables
+    favorites_before = before.favorite_category_codes.copy()
+    engine.append(rest)
+
+    assert 'Nueva' in engine.categories and 'Nueva' not in before.categories
+    pd.testing.assert_series_equal(before.favorite_category_codes, favorites_before)
+    assert engine.favorite_category_codes.max() < len(engine.categories)
+
+
+def dense(user_item_matrix):
+    """The matrix as a labelled frame, so arrival and sorted id orders compare equal"""
+    frame = pd.DataFrame(user_item_matrix.matrix.toarray(), index=list(user_item_matrix.customer_ids),
+                         columns=list(user_item_matrix.item_ids))
+    return frame.sort_index().sort_index(axis=1)
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from components.item_neighbors import ItemNeighborIndex, score_from_history
+from components.user_item_matrix import UserItemMatrix
+
+
+def test_items_without_shared_buyers_are_not_recommended():
+    # a and b share customer 1; c was bought alone by customer 2
+    matrix = UserItemMatrix(sparse.csr_matrix(np.array([[1.0, 2.0, 0.0], [0.0, 0.0, 3.0]])),
+                            np.array([1, 2]), np.array(['a', 'b', 'c'], dtype=object))
+    index = ItemNeighborIndex.build(matrix, k=2)
+
+    assert [item for item, _ in index.similar_items('a', 2)] == ['b']
+    assert index.similar_items('c', 2) == []
+    scores = score_from_history(matrix.matrix, index.to_sparse(matrix.item_ids))
+    assert np.isneginf(scores).all()
+    assert index.to_sparse(matrix.item_ids).nnz == 2
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_recommendations import run_batch
+from components.ann_index import IVFIndex
+from components.data_loader import read_batch_recommendations
+from components.model_versions import promote
+from components.svd_scorer import SVDScorer
+from components.synthetic_data import SyntheticShoppingGenerator
+
+
+def random_scorer(df, seed):
+    rng = np.random.default_rng(seed)
+    customer_ids = np.sort(df['Customer ID'].unique())
+    item_ids = np.array(sorted(df['Item Purchased'].unique()), dtype=object)
+    return SVDScorer(rng.normal(size=(len(customer_ids), 4)), rng.normal(size=(len(item_ids), 4)),
+                     rng.normal(size=len(customer_ids)), rng.normal(size=len(item_ids)), 3.0,
+                     customer_ids, item_ids, rating_scale=(1.0, 5.0))
+
+
+@pytest.fixture(scope='module')
+def raw_df():
+    return SyntheticShoppingGenerator(n_customers=30, n_items=8, seed=3).generate(200)
+
+
+def test_model_version_survives_save_and_load(raw_df, tmp_path):
+    scorer = random_scorer(raw_df, 0)
+    scorer.save(tmp_path / 'factors')
+
+    loaded = SVDScorer.load(tmp_path / 'factors')
+    assert loaded.model_version == scorer.model_version
+    assert random_scorer(raw_df, 1).model_version != scorer.model_version
+
+
+def test_batch_recommendations_of_another_model_are_skipped(raw_df, tmp_path):
+    data_path = tmp_path / 'shopping.csv'
+    raw_df.to_csv(data_path, index=False)
+    old, new = random_scorer(raw_df, 0), random_scorer(raw_df, 1)
+    old.save(tmp_path / 'factors')
+    output = tmp_path / 'batch.parquet'
+
+    run_batch(data_path, tmp_path / 'factors', None, output, top_n=3, chunk_size=10, workers=1)
+
+    assert read_batch_recommendations(output, old.model_version)
+    assert read_batch_recommendations(output, new.model_version) is None
+
+
+def publish_version(scorer, versions_dir, name):
+    version_dir = versions_dir / name
+    scorer.save(version_dir / 'svd_factors')
+    return version_dir
+
+
+def test_promotion_swaps_factors_and_drops_stale_artifacts(raw_df, tmp_path):
+    live = tmp_path / 'svd_factors'
+    old, new = random_scorer(raw_df, 0), random_scorer(raw_df, 1)
+    old.save(live)  # older layout: a plain directory
+    ann_path = tmp_path / 'ann_index.npz'
+    np.savez(ann_path, model_version=np.array(old.model_version))
+    mapped = SVDScorer.load(live)
+    qi_before = np.array(mapped.qi)
+
+    removed = promote(publish_version(new, tmp_path / 'versions', 'v2'), str(live),
+                      str(tmp_path / 'svd_model.pkl'), [str(ann_path)])
+
+    assert os.path.islink(live)
+    assert SVDScorer.load(live).model_version == new.model_version
+    assert removed == [str(ann_path)] and not ann_path.exists()
+    # Arrays mapped from the old directory are untouched
+    np.testing.assert_array_equal(mapped.qi, qi_before)
+
+    promote(publish_version(old, tmp_path / 'versions', 'v3'), str(live), str(tmp_path / 'svd_model.pkl'))
+    assert SVDScorer.load(live).model_version == old.model_version
+
+
+def test_ann_index_only_matches_the_factors_it_was_built_from(raw_df, tmp_path):
+    old, new = random_scorer(raw_df, 0), random_scorer(raw_df, 1)
+    IVFIndex.build(old, n_lists=2).save(tmp_path / 'ann_index.npz')
+
+    ann_index = IVFIndex.load(tmp_path / 'ann_index.npz')
+    assert ann_index.matches(old)
+    # Same catalog size and dimension, different factors
+    assert not ann_index.matches(new)
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from components.data_loader import preprocess_shopping_data
+from components.popularity import PopularityIndex
+from components.synthetic_data import SyntheticShoppingGenerator
+
+
+def test_append_publishes_rebuilt_rankings_without_touching_the_old_ones():
+    df = preprocess_shopping_data(SyntheticShoppingGenerator(n_customers=60, n_items=15, seed=2).generate(500))
+    popularity = PopularityIndex(df.iloc[:300].reset_index(drop=True))
+    rankings = popularity._rankings
+    before = popularity.top(5, 'revenue', 'Category', 'Clothing').copy()
+
+    popularity.append(df.iloc[300:].reset_index(drop=True))
+    assert popularity._rankings is not rankings
+    ranked, offsets = rankings[('Category', 'revenue')]
+    start, stop = offsets['Clothing']
+    pd.testing.assert_frame_equal(ranked.iloc[start:min(stop, start + 5)], before)
+
+    full = PopularityIndex(df)
+    for by in ['purchases', 'revenue', 'rating']:
+        pd.testing.assert_frame_equal(popularity.top(5, by, 'Category', 'Clothing')[['item', 'purchases']],
+                                      full.top(5, by, 'Category', 'Clothing')[['item', 'purchases']])
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.data_loader import preprocess_shopping_data
+from components.incremental_data import IncrementalDataset
+from components.recommendation_engine import RecommendationEngine
+from components.svd_scorer import IdIndex, SVDScorer
+from components.synthetic_data import SyntheticShoppingGenerator
+from recommendation_service import RecommendationService
+
+
+@pytest.fixture(scope='module')
+def engine():
+    df = preprocess_shopping_data(SyntheticShoppingGenerator(n_customers=50, n_items=10, seed=7).generate(400))
+    rng = np.random.default_rng(0)
+    customer_ids = np.sort(df['Customer ID'].unique())
+    item_ids = np.array(sorted(df['Item Purchased'].unique()), dtype=object)
+    scorer = SVDScorer(rng.normal(size=(len(customer_ids), 4)), rng.normal(size=(len(item_ids), 4)),
+                       rng.normal(size=len(customer_ids)), rng.normal(size=len(item_ids)), 3.0,
+                       customer_ids, item_ids)
+    return RecommendationEngine(df, scorer, None)
+
+
+def assert_same_recommendations(actual, expected):
+    assert [item for item, _ in actual] == [item for item, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+
+def run_service(engine, scenario, max_wait=0.05):
+    async def main():
+        service = RecommendationService(engine, 'v1', max_wait=max_wait, threads=1)
+        service.start_batchers()
+        try:
+            return service, await scenario(service)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+
+def test_id_index_resolves_valid_ids_in_a_mixed_lookup():
+    index = IdIndex.from_ids(np.array([5, 3, 1]))
+    assert index.lookup([3, 'abc', 1, 7]).tolist() == [1, -1, 2, -1]
+    assert index.get('abc') is None
+
+
+def test_mixed_batch_keeps_valid_customers_personalized(engine):
+    customer_id = int(engine.svd_scorer.user_index.sorted_ids[3])
+    expected = engine.svd_scorer.recommend([customer_id], 3, exclude=engine.customer_items)[0]
+
+    async def scenario(service):
+        # Bypasses request parsing: a str id lands in the same batch as a valid one
+        batcher = service.batchers['svd']
+        return await asyncio.gather(batcher.submit(customer_id, 3), batcher.submit('abc', 3))
+
+    service, (valid, invalid) = run_service(engine, scenario)
+    assert service.batchers['svd'].batches == 1
+    assert_same_recommendations(valid, expected)
+    assert len(invalid) == 3
+
+
+def test_malformed_customer_id_is_rejected_per_request(engine):
+    customer_id = int(engine.svd_scorer.user_index.sorted_ids[3])
+
+    async def scenario(service):
+        return await asyncio.gather(
+            service.dispatch('GET', f'/recommendations/svd?customer_id={customer_id}&top_n=3'),
+            service.dispatch('GET', '/recommendations/svd?customer_id=abc&top_n=3'),
+        )
+
+    service, ((status, payload), (bad_status, _)) = run_service(engine, scenario)
+    assert status == 200 and bad_status == 400
+    expected = engine.svd_scorer.recommend([customer_id], 3, exclude=engine.customer_items)[0]
+    assert_same_recommendations([(rec['item'], rec['score']) for rec in payload['recommendations']], expected)
+
+
+def test_fallback_results_are_not_cached(engine):
+    known = int(engine.svd_scorer.user_index.sorted_ids[0])
+
+    async def scenario(service):
+        await service.dispatch('GET', '/recommendations/svd?customer_id=999999&top_n=3')
+        await service.dispatch('GET', f'/recommendations/svd?customer_id={known}&top_n=3')
+
+    service, _ = run_service(engine, scenario)
+    assert len(service.cache) == 1
+    assert service.cache.get('v1', known, 'svd', 3) is not None
+    assert service.cache.get('v1', 999999, 'svd', 3) is None
+
+
+def test_results_are_cached_under_the_version_they_were_computed_for(engine):
+    known = int(engine.svd_scorer.user_index.sorted_ids[0])
+
+    async def scenario(service):
+        request = asyncio.create_task(service.cached('svd', known, 3))
+        await asyncio.sleep(0)
+        # An append lands while the batch is waiting to be scored
+        service.data_version = 'v2'
+        await request
+
+    service, _ = run_service(engine, scenario)
+    assert service.cache.get('v1', known, 'svd', 3) is not None
+    assert service.cache.get('v2', known, 'svd', 3) is None
+
+
+def test_invalid_and_oversized_bodies_are_rejected(engine):
+    async def request(port, head):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(head)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return int(response.split()[1])
+
+    async def main():
+        service = RecommendationService(engine, 'v1', threads=1, max_body=100)
+        server = await service.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.gather(
+                request(port, b'POST /transactions HTTP/1.1\r\nContent-Length: abc\r\n\r\n'),
+                request(port, b'POST /transactions HTTP/1.1\r\nContent-Length: 101\r\n\r\n'),
+                request(port, b'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n'),
+            )
+        finally:
+            server.close()
+            await service.stop()
+
+    assert asyncio.run(main()) == [400, 413, 200]
+
+
+def test_stop_cancels_batcher_tasks(engine):
+    async def main():
+        service = RecommendationService(engine, 'v1', threads=1)
+        service.start_batchers()
+        tasks = list(service.tasks)
+        await service.stop()
+        return tasks, service.tasks
+
+    tasks, remaining = asyncio.run(main())
+    assert len(tasks) == 3 and all(task.cancelled() for task in tasks)
+    assert remaining == []
+
+
+def test_posted_transactions_reach_the_engine():
+    raw = SyntheticShoppingGenerator(n_customers=50, n_items=10, seed=7).generate(400)
+    engine = RecommendationEngine.from_dataset(IncrementalDataset(preprocess_shopping_data(raw.iloc[:300].copy())),
+                                               None, None)
+    batch = raw.iloc[300:]
+    body = batch.to_json(orient='records').encode()
+
+    async def scenario(service):
+        return (await service.dispatch('POST', '/transactions', body),
+                await service.dispatch('POST', '/transactions', b'{"rows": 1}'),
+                await service.dispatch('POST', '/health', body))
+
+    service, ((status, payload), (bad_status, _), (wrong_method, _)) = run_service(engine, scenario)
+    assert status == 200 and payload['total_rows'] == 400
+    assert payload['data_version'] == service.data_version != 'v1'
+    assert bad_status == 400 and wrong_method == 405
+    customer_id = int(batch['Customer ID'].iloc[0])
+    assert set(batch.loc[batch['Customer ID'] == customer_id, 'Item Purchased']) <= engine.customer_items[customer_id]
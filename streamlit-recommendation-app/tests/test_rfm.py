@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from components.data_loader import preprocess_shopping_data
+from components.rfm import RFMAnalysis
+from components.synthetic_data import SyntheticShoppingGenerator
+
+
+def test_segment_tables_are_sorted_once_and_refreshed_on_append():
+    df = preprocess_shopping_data(SyntheticShoppingGenerator(n_customers=300, n_items=10, seed=2).generate(1500))
+    rfm = RFMAnalysis(df.iloc[:1000])
+
+    everyone = rfm.segment_table()
+    assert rfm.segment_table() is everyone
+    assert everyone['Monetary'].is_monotonic_decreasing
+    for segment in rfm.segments():
+        table = rfm.segment_table(segment)
+        assert (table['Segment'] == segment).all()
+        assert table['Monetary'].is_monotonic_decreasing
+    assert sum(len(rfm.segment_table(s)) for s in rfm.segments()) == rfm.n_customers
+    assert rfm.segment_table('Unknown').empty
+
+    rfm.append(df.iloc[1000:])
+    assert rfm.segment_table() is not everyone
+    expected = rfm.table().sort_values('Monetary', ascending=False, kind='stable', ignore_index=True)
+    assert rfm.segment_table()['Customer ID'].tolist() == expected['Customer ID'].tolist()
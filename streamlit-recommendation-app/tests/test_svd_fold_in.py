@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from components.data_loader import preprocess_shopping_data
+from components.incremental_data import IncrementalDataset
+from components.recommendation_engine import RecommendationEngine
+from components.svd_scorer import SVDScorer
+from components.synthetic_data import SyntheticShoppingGenerator
+
+
+def random_scorer(customer_ids, item_ids, seed=0, **kwargs):
+    rng = np.random.default_rng(seed)
+    item_ids = np.array(sorted(item_ids), dtype=object)
+    return SVDScorer(rng.normal(size=(len(customer_ids), 4)), rng.normal(size=(len(item_ids), 4)),
+                     rng.normal(size=len(customer_ids)), rng.normal(size=len(item_ids)), 3.0,
+                     np.sort(customer_ids), item_ids, rating_scale=(1.0, 5.0), **kwargs)
+
+
+def test_item_fold_in_swaps_a_new_catalog(tmp_path):
+    random_scorer(np.arange(1, 11), ['a', 'b', 'c']).save(tmp_path / 'factors')
+    scorer = SVDScorer.load(tmp_path / 'factors')
+    before = scorer.items
+    qi_before = np.array(before.qi)
+
+    fitted = scorer.fold_in_items({'b': ([1, 2, 3], [4.0, 5.0, 3.0]), 'd': ([4, 5], [2.0, 1.0]),
+                                   'e': ([99], [5.0])})
+    assert fitted == ['b', 'd']
+    # Readers holding the old snapshot keep a consistent, unmodified catalog
+    assert len(before.qi) == len(before.bi) == len(before.item_ids) == 3
+    np.testing.assert_array_equal(before.qi, qi_before)
+    assert list(scorer.item_ids) == ['a', 'b', 'c', 'd'] and scorer.item_index.get('d') == 3
+    assert not np.allclose(scorer.qi[1], qi_before[1])
+    assert scorer.recommend([1], top_n=4)[0]
+
+
+def test_folded_users_are_capped_and_forgotten():
+    scorer = random_scorer(np.arange(1, 4), ['a', 'b'], max_folded_users=2)
+    for customer_id in [10, 11, 12]:
+        assert scorer.fold_in_user(customer_id, ['a', 'b'], [4.0, 2.0])
+    assert list(scorer.folded_users) == [11, 12]
+
+    scorer.forget_users([12])
+    assert not scorer.knows_customer(12) and scorer.knows_customer(11)
+    scorer.forget_users()
+    assert not scorer.folded_users
+
+
+def test_engine_append_folds_in_new_items_and_refits_touched_customers():
+    raw = SyntheticShoppingGenerator(n_customers=40, n_items=10, seed=7).generate(400)
+    new_item = raw['Item Purchased'].iloc[-1]
+    old = raw.iloc[:300]
+    first = old[old['Item Purchased'] != new_item].reset_index(drop=True)
+    rest = pd.concat([old[old['Item Purchased'] == new_item], raw.iloc[300:]], ignore_index=True)
+
+    customers = np.sort(first['Customer ID'].unique())
+    newcomer = int(rest['Customer ID'].iloc[0])
+    trained = customers[customers != newcomer]
+    scorer = random_scorer(trained, first['Item Purchased'].unique())
+    engine = RecommendationEngine.from_dataset(IncrementalDataset(preprocess_shopping_data(first.copy())),
+                                               scorer, None)
+    engine.get_svd_recommendations_batch([newcomer])
+    assert newcomer in scorer.folded_users
+
+    engine.append(rest)
+    assert newcomer not in scorer.folded_users
+    assert new_item in scorer.item_index
+    assert len(engine.item_category_codes) == scorer.n_items
+    assert engine.get_hybrid_recommendations(newcomer, top_n=3)
+    assert newcomer in scorer.folded_users
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from components.user_item_matrix import UserItemMatrix
+
+
+def test_user_item_matrix_uses_array_indexes_and_accepts_an_empty_frame():
+    df = pd.DataFrame({'Customer ID': [7, 3, 7], 'Item Purchased': ['b', 'a', 'a'],
+                       'interaction_score': [1.0, 2.0, 3.0]})
+    matrix = UserItemMatrix.from_dataframe(df)
+    assert matrix.customer_index.lookup([3, 7, 5]).tolist() == [0, 1, -1]
+    assert matrix.item_index.get('b') == 1 and matrix.customer_row(5) is None
+
+    empty = UserItemMatrix.from_dataframe(df.iloc[0:0])
+    assert empty.shape == (0, 0) and empty.sparsity == 100.0
@@ -0,0 +1,101 @@
+"""Train the collaborative model with the built-in NumPy ALS trainer.
+
+Usage:
+    python train_als.py [--factors 50] [--iterations 15] [--reg 0.05] [--implicit] [--threads 4]
+                        [--test-size 0.2] [--no-promote | --output DIR]
+
+Writes the same memory-mappable factor files as export_svd_factors.py, so
+the app and batch jobs load the result with SVDScorer.load and never need
+surprise. Implicit mode scores preferences on a 0-1 scale rather than
+interaction scores, which the hybrid weights in config assume.
+
+The factors are published as data/models/versions/<version>/ and, unless
+--no-promote or --implicit is given, promoted the same way train_svd.py
+does it; the live svd_factors directory is never written in place.
+Implicit models are only published, never promoted.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from components.als import ALSTrainer, rmse
+from components.data_loader import read_shopping_data
+from components.user_item_matrix import UserItemMatrix
+from train_svd import promote_version, write_json
+
+
+def split_interactions(df, test_size, seed):
+    """Random row holdout for reporting test RMSE"""
+    rng = np.random.default_rng(seed)
+    test = rng.random(len(df)) < test_size
+    return df[~test], df[test]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train matrix factorization with NumPy ALS")
+    parser.add_argument('--data', default=config.SHOPPING_DATA_PATH)
+    parser.add_argument('--output', default=None,
+                        help="Write the factors only to this directory (no version, no promotion)")
+    parser.add_argument('--no-promote', action='store_true',
+                        help="Only write the versioned directory, keep the current model")
+    parser.add_argument('--factors', type=int, default=config.SVD_FACTORS)
+    parser.add_argument('--iterations', type=int, default=15)
+    parser.add_argument('--reg', type=float, default=0.05)
+    parser.add_argument('--implicit', action='store_true',
+                        help="Implicit-feedback ALS (0-1 scale); published only, never promoted")
+    parser.add_argument('--alpha', type=float, default=40.0, help="Implicit confidence scale")
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--test-size', type=float, default=0.0,
+                        help="Hold out this fraction of rows to report test RMSE (final model uses all rows)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if args.output and os.path.realpath(args.output) == os.path.realpath(config.SVD_FACTORS_DIR):
+        parser.error("--output no puede ser el directorio de factores en uso; omítalo para publicar y promover")
+
+    df = read_shopping_data(args.data, columns=['Customer ID', 'Item Purchased', 'interaction_score'])
+    trainer = ALSTrainer(n_factors=args.factors, n_iter=args.iterations, reg=args.reg, implicit=args.implicit,
+                         alpha=args.alpha, threads=args.threads, seed=args.seed)
+
+    metrics = {'factors': args.factors, 'iterations': args.iterations, 'reg': args.reg,
+               'implicit': args.implicit, 'seed': args.seed}
+    if args.test_size > 0 and not args.implicit:
+        train_df, test_df = split_interactions(df, args.test_size, args.seed)
+        scorer = trainer.fit(UserItemMatrix.from_dataframe(train_df))
+        metrics['train_rmse'] = rmse(scorer, UserItemMatrix.from_dataframe(train_df))
+        metrics['test_rmse'] = rmse(scorer, UserItemMatrix.from_dataframe(test_df))
+        print(f"RMSE entrenamiento: {metrics['train_rmse']:.4f}, prueba: {metrics['test_rmse']:.4f}")
+
+    start = time.time()
+    user_item_matrix = UserItemMatrix.from_dataframe(df)
+    scorer = trainer.fit(user_item_matrix)
+
+    if args.output:
+        output = args.output
+    else:
+        version = f"als_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        version_dir = os.path.join(config.MODEL_VERSIONS_DIR, version)
+        output = os.path.join(version_dir, 'svd_factors')
+    scorer.save(output)
+    print(f"ALS entrenado en {time.time() - start:.1f}s: {len(scorer.user_index):,} usuarios, "
+          f"{scorer.n_items:,} productos, {args.factors} factores -> {output}")
+
+    if not args.output:
+        write_json(os.path.join(version_dir, 'metrics.json'), dict(metrics, version=version))
+        if args.implicit:
+            # The hybrid weights and rating_scale of the app assume 1-5 interaction scores
+            print(f"Modelo implícito {version} publicado sin promover: la app espera puntuaciones 1-5, no "
+                  f"la escala 0-1 del modo implícito")
+        elif not args.no_promote:
+            promote_version(version_dir)
+            print(f"Modelo {version} promovido a modelo actual")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Train the SVD model: parallel grid search with k-fold CV, resumable, versioned output.
+
+Usage:
+    python train_svd.py [--n-factors 20 50 100] [--n-epochs 20] [--reg-all 0.02 0.05]
+                        [--folds 5] [--workers 4] [--run-id NAME] [--no-promote]
+
+Every (trial, fold) pair runs as one task on a process pool and its score
+is checkpointed as soon as it finishes, so re-running the same command
+skips finished work. The best trial is refitted on all data and published
+as data/models/versions/<version>/ (pickle, memory-mappable factors and
+metrics); unless --no-promote is given it also becomes the current model:
+svd_model.pkl is replaced and svd_factors is switched to the version's
+factors with one symlink rename, and the batch recommendations and ANN
+index built for the old model are rebuilt or removed.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import config
+from batch_recommendations import refresh as refresh_batch_recommendations
+from components.data_loader import read_shopping_data
+from components.model_versions import promote
+from components.svd_scorer import SVDScorer
+
+RATING_COLUMNS = ['Customer ID', 'Item Purchased', 'interaction_score']
+
+# Per-worker state, set once by the pool initializer
+_data = None
+_folds = None
+
+
+def load_dataset(data_path):
+    """The notebook's surprise Dataset: interaction_score on its observed range"""
+    from surprise import Dataset, Reader
+
+    df = read_shopping_data(data_path, columns=RATING_COLUMNS)
+    df = df.astype({'Item Purchased': str, 'interaction_score': np.float64})
+    reader = Reader(rating_scale=(df['interaction_score'].min(), df['interaction_score'].max()))
+    return Dataset.load_from_df(df[RATING_COLUMNS], reader)
+
+
+def _init_worker(data_path, n_folds, seed):
+    global _data, _folds
+    from surprise.model_selection import KFold
+
+    _data = load_dataset(data_path)
+    # Same seed -> same folds in every worker and on every resume
+    _folds = list(KFold(n_splits=n_folds, random_state=seed, shuffle=True).split(_data))
+
+
+def _run_fold(params, fold, seed):
+    """Fit one trial on one fold's training split and score its test split"""
+    from surprise import SVD, accuracy
+
+    trainset, testset = _folds[fold]
+    start = time.time()
+    model = SVD(random_state=seed, **params)
+    model.fit(trainset)
+    predictions = model.test(testset)
+    return {
+        'rmse': accuracy.rmse(predictions, verbose=False),
+        'mae': accuracy.mae(predictions, verbose=False),
+        'fit_seconds': time.time() - start,
+    }
+
+
+def trial_key(params):
+    return '_'.join(f"{name}={params[name]}" for name in sorted(params))
+
+
+def write_json(path, payload):
+    """Atomic write, so an interrupted run never leaves a half-written checkpoint"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def parameter_grid(args):
+    names = ['n_factors', 'n_epochs', 'reg_all', 'lr_all']
+    values = [args.n_factors, args.n_epochs, args.reg_all, args.lr_all]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def default_run_id(data_path, grid, n_folds, seed):
+    """Derived from the data and the search space, so identical commands resume the same run"""
+    digest = hashlib.sha256()
+    with open(data_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(json.dumps([grid, n_folds, seed], sort_keys=True).encode())
+    return digest.hexdigest()[:12]
+
+
+def run_search(data_path, grid, n_folds, seed, run_dir, workers):
+    """Cross-validate every trial, resuming from the fold checkpoints in ``run_dir``"""
+    checkpoint_dir = os.path.join(run_dir, 'folds')
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def checkpoint_path(params, fold):
+        return os.path.join(checkpoint_dir, f"{trial_key(params)}_fold={fold}.json")
+
+    pending = [(params, fold) for params in grid for fold in range(n_folds)
+               if not os.path.exists(checkpoint_path(params, fold))]
+    print(f"Tareas: {len(grid) * n_folds} ({len(grid)} combinaciones x {n_folds} folds), "
+          f"pendientes: {len(pending)}")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data_path, n_folds, seed)) as pool:
+            futures = {pool.submit(_run_fold, params, fold, seed): (params, fold) for params, fold in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                params, fold = futures[future]
+                result = dict(future.result(), params=params, fold=fold)
+                write_json(checkpoint_path(params, fold), result)
+                print(f"  [{done}/{len(pending)}] {trial_key(params)} fold {fold}: RMSE {result['rmse']:.4f}")
+
+    trials = []
+    for params in grid:
+        folds = []
+        for fold in range(n_folds):
+            with open(checkpoint_path(params, fold)) as f:
+                folds.append(json.load(f))
+        rmse = np.array([r['rmse'] for r in folds])
+        mae = np.array([r['mae'] for r in folds])
+        trials.append({
+            'params': params,
+            'rmse_mean': float(rmse.mean()), 'rmse_std': float(rmse.std()),
+            'mae_mean': float(mae.mean()), 'mae_std': float(mae.std()),
+        })
+    return sorted(trials, key=lambda t: t['rmse_mean'])
+
+
+def fit_final(data_path, params, seed, run_dir):
+    """Refit the best trial on the full dataset (checkpointed as the run's final model)"""
+    from surprise import SVD
+
+    model_path = os.path.join(run_dir, f"final_{trial_key(params)}.pkl")
+    if os.path.exists(model_path):
+        with open(model_path, 'rb') as f:
+            return pickle.load(f)
+
+    model = SVD(random_state=seed, **params)
+    model.fit(load_dataset(data_path).build_full_trainset())
+    with open(f"{model_path}.tmp", 'wb') as f:
+        pickle.dump(model, f)
+    os.replace(f"{model_path}.tmp", model_path)
+    return model
+
+
+def publish(model, metrics, versions_dir, version, promote):
+    """Write a versioned artifact directory and optionally make it the current model"""
+    version_dir = os.path.join(versions_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    with open(os.path.join(version_dir, 'svd_model.pkl'), 'wb') as f:
+        pickle.dump(model, f)
+    SVDScorer.from_surprise(model).save(os.path.join(version_dir, 'svd_factors'))
+    write_json(os.path.join(version_dir, 'metrics.json'), metrics)
+
+    if promote:
+        promote_version(version_dir)
+    return version_dir
+
+
+def promote_version(version_dir):
+    """Switch the app to ``version_dir`` and rebuild the batch table it was serving"""
+    removed = promote(version_dir, config.SVD_FACTORS_DIR, config.SVD_MODEL_PATH,
+                      [config.BATCH_RECOMMENDATIONS_PATH, config.ANN_INDEX_PATH])
+    if config.ANN_INDEX_PATH in removed:
+        print("Índice ANN obsoleto eliminado; ejecute build_ann_index.py para regenerarlo")
+    if config.BATCH_RECOMMENDATIONS_PATH in removed:
+        refresh_batch_recommendations()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid-search, cross-validate and publish the SVD model")
+    parser.add_argument('--data', default=config.SHOPPING_DATA_PATH)
+    parser.add_argument('--n-factors', type=int, nargs='+', default=config.SVD_PARAM_GRID['n_factors'])
+    parser.add_argument('--n-epochs', type=int, nargs='+', default=config.SVD_PARAM_GRID['n_epochs'])
+    parser.add_argument('--reg-all', type=float, nargs='+', default=config.SVD_PARAM_GRID['reg_all'])
+    parser.add_argument('--lr-all', type=float, nargs='+', default=config.SVD_PARAM_GRID['lr_all'])
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--run-id', default=None, help="Checkpoint directory name (default: data + grid hash)")
+    parser.add_argument('--no-promote', action='store_true',
+                        help="Only write the versioned directory, keep the current model")
+    args = parser.parse_args()
+
+    grid = parameter_grid(args)
+    run_id = args.run_id or default_run_id(args.data, grid, args.folds, args.seed)
+    run_dir = os.path.join(config.TRAINING_RUNS_DIR, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+    print(f"Ejecución {run_id} -> {run_dir}")
+
+    trials = run_search(args.data, grid, args.folds, args.seed, run_dir, args.workers)
+    best = trials[0]
+    print(f"Mejor combinación: {trial_key(best['params'])} "
+          f"(RMSE {best['rmse_mean']:.4f} ± {best['rmse_std']:.4f}, MAE {best['mae_mean']:.4f})")
+
+    model = fit_final(args.data, best['params'], args.seed, run_dir)
+    version = f"svd_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{run_id[:6]}"
+    metrics = {'version': version, 'run_id': run_id, 'folds': args.folds, 'seed': args.seed,
+               'best': best, 'trials': trials}
+    version_dir = publish(model, metrics, config.MODEL_VERSIONS_DIR, version, not args.no_promote)
+    print(f"Modelo publicado: {version_dir}" + ("" if args.no_promote else " (promovido a modelo actual)"))
+
+
+if __name__ == "__main__":
+    main()